@@ -14,7 +14,7 @@ export type ProjectActionMenuClearMutation$variables = {
 };
 export type ProjectActionMenuClearMutation$data = {
   readonly clearProject: {
-    readonly __typename: "Query";
+    readonly __typename: "ProjectDeletionJob";
   };
 };
 export type ProjectActionMenuClearMutation = {
@@ -40,7 +40,7 @@ v1 = [
         "variableName": "projectId"
       }
     ],
-    "concreteType": "Query",
+    "concreteType": "ProjectDeletionJob",
     "kind": "LinkedField",
     "name": "clearProject",
     "plural": false,
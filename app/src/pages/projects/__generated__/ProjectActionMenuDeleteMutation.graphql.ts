@@ -14,7 +14,7 @@ export type ProjectActionMenuDeleteMutation$variables = {
 };
 export type ProjectActionMenuDeleteMutation$data = {
   readonly deleteProject: {
-    readonly __typename: "Query";
+    readonly __typename: "ProjectDeletionJob";
   };
 };
 export type ProjectActionMenuDeleteMutation = {
@@ -40,7 +40,7 @@ v1 = [
         "variableName": "projectId"
       }
     ],
-    "concreteType": "Query",
+    "concreteType": "ProjectDeletionJob",
     "kind": "LinkedField",
     "name": "deleteProject",
     "plural": false,
@@ -0,0 +1,130 @@
+"""
+Compares `phoenix.trace.otel.decode_otlp_span` with the implementation it
+replaced, which unflattened attributes through a trie, on a large LLM span.
+
+    python scripts/benchmarks/decode_otlp_span.py
+"""
+
+import json
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import opentelemetry.proto.trace.v1.trace_pb2 as otlp
+from openinference.semconv.trace import OpenInferenceMimeTypeValues, SpanAttributes
+
+from phoenix.trace.attributes import get_attribute_value, load_json_strings, unflatten
+from phoenix.trace.otel import (
+    _decode_event,
+    _decode_identifier,
+    _decode_key_values,
+    _decode_status,
+    _decode_unix_nano,
+    decode_otlp_span,
+    encode_span_to_otlp,
+)
+from phoenix.trace.schemas import Span, SpanContext, SpanKind, SpanStatusCode
+
+
+def reference_decode_otlp_span(otlp_span: otlp.Span) -> Span:
+    attributes = unflatten(load_json_strings(_decode_key_values(otlp_span.attributes)))
+    span_kind = SpanKind(get_attribute_value(attributes, SpanAttributes.OPENINFERENCE_SPAN_KIND))
+    status_code, status_message = _decode_status(otlp_span.status)
+    if (
+        input_value := get_attribute_value(attributes, SpanAttributes.INPUT_VALUE)
+    ) and not isinstance(input_value, str):
+        attributes["input"]["value"] = json.dumps(input_value)
+        attributes["input"]["mime_type"] = OpenInferenceMimeTypeValues.JSON.value
+    return Span(
+        name=otlp_span.name,
+        context=SpanContext(
+            trace_id=_decode_identifier(otlp_span.trace_id),  # type: ignore
+            span_id=_decode_identifier(otlp_span.span_id),  # type: ignore
+        ),
+        parent_id=_decode_identifier(otlp_span.parent_span_id),
+        start_time=_decode_unix_nano(otlp_span.start_time_unix_nano),
+        end_time=_decode_unix_nano(otlp_span.end_time_unix_nano),
+        attributes=attributes,
+        span_kind=span_kind,
+        status_code=status_code,
+        status_message=status_message,
+        events=[_decode_event(event) for event in otlp_span.events],
+        conversation=None,
+    )
+
+
+def large_llm_span(num_messages: int = 50, num_documents: int = 20) -> otlp.Span:
+    attributes: Dict[str, Any] = {
+        "openinference": {"span": {"kind": "LLM"}},
+        "input": {"value": "What is the meaning of life? " * 20, "mime_type": "text/plain"},
+        "output": {"value": "42 " * 100, "mime_type": "text/plain"},
+        "llm": {
+            "model_name": "gpt-4",
+            "invocation_parameters": json.dumps({"temperature": 0.1, "max_tokens": 512}),
+            "token_count": {"prompt": 1234, "completion": 567, "total": 1801},
+            "input_messages": [
+                {
+                    "message": {
+                        "role": "user" if i % 2 else "assistant",
+                        "content": f"message {i} " * 30,
+                        "tool_calls": [
+                            {
+                                "tool_call": {
+                                    "function": {
+                                        "name": "search",
+                                        "arguments": json.dumps({"query": f"q{i}"}),
+                                    }
+                                }
+                            }
+                        ],
+                    }
+                }
+                for i in range(num_messages)
+            ],
+            "output_messages": [{"message": {"role": "assistant", "content": "42 " * 100}}],
+            "prompt_template": {
+                "template": "Answer {question} using {context}",
+                "variables": {"question": "why?", "context": "because"},
+            },
+        },
+        "retrieval": {
+            "documents": [
+                {
+                    "document": {
+                        "id": f"doc-{i}",
+                        "score": i / num_documents,
+                        "content": f"document {i} " * 50,
+                        "metadata": {"source": f"file-{i}.txt", "page": i},
+                    }
+                }
+                for i in range(num_documents)
+            ]
+        },
+        "metadata": {"user": "abc", "session": "xyz"},
+    }
+    span = Span(
+        name="llm",
+        context=SpanContext(trace_id="0123456789abcdef" * 2, span_id="0123456789abcdef"),
+        span_kind=SpanKind.LLM,
+        parent_id="fedcba9876543210",
+        start_time=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        end_time=datetime(2024, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+        status_code=SpanStatusCode.OK,
+        status_message="",
+        attributes=attributes,
+        events=[],
+        conversation=None,
+    )
+    return encode_span_to_otlp(span)
+
+
+if __name__ == "__main__":
+    otlp_span = large_llm_span()
+    assert decode_otlp_span(otlp_span) == reference_decode_otlp_span(otlp_span)
+    number = 500
+    reference = min(timeit.repeat(lambda: reference_decode_otlp_span(otlp_span), number=number))
+    current = min(timeit.repeat(lambda: decode_otlp_span(otlp_span), number=number))
+    print(f"{len(otlp_span.attributes)} attributes per span")
+    print(f"reference: {reference / number * 1e6:.1f} µs per span")
+    print(f"current:   {current / number * 1e6:.1f} µs per span")
+    print(f"speedup:   {reference / current:.1f}x")
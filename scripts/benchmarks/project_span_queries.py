@@ -0,0 +1,170 @@
+"""
+Compares the query plans and timings of reading a project's spans by joining
+the traces, as the read paths used to, with filtering on the spans' own
+`project_rowid`, which is covered by the indexes on (project_rowid, start_time)
+and (project_rowid, id).
+
+    python scripts/benchmarks/project_span_queries.py --num-spans 10000000
+    python scripts/benchmarks/project_span_queries.py --url postgresql://localhost/phoenix
+
+The tables are created from the models, filled with the spans of the project
+being read and as many spans of another project, and dropped at the end.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from sqlalchemy import Connection, Select, create_engine, desc, func, insert, select
+
+from phoenix.db import models
+
+SPANS_PER_TRACE = 10
+CHUNK_SIZE = 10_000
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def populate(conn: Connection, num_spans: int) -> Tuple[int, datetime]:
+    """
+    Inserts two projects of `num_spans` spans each, a second apart and
+    interleaved in time, and returns the rowid of the first project along with
+    the time of its last span.
+    """
+    project_rowids = [
+        conn.scalar(insert(models.Project).values(name=name).returning(models.Project.id))
+        for name in ("benchmark", "other")
+    ]
+    num_traces = num_spans // SPANS_PER_TRACE
+    for start in range(0, num_traces, CHUNK_SIZE // SPANS_PER_TRACE):
+        stop = min(num_traces, start + CHUNK_SIZE // SPANS_PER_TRACE)
+        for project_rowid in project_rowids:
+            traces = [
+                dict(
+                    project_rowid=project_rowid,
+                    trace_id=f"{project_rowid}-{i}",
+                    start_time=T0 + timedelta(seconds=i * SPANS_PER_TRACE),
+                    end_time=T0 + timedelta(seconds=(i + 1) * SPANS_PER_TRACE),
+                )
+                for i in range(start, stop)
+            ]
+            trace_rowids = conn.scalars(
+                insert(models.Trace).returning(models.Trace.id, sort_by_parameter_order=True),
+                traces,
+            ).all()
+            conn.execute(
+                insert(models.Span),
+                list(_spans(project_rowid, trace_rowids, start)),
+            )
+        conn.commit()
+    return project_rowids[0], T0 + timedelta(seconds=num_traces * SPANS_PER_TRACE)
+
+
+def _spans(project_rowid: int, trace_rowids: List[int], first: int) -> Iterator[Dict[str, Any]]:
+    for i, trace_rowid in enumerate(trace_rowids, first):
+        for j in range(SPANS_PER_TRACE):
+            start_time = T0 + timedelta(seconds=i * SPANS_PER_TRACE + j)
+            yield dict(
+                trace_rowid=trace_rowid,
+                project_rowid=project_rowid,
+                span_id=f"{project_rowid}-{i}-{j}",
+                parent_id=None if j == 0 else f"{project_rowid}-{i}-0",
+                name="span",
+                span_kind="LLM",
+                start_time=start_time,
+                end_time=start_time + timedelta(milliseconds=500),
+                attributes={},
+                events=[],
+                status_code="OK",
+                status_message="",
+                is_root=j == 0,
+                cumulative_error_count=0,
+                cumulative_llm_token_count_prompt=0,
+                cumulative_llm_token_count_completion=0,
+            )
+
+
+def queries(project_rowid: int, end_time: datetime) -> Dict[str, Tuple[Select[Any], Select[Any]]]:
+    """
+    Returns each query as it reads spans through the traces, and as it reads
+    them by their own project.
+    """
+    start_time = end_time - timedelta(days=1)
+
+    def by_trace(stmt: Select[Any]) -> Select[Any]:
+        return stmt.join(models.Trace).where(models.Trace.project_rowid == project_rowid)
+
+    def by_span(stmt: Select[Any]) -> Select[Any]:
+        return stmt.where(models.Span.project_rowid == project_rowid)
+
+    page = select(models.Span.id).order_by(models.Span.id).limit(50)
+    latest = (
+        select(models.Span.id)
+        .where(start_time <= models.Span.start_time)
+        .where(models.Span.start_time < end_time)
+        .order_by(desc(models.Span.start_time))
+        .limit(50)
+    )
+    count = (
+        select(func.count())
+        .select_from(models.Span)
+        .where(start_time <= models.Span.start_time)
+        .where(models.Span.start_time < end_time)
+    )
+    return {
+        name: (by_trace(stmt), by_span(stmt))
+        for name, stmt in (
+            ("first page of spans", page),
+            ("latest spans of the last day", latest),
+            ("number of spans of the last day", count),
+        )
+    }
+
+
+def explain(conn: Connection, stmt: Select[Any]) -> str:
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return "\n".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    return "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}"))
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5) -> float:
+    return statistics.median(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="defaults to a temporary SQLite database")
+    parser.add_argument("--num-spans", type=int, default=1_000_000)
+    args = parser.parse_args()
+    path = None
+    if not (url := args.url):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    models.Base.metadata.create_all(engine)
+    try:
+        with engine.connect() as conn:
+            project_rowid, end_time = populate(conn, args.num_spans)
+            conn.exec_driver_sql("ANALYZE")
+            conn.commit()
+            print(f"{args.num_spans:,} spans per project on {conn.dialect.name}")
+            for name, (joined, denormalized) in queries(project_rowid, end_time).items():
+                print(f"\n## {name}")
+                for label, stmt in (("joined", joined), ("denormalized", denormalized)):
+                    seconds = measure(lambda: conn.execute(stmt).all())
+                    print(f"\n{label}: {seconds * 1000:.1f} ms")
+                    print(explain(conn, stmt))
+    finally:
+        models.Base.metadata.drop_all(engine)
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
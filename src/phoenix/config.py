@@ -1,8 +1,9 @@
+import json
 import os
 import tempfile
 from logging import getLogger
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 logger = getLogger(__name__)
 
@@ -43,6 +44,85 @@ ENV_PHOENIX_ENABLE_PROMETHEUS = "PHOENIX_ENABLE_PROMETHEUS"
 """
 Whether to enable Prometheus. Defaults to false.
 """
+ENV_PHOENIX_MAX_QUEUED_SPANS = "PHOENIX_MAX_QUEUED_SPANS"
+"""
+The maximum number of spans that may be waiting to be written to the database.
+Once reached, new traces are rejected with a retryable error until the queue
+drains. Defaults to 100,000. Set to 0 for no limit.
+"""
+ENV_PHOENIX_MAX_QUEUED_SPAN_BYTES = "PHOENIX_MAX_QUEUED_SPAN_BYTES"
+"""
+The maximum total size in bytes of the (uncompressed OTLP) spans that may be
+waiting to be written to the database. Defaults to 512 MiB. Set to 0 for no
+limit.
+"""
+ENV_PHOENIX_BULK_INSERTER_BATCH_SIZE = "PHOENIX_BULK_INSERTER_BATCH_SIZE"
+"""
+The number of queued spans and evaluations at which they are written to the
+database without waiting any longer. Defaults to 1000.
+"""
+ENV_PHOENIX_BULK_INSERTER_MAX_LINGER_MS = "PHOENIX_BULK_INSERTER_MAX_LINGER_MS"
+"""
+The maximum number of milliseconds a queued span or evaluation waits before it
+is written to the database. Defaults to 50.
+"""
+ENV_PHOENIX_BULK_INSERTER_MAX_BATCH_BYTES = "PHOENIX_BULK_INSERTER_MAX_BATCH_BYTES"
+"""
+The total size in bytes of queued spans at which they are written to the
+database without waiting any longer. Defaults to 16 MiB.
+"""
+ENV_PHOENIX_BULK_INSERTER_MAX_TRANSACTION_SIZE = "PHOENIX_BULK_INSERTER_MAX_TRANSACTION_SIZE"
+"""
+The maximum number of spans or evaluations written in one database transaction.
+The number used adapts to how long transactions take, up to this maximum.
+Defaults to 10,000.
+"""
+ENV_PHOENIX_BULK_INSERTER_TARGET_COMMIT_LATENCY_MS = (
+    "PHOENIX_BULK_INSERTER_TARGET_COMMIT_LATENCY_MS"
+)
+"""
+The number of milliseconds a database transaction of spans or evaluations should
+take. Transactions are made smaller when they take longer, and larger when they
+are quick. Defaults to 500.
+"""
+ENV_PHOENIX_OTLP_DECODER_PROCESSES = "PHOENIX_OTLP_DECODER_PROCESSES"
+"""
+The number of worker processes in which to decode incoming traces. Defaults to
+0, in which case traces are decoded in a thread pool of the server process.
+"""
+ENV_PHOENIX_SPOOL_DIR = "PHOENIX_SPOOL_DIR"
+"""
+A directory in which to spool incoming spans and evaluations before they are
+written to the database, so that they survive a restart of the server. Spooling
+is disabled if not set.
+"""
+ENV_PHOENIX_POSTGRES_COPY_SPANS = "PHOENIX_POSTGRES_COPY_SPANS"
+"""
+Whether to write spans to PostgreSQL with COPY into a staging table rather than
+with INSERT statements, for higher throughput, e.g. when backfilling. Ignored
+for SQLite. Defaults to FALSE.
+"""
+ENV_PHOENIX_TRACE_RETENTION_MAX_AGE_DAYS = "PHOENIX_TRACE_RETENTION_MAX_AGE_DAYS"
+"""
+The number of days after which the traces of a project are deleted, unless the
+project has its own retention policy. Traces are kept forever if not set.
+"""
+ENV_PHOENIX_TRACE_RETENTION_MAX_SPANS = "PHOENIX_TRACE_RETENTION_MAX_SPANS"
+"""
+The number of spans a project may hold, beyond which its oldest traces are
+deleted, unless the project has its own retention policy. Unlimited if not set.
+"""
+ENV_PHOENIX_TRACE_RETENTION_POLICIES = "PHOENIX_TRACE_RETENTION_POLICIES"
+"""
+The retention policies of individual projects, as a JSON object keyed by project
+name, e.g. `{"chatbot": {"max_age_days": 7, "max_spans": 1000000}}`. A project's
+own policy replaces the default one, and a missing or zero value means no limit.
+"""
+ENV_PHOENIX_TRACE_RETENTION_MAX_DATABASE_BYTES = "PHOENIX_TRACE_RETENTION_MAX_DATABASE_BYTES"
+"""
+The number of bytes a SQLite database may use, beyond which the oldest traces of
+any project are deleted. Unlimited if not set. Ignored for PostgreSQL.
+"""
 
 # Phoenix server OpenTelemetry instrumentation environment variables
 ENV_PHOENIX_SERVER_INSTRUMENTATION_OTLP_TRACE_COLLECTOR_HTTP_ENDPOINT = (
@@ -105,6 +185,22 @@ GRPC_PORT = 4317
 """The port the gRPC server will run on after launch_app is called.
 The default network port for OTLP/gRPC is 4317.
 See https://opentelemetry.io/docs/specs/otlp/#otlpgrpc-default-port"""
+MAX_QUEUED_SPANS = 100_000
+"""The default maximum number of spans waiting to be written to the database."""
+MAX_QUEUED_SPAN_BYTES = 512 * 2**20
+"""The default maximum total size of spans waiting to be written to the database."""
+BULK_INSERTER_BATCH_SIZE = 1000
+"""The default number of queued items at which the bulk inserter flushes."""
+BULK_INSERTER_MAX_LINGER_MS = 50
+"""The default maximum time a queued item waits before the bulk inserter flushes."""
+BULK_INSERTER_MAX_BATCH_BYTES = 16 * 2**20
+"""The default size of queued spans at which the bulk inserter flushes."""
+BULK_INSERTER_MIN_TRANSACTION_SIZE = 100
+"""The smallest number of items the bulk inserter writes per transaction."""
+BULK_INSERTER_MAX_TRANSACTION_SIZE = 10_000
+"""The default largest number of items the bulk inserter writes per transaction."""
+BULK_INSERTER_TARGET_COMMIT_LATENCY_MS = 500
+"""The default time a transaction of the bulk inserter should take."""
 GENERATED_DATASET_NAME_PREFIX = "phoenix_dataset_"
 """The prefix of datasets that are auto-assigned a name."""
 WORKING_DIR = get_working_dir()
@@ -182,6 +278,137 @@ def get_env_grpc_port() -> int:
     )
 
 
+def get_env_max_queued_spans() -> Optional[int]:
+    return _get_env_capacity(ENV_PHOENIX_MAX_QUEUED_SPANS, MAX_QUEUED_SPANS)
+
+
+def get_env_max_queued_span_bytes() -> Optional[int]:
+    return _get_env_capacity(ENV_PHOENIX_MAX_QUEUED_SPAN_BYTES, MAX_QUEUED_SPAN_BYTES)
+
+
+def get_env_otlp_decoder_processes() -> int:
+    return _get_env_int(ENV_PHOENIX_OTLP_DECODER_PROCESSES, 0)
+
+
+def get_env_bulk_inserter_batch_size() -> int:
+    return _get_env_int(ENV_PHOENIX_BULK_INSERTER_BATCH_SIZE, BULK_INSERTER_BATCH_SIZE)
+
+
+def get_env_bulk_inserter_max_linger() -> float:
+    """Returns seconds."""
+    max_linger_ms = _get_env_int(
+        ENV_PHOENIX_BULK_INSERTER_MAX_LINGER_MS, BULK_INSERTER_MAX_LINGER_MS
+    )
+    return max_linger_ms / 1000
+
+
+def get_env_bulk_inserter_max_batch_bytes() -> int:
+    return _get_env_int(ENV_PHOENIX_BULK_INSERTER_MAX_BATCH_BYTES, BULK_INSERTER_MAX_BATCH_BYTES)
+
+
+def get_env_bulk_inserter_max_transaction_size() -> int:
+    return max(
+        BULK_INSERTER_MIN_TRANSACTION_SIZE,
+        _get_env_int(
+            ENV_PHOENIX_BULK_INSERTER_MAX_TRANSACTION_SIZE, BULK_INSERTER_MAX_TRANSACTION_SIZE
+        ),
+    )
+
+
+def get_env_bulk_inserter_target_commit_latency() -> float:
+    """Returns seconds."""
+    target_commit_latency_ms = _get_env_int(
+        ENV_PHOENIX_BULK_INSERTER_TARGET_COMMIT_LATENCY_MS, BULK_INSERTER_TARGET_COMMIT_LATENCY_MS
+    )
+    return target_commit_latency_ms / 1000
+
+
+def _get_env_int(env_var: str, default: int) -> int:
+    if not (value := os.getenv(env_var)):
+        return default
+    if value.isnumeric():
+        return int(value)
+    raise ValueError(
+        f"Invalid value for environment variable {env_var}: "
+        f"{value}. Value must be a non-negative integer."
+    )
+
+
+def get_env_spool_dir() -> Optional[Path]:
+    if not (spool_dir := os.getenv(ENV_PHOENIX_SPOOL_DIR)):
+        return None
+    return Path(spool_dir).expanduser()
+
+
+def get_env_postgres_copy_spans() -> bool:
+    if (copy_spans := os.getenv(ENV_PHOENIX_POSTGRES_COPY_SPANS)) is None or (
+        copy_spans_lower := copy_spans.lower()
+    ) == "false":
+        return False
+    if copy_spans_lower == "true":
+        return True
+    raise ValueError(
+        f"Invalid value for environment variable {ENV_PHOENIX_POSTGRES_COPY_SPANS}: "
+        f"{copy_spans}. Value values are 'TRUE' and 'FALSE' (case-insensitive)."
+    )
+
+
+def get_env_trace_retention_max_age_days() -> Optional[int]:
+    return _get_env_int(ENV_PHOENIX_TRACE_RETENTION_MAX_AGE_DAYS, 0) or None
+
+
+def get_env_trace_retention_max_spans() -> Optional[int]:
+    return _get_env_int(ENV_PHOENIX_TRACE_RETENTION_MAX_SPANS, 0) or None
+
+
+def get_env_trace_retention_max_database_bytes() -> Optional[int]:
+    return _get_env_int(ENV_PHOENIX_TRACE_RETENTION_MAX_DATABASE_BYTES, 0) or None
+
+
+def get_env_trace_retention_policies() -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+    """
+    Returns (max_age_days, max_spans) keyed by project name.
+    """
+    if not (policies := os.getenv(ENV_PHOENIX_TRACE_RETENTION_POLICIES)):
+        return {}
+    try:
+        parsed = json.loads(policies)
+    except json.JSONDecodeError:
+        parsed = None
+    if not isinstance(parsed, dict) or not all(
+        isinstance(policy, dict)
+        and set(policy) <= {"max_age_days", "max_spans"}
+        and all(
+            isinstance(value, int) and not isinstance(value, bool) and value >= 0
+            for value in policy.values()
+        )
+        for policy in parsed.values()
+    ):
+        raise ValueError(
+            f"Invalid value for environment variable {ENV_PHOENIX_TRACE_RETENTION_POLICIES}: "
+            f"{policies}. Value must be a JSON object mapping project names to objects with "
+            "the optional non-negative integer keys 'max_age_days' and 'max_spans'."
+        )
+    return {
+        name: (policy.get("max_age_days") or None, policy.get("max_spans") or None)
+        for name, policy in parsed.items()
+    }
+
+
+def _get_env_capacity(env_var: str, default: int) -> Optional[int]:
+    """
+    Returns None, i.e. unbounded, if the environment variable is set to 0.
+    """
+    if not (capacity := os.getenv(env_var)):
+        return default
+    if capacity.isnumeric():
+        return int(capacity) or None
+    raise ValueError(
+        f"Invalid value for environment variable {env_var}: "
+        f"{capacity}. Value must be a non-negative integer."
+    )
+
+
 def get_env_host() -> str:
     return os.getenv(ENV_PHOENIX_HOST) or HOST
 
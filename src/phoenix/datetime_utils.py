@@ -89,6 +89,23 @@ def floor_to_minute(dt: datetime) -> datetime:
 MINUTE_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:00%z"
 
 
+def floor_to_hour(dt: datetime) -> datetime:
+    """
+    Floors the datetime to the hour in UTC. A timezone-naive datetime is
+    localized as local timezone first, as with `normalize_datetime`.
+    """
+    utc = cast(datetime, normalize_datetime(dt))
+    return utc.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_to_hour(dt: datetime) -> datetime:
+    """
+    Ceils the datetime to the hour in UTC, the same way as `floor_to_hour`.
+    """
+    floor = floor_to_hour(dt)
+    return floor if floor == normalize_datetime(dt) else floor + timedelta(hours=1)
+
+
 def right_open_time_range(
     min_time: Optional[datetime],
     max_time: Optional[datetime],
@@ -1,14 +1,18 @@
 import asyncio
+import contextlib
 import logging
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from itertools import islice
-from time import perf_counter
+from pathlib import Path
+from time import monotonic, perf_counter
 from typing import (
     Any,
     AsyncContextManager,
     Awaitable,
     Callable,
+    Deque,
+    Dict,
     Iterable,
     List,
     Optional,
@@ -21,23 +25,36 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing_extensions import TypeAlias
 
 import phoenix.trace.v1 as pb
-from phoenix.db.insertion.evaluation import (
-    EvaluationInsertionResult,
-    InsertEvaluationError,
-    insert_evaluation,
-)
-from phoenix.db.insertion.span import SpanInsertionEvent, insert_span
+from phoenix.db.flush_policy import FlushPolicy
+from phoenix.db.insertion.evaluation_batch import insert_evaluation_columns, insert_evaluations
+from phoenix.db.insertion.resolver import ProjectTraceResolver
+from phoenix.db.insertion.span import ClearProjectSpansEvent
+from phoenix.db.insertion.span_batch import insert_spans
+from phoenix.db.spool import Spool, SpoolPosition
 from phoenix.server.api.dataloaders import CacheForDataLoaders
 from phoenix.trace.schemas import Span
+from phoenix.trace.span_evaluations import EvaluationColumns
 
 logger = logging.getLogger(__name__)
 
 ProjectRowId: TypeAlias = int
 
+_MAX_NUM_SPOOL_RECORDS_PER_ITERATION = 10_000
+_MIN_SPOOL_RETRY_DELAY = 0.1
+_MAX_SPOOL_RETRY_DELAY = 30.0
+_LONG_AGO = float("-inf")
+# Evaluations whose span or trace doesn't exist yet are retried this often, until
+# they have waited for too long, or until there are too many of them.
+_PARKED_EVALUATION_RETRY_INTERVAL = 1.0
+_MAX_PARKED_EVALUATION_AGE = 600.0
+_MAX_NUM_PARKED_EVALUATIONS = 100_000
+
 
 @dataclass(frozen=True)
 class TransactionResult:
     updated_project_rowids: Set[ProjectRowId] = field(default_factory=set)
+    failed_transactions: List[Exception] = field(default_factory=list)
+    missing_evaluations: List[pb.Evaluation] = field(default_factory=list)
 
 
 class BulkInserter:
@@ -48,21 +65,31 @@ class BulkInserter:
         cache_for_dataloaders: Optional[CacheForDataLoaders] = None,
         initial_batch_of_spans: Optional[Iterable[Tuple[Span, str]]] = None,
         initial_batch_of_evaluations: Optional[Iterable[pb.Evaluation]] = None,
-        sleep: float = 0.1,
-        max_num_per_transaction: int = 1000,
+        flush_policy: Optional[FlushPolicy] = None,
+        max_queued_spans: Optional[int] = None,
+        max_queued_span_bytes: Optional[int] = None,
+        spool_directory: Optional[Path] = None,
+        copy_spans: bool = False,
         enable_prometheus: bool = False,
     ) -> None:
         """
         :param db: A function to initiate a new database session.
         :param initial_batch_of_spans: Initial batch of spans to insert.
-        :param sleep: The time to sleep between bulk insertions
-        :param max_num_per_transaction: The maximum number of items to insert in a single
-        transaction. Multiple transactions will be used if there are more items in the batch.
+        :param flush_policy: Decides when queued items are inserted, and how many are
+        inserted per transaction.
+        :param max_queued_spans: The maximum number of spans reserved via `reserve_spans`
+        that may be waiting to be inserted. None means unbounded.
+        :param max_queued_span_bytes: The maximum total size in bytes of the spans reserved
+        via `reserve_spans` that may be waiting to be inserted. None means unbounded.
+        :param spool_directory: If given, queued spans and evaluations are appended to
+        an on-disk spool in this directory instead of being held in memory, and what
+        was left in the spool by a previous run is inserted first.
+        :param copy_spans: Whether to write spans with COPY when the database is
+        PostgreSQL.
         """
         self._db = db
         self._running = False
-        self._sleep = sleep
-        self._max_num_per_transaction = max_num_per_transaction
+        self._flush_policy = flush_policy or FlushPolicy()
         self._spans: List[Tuple[Span, str]] = (
             [] if initial_batch_of_spans is None else list(initial_batch_of_spans)
         )
@@ -73,35 +100,255 @@ class BulkInserter:
         self._last_updated_at_by_project: LRUCache[ProjectRowId, datetime] = LRUCache(maxsize=100)
         self._cache_for_dataloaders = cache_for_dataloaders
         self._enable_prometheus = enable_prometheus
+        self._resolver = ProjectTraceResolver()
+        self._max_queued_spans = max_queued_spans
+        self._max_queued_span_bytes = max_queued_span_bytes
+        self._num_queued_spans = 0
+        self._num_queued_span_bytes = 0
+        # Reservations in the order they were made, as (num_spans, num_bytes).
+        self._reservations: Deque[Tuple[int, int]] = deque()
+        self._spool = None if spool_directory is None else Spool(spool_directory)
+        self._spool_retry_delay = 0.0
+        self._copy_spans = copy_spans
+        # What has been queued since the last flush, for the flush policy. Anything
+        # there before the inserter starts is flushed right away.
+        self._num_unflushed = 0
+        self._num_unflushed_bytes = 0
+        self._first_unflushed_at: Optional[float] = (
+            _LONG_AGO
+            if self._spans
+            or self._evaluations
+            or (self._spool is not None and self._spool.has_unread())
+            else None
+        )
+        # Evaluations whose span or trace doesn't exist yet, as (evaluation, parked_at),
+        # in the order they were parked.
+        self._parked_evaluations: Deque[Tuple[pb.Evaluation, float]] = deque()
+        self._parked_evaluations_retried_at = 0.0
+        self._flush_requested: asyncio.Event
 
     def last_updated_at(self, project_rowid: Optional[ProjectRowId] = None) -> Optional[datetime]:
         if isinstance(project_rowid, ProjectRowId):
             return self._last_updated_at_by_project.get(project_rowid)
         return max(self._last_updated_at_by_project.values(), default=None)
 
+    def invalidate(self, event: ClearProjectSpansEvent) -> None:
+        """
+        Drops the cached rowids of a project whose spans have been cleared or
+        that has been deleted.
+        """
+        self._resolver.invalidate(event)
+
+    def reserve_spans(self, num_spans: int, num_bytes: int) -> bool:
+        """
+        Reserves room in the queue for a request's worth of spans before they
+        are queued. Returns False if the queue is full, in which case the
+        request should be rejected with a retryable error so that the client
+        backs off. The room is given back once the spans have been inserted.
+        """
+        if (
+            self._max_queued_spans is not None
+            and self._num_queued_spans + num_spans > self._max_queued_spans
+        ) or (
+            self._max_queued_span_bytes is not None
+            and self._num_queued_span_bytes + num_bytes > self._max_queued_span_bytes
+        ):
+            if self._enable_prometheus:
+                from phoenix.server.prometheus import BULK_LOADER_REJECTED_SPANS
+
+                BULK_LOADER_REJECTED_SPANS.inc(num_spans)
+            return False
+        self._num_queued_spans += num_spans
+        self._num_queued_span_bytes += num_bytes
+        self._num_unflushed_bytes += num_bytes
+        self._reservations.append((num_spans, num_bytes))
+        self._update_queue_depth()
+        return True
+
+    def _release_spans(self, num_spans: int) -> None:
+        # Spans queued without a reservation (e.g. the initial batch) can make
+        # this overshoot, so it stops once there's nothing left to release.
+        while num_spans > 0 and self._reservations:
+            reserved_spans, reserved_bytes = self._reservations.popleft()
+            if reserved_spans > num_spans:
+                released_bytes = reserved_bytes * num_spans // reserved_spans
+                self._reservations.appendleft(
+                    (reserved_spans - num_spans, reserved_bytes - released_bytes)
+                )
+                reserved_spans, reserved_bytes = num_spans, released_bytes
+            self._num_queued_spans -= reserved_spans
+            self._num_queued_span_bytes -= reserved_bytes
+            num_spans -= reserved_spans
+        self._update_queue_depth()
+
+    def _update_queue_depth(self) -> None:
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import (
+                BULK_LOADER_QUEUED_SPAN_BYTES,
+                BULK_LOADER_QUEUED_SPANS,
+            )
+
+            BULK_LOADER_QUEUED_SPANS.set(self._num_queued_spans)
+            BULK_LOADER_QUEUED_SPAN_BYTES.set(self._num_queued_span_bytes)
+
     async def __aenter__(
         self,
     ) -> Tuple[Callable[[Span, str], Awaitable[None]], Callable[[pb.Evaluation], Awaitable[None]]]:
         self._running = True
+        self._flush_requested = asyncio.Event()
         self._task = asyncio.create_task(self._bulk_insert())
         return self._queue_span, self._queue_evaluation
 
     async def __aexit__(self, *args: Any) -> None:
         self._running = False
+        self._flush_requested.set()
+
+    async def insert_evaluation_columns(self, columns: EvaluationColumns) -> None:
+        """
+        Inserts evaluations that are laid out column by column right away instead
+        of queueing them one by one. Those whose span or trace doesn't exist yet are
+        parked like the queued ones. If the insertion fails, the evaluations that
+        haven't been inserted are queued instead, so they're retried like the rest.
+        """
+        start = 0
+        while start < len(columns):
+            part = columns.slice(start, start + self._flush_policy.transaction_size)
+            try:
+                begin = perf_counter()
+                async with self._db() as session:
+                    if self._enable_prometheus:
+                        from phoenix.server.prometheus import BULK_LOADER_EVALUATION_INSERTIONS
+
+                        BULK_LOADER_EVALUATION_INSERTIONS.inc(len(part))
+                    result = await insert_evaluation_columns(session, part)
+                self._observe_commit(len(part), perf_counter() - begin)
+            except Exception:
+                if self._enable_prometheus:
+                    from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
+
+                    BULK_LOADER_EXCEPTIONS.inc()
+                logger.exception("Failed to insert evaluations, queueing them instead")
+                for evaluation in columns.slice(start, len(columns)).to_evaluations():
+                    await self._queue_evaluation(evaluation)
+                return
+            start += len(part)
+            if self._enable_prometheus:
+                from phoenix.server.prometheus import BULK_LOADER_INSERTION_TIME
+
+                BULK_LOADER_INSERTION_TIME.observe(perf_counter() - begin)
+                if result.num_failures:
+                    from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
+
+                    BULK_LOADER_EXCEPTIONS.inc(result.num_failures)
+            for event in result.events:
+                self._last_updated_at_by_project[event.project_rowid] = datetime.now(timezone.utc)
+                if (cache := self._cache_for_dataloaders) is not None:
+                    cache.invalidate(event)
+            if result.missing:
+                self._park_evaluations(list(part.to_evaluations(result.missing)), {})
+                # The wait for the next retry has to take them into account.
+                self._flush_requested.set()
 
     async def _queue_span(self, span: Span, project_name: str) -> None:
-        self._spans.append((span, project_name))
+        if self._spool is not None:
+            self._spool.append_span(span, project_name)
+        else:
+            self._spans.append((span, project_name))
+        self._on_queued()
 
     async def _queue_evaluation(self, evaluation: pb.Evaluation) -> None:
-        self._evaluations.append(evaluation)
+        if self._spool is not None:
+            self._spool.append_evaluation(evaluation)
+        else:
+            self._evaluations.append(evaluation)
+        self._on_queued()
+
+    def _on_queued(self) -> None:
+        self._num_unflushed += 1
+        if self._first_unflushed_at is None:
+            self._first_unflushed_at = monotonic()
+        if self._is_flush_due():
+            self._flush_requested.set()
+
+    def _is_flush_due(self) -> bool:
+        return self._flush_policy.is_due(
+            self._num_unflushed, self._num_unflushed_bytes, self._first_unflushed_at
+        )
+
+    def _time_until_parked_evaluations_are_due(self) -> Optional[float]:
+        if not self._parked_evaluations:
+            return None
+        return max(
+            0.0,
+            self._parked_evaluations_retried_at + _PARKED_EVALUATION_RETRY_INTERVAL - monotonic(),
+        )
+
+    def _park_evaluations(
+        self, evaluations: List[pb.Evaluation], retried: Dict[int, float]
+    ) -> None:
+        """
+        :param evaluations: The evaluations whose span or trace doesn't exist yet.
+        :param retried: When each of the evaluations being retried was first parked,
+        keyed by `id`.
+        """
+        now = monotonic()
+        if evaluations:
+            self._parked_evaluations_retried_at = now
+        for evaluation in evaluations:
+            self._parked_evaluations.append((evaluation, retried.get(id(evaluation), now)))
+        num_dropped = 0
+        while self._parked_evaluations and (
+            len(self._parked_evaluations) > _MAX_NUM_PARKED_EVALUATIONS
+            or now - self._parked_evaluations[0][1] > _MAX_PARKED_EVALUATION_AGE
+        ):
+            self._parked_evaluations.popleft()
+            num_dropped += 1
+        if num_dropped:
+            logger.error(
+                f"Dropped {num_dropped} evaluations whose span or trace could not be found"
+            )
+            if self._enable_prometheus:
+                from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
+
+                BULK_LOADER_EXCEPTIONS.inc(num_dropped)
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import BULK_LOADER_PARKED_EVALUATIONS
+
+            BULK_LOADER_PARKED_EVALUATIONS.set(len(self._parked_evaluations))
+
+    def _has_unread_spool(self) -> bool:
+        # The spool is durable, so it isn't drained once the inserter is stopped.
+        return self._running and self._spool is not None and self._spool.has_unread()
 
     async def _bulk_insert(self) -> None:
         spans_buffer, evaluations_buffer = None, None
-        # start first insert immediately if the inserter has not run recently
+        spool_position: Optional[SpoolPosition] = None
         while self._spans or self._evaluations or self._running:
-            if not (self._spans or self._evaluations):
-                await asyncio.sleep(self._sleep)
+            if self._spool is not None:
+                self._spool.sync()
+            time_until_retry = self._time_until_parked_evaluations_are_due()
+            if self._running and not self._is_flush_due() and time_until_retry != 0:
+                # Wait for the oldest item to linger long enough, or for the parked
+                # evaluations to be retried, or to be woken up early when enough
+                # items have been queued.
+                timeouts = [
+                    timeout
+                    for timeout in (
+                        self._flush_policy.time_until_due(self._first_unflushed_at),
+                        time_until_retry,
+                    )
+                    if timeout is not None
+                ]
+                self._flush_requested.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        self._flush_requested.wait(),
+                        min(timeouts, default=None),
+                    )
                 continue
+            self._num_unflushed = 0
+            self._num_unflushed_bytes = 0
+            self._first_unflushed_at = None
             # It's important to grab the buffers at the same time so there's
             # no race condition, since an eval insertion will fail if the span
             # it references doesn't exist. Grabbing the eval buffer later may
@@ -113,53 +360,121 @@ class BulkInserter:
             if self._evaluations:
                 evaluations_buffer = self._evaluations
                 self._evaluations = []
+            if self._has_unread_spool():
+                assert self._spool is not None
+                records, spool_position = self._spool.read(_MAX_NUM_SPOOL_RECORDS_PER_ITERATION)
+                if len(records) == _MAX_NUM_SPOOL_RECORDS_PER_ITERATION:
+                    # There may be more, which shouldn't wait for new items to arrive.
+                    self._first_unflushed_at = _LONG_AGO
+                for record in records:
+                    if isinstance(record, pb.Evaluation):
+                        evaluations_buffer = evaluations_buffer or []
+                        evaluations_buffer.append(record)
+                    else:
+                        spans_buffer = spans_buffer or []
+                        spans_buffer.append(record)
+            # Parked evaluations are retried along with the new ones, in particular
+            # whenever new spans are inserted, since they may be what's missing.
+            retried: Dict[int, float] = {}
+            if self._parked_evaluations and (spans_buffer or time_until_retry == 0):
+                retried = {id(evaluation): at for evaluation, at in self._parked_evaluations}
+                evaluations_buffer = [evaluation for evaluation, _ in self._parked_evaluations] + (
+                    evaluations_buffer or []
+                )
+                self._parked_evaluations.clear()
             # Spans should be inserted before the evaluations, since an evaluation
-            # insertion will fail if the span it references doesn't exist.
+            # is parked if the span it references doesn't exist.
             transaction_result = TransactionResult()
+            num_spans = len(spans_buffer) if spans_buffer else 0
+            if self._enable_prometheus:
+                from phoenix.server.prometheus import BULK_LOADER_BATCH_SIZE
+
+                num_evaluations = len(evaluations_buffer) if evaluations_buffer else 0
+                BULK_LOADER_BATCH_SIZE.observe(num_spans + num_evaluations)
             if spans_buffer:
                 result = await self._insert_spans(spans_buffer)
                 transaction_result.updated_project_rowids.update(result.updated_project_rowids)
+                transaction_result.failed_transactions.extend(result.failed_transactions)
                 spans_buffer = None
             if evaluations_buffer:
                 result = await self._insert_evaluations(evaluations_buffer)
                 transaction_result.updated_project_rowids.update(result.updated_project_rowids)
+                transaction_result.failed_transactions.extend(result.failed_transactions)
+                transaction_result.missing_evaluations.extend(result.missing_evaluations)
                 evaluations_buffer = None
+            missing_evaluations = transaction_result.missing_evaluations
+            if spool_position is not None and transaction_result.failed_transactions:
+                # The ones read from the spool are read again once it's rewound.
+                missing_evaluations = [
+                    evaluation for evaluation in missing_evaluations if id(evaluation) in retried
+                ]
+            self._park_evaluations(missing_evaluations, retried)
+            if spool_position is not None and transaction_result.failed_transactions:
+                # Read the records again, since they may not all have been inserted.
+                # Re-inserting the ones that were is a no-op.
+                assert self._spool is not None
+                self._spool.rewind()
+                spool_position = None
+                self._first_unflushed_at = _LONG_AGO
+                self._spool_retry_delay = min(
+                    max(2 * self._spool_retry_delay, _MIN_SPOOL_RETRY_DELAY),
+                    _MAX_SPOOL_RETRY_DELAY,
+                )
+                await asyncio.sleep(self._spool_retry_delay)
+                continue
+            if spool_position is not None:
+                assert self._spool is not None
+                self._spool.commit(spool_position)
+                spool_position = None
+            self._spool_retry_delay = 0.0
+            self._release_spans(num_spans)
             for project_rowid in transaction_result.updated_project_rowids:
                 self._last_updated_at_by_project[project_rowid] = datetime.now(timezone.utc)
-            await asyncio.sleep(self._sleep)
+        if self._spool is not None:
+            # Parked evaluations are only held in memory, so they're put back in the
+            # spool to be retried by the next run.
+            for evaluation, _ in self._parked_evaluations:
+                self._spool.append_evaluation(evaluation)
+            self._spool.close()
+        elif self._parked_evaluations:
+            logger.error(
+                f"Dropped {len(self._parked_evaluations)} evaluations "
+                "whose span or trace could not be found"
+            )
 
     async def _insert_spans(self, spans: List[Tuple[Span, str]]) -> TransactionResult:
         transaction_result = TransactionResult()
-        for i in range(0, len(spans), self._max_num_per_transaction):
+        i = 0
+        while i < len(spans):
+            batch = spans[i : i + self._flush_policy.transaction_size]
+            i += len(batch)
             try:
                 start = perf_counter()
                 async with self._db() as session:
-                    for span, project_name in islice(spans, i, i + self._max_num_per_transaction):
-                        if self._enable_prometheus:
-                            from phoenix.server.prometheus import BULK_LOADER_SPAN_INSERTIONS
-
-                            BULK_LOADER_SPAN_INSERTIONS.inc()
-                        result: Optional[SpanInsertionEvent] = None
-                        try:
-                            async with session.begin_nested():
-                                result = await insert_span(session, span, project_name)
-                        except Exception:
-                            if self._enable_prometheus:
-                                from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
-
-                                BULK_LOADER_EXCEPTIONS.inc()
-                            logger.exception(
-                                f"Failed to insert span with span_id={span.context.span_id}"
-                            )
-                        if result is not None:
-                            transaction_result.updated_project_rowids.add(result.project_rowid)
-                            if (cache := self._cache_for_dataloaders) is not None:
-                                cache.invalidate(result)
+                    if self._enable_prometheus:
+                        from phoenix.server.prometheus import BULK_LOADER_SPAN_INSERTIONS
+
+                        BULK_LOADER_SPAN_INSERTIONS.inc(len(batch))
+                    result = await insert_spans(
+                        session, batch, resolver=self._resolver, use_copy=self._copy_spans
+                    )
+                self._resolver.commit()
+                self._observe_commit(len(batch), perf_counter() - start)
+                if self._enable_prometheus and result.num_failures:
+                    from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
+
+                    BULK_LOADER_EXCEPTIONS.inc(result.num_failures)
+                for event in result.events:
+                    transaction_result.updated_project_rowids.add(event.project_rowid)
+                    if (cache := self._cache_for_dataloaders) is not None:
+                        cache.invalidate(event)
                 if self._enable_prometheus:
                     from phoenix.server.prometheus import BULK_LOADER_INSERTION_TIME
 
                     BULK_LOADER_INSERTION_TIME.observe(perf_counter() - start)
-            except Exception:
+            except Exception as error:
+                self._resolver.rollback()
+                transaction_result.failed_transactions.append(error)
                 if self._enable_prometheus:
                     from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
 
@@ -169,37 +484,44 @@ class BulkInserter:
 
     async def _insert_evaluations(self, evaluations: List[pb.Evaluation]) -> TransactionResult:
         transaction_result = TransactionResult()
-        for i in range(0, len(evaluations), self._max_num_per_transaction):
+        i = 0
+        while i < len(evaluations):
+            batch = evaluations[i : i + self._flush_policy.transaction_size]
+            i += len(batch)
             try:
                 start = perf_counter()
                 async with self._db() as session:
-                    for evaluation in islice(evaluations, i, i + self._max_num_per_transaction):
-                        if self._enable_prometheus:
-                            from phoenix.server.prometheus import BULK_LOADER_EVALUATION_INSERTIONS
-
-                            BULK_LOADER_EVALUATION_INSERTIONS.inc()
-                        result: Optional[EvaluationInsertionResult] = None
-                        try:
-                            async with session.begin_nested():
-                                result = await insert_evaluation(session, evaluation)
-                        except InsertEvaluationError as error:
-                            if self._enable_prometheus:
-                                from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
-
-                                BULK_LOADER_EXCEPTIONS.inc()
-                            logger.exception(f"Failed to insert evaluation: {str(error)}")
-                        if result is not None:
-                            transaction_result.updated_project_rowids.add(result.project_rowid)
-                            if (cache := self._cache_for_dataloaders) is not None:
-                                cache.invalidate(result)
+                    if self._enable_prometheus:
+                        from phoenix.server.prometheus import BULK_LOADER_EVALUATION_INSERTIONS
+
+                        BULK_LOADER_EVALUATION_INSERTIONS.inc(len(batch))
+                    result = await insert_evaluations(session, batch)
+                self._observe_commit(len(batch), perf_counter() - start)
+                if self._enable_prometheus and result.num_failures:
+                    from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
+
+                    BULK_LOADER_EXCEPTIONS.inc(result.num_failures)
+                transaction_result.missing_evaluations.extend(result.missing)
+                for event in result.events:
+                    transaction_result.updated_project_rowids.add(event.project_rowid)
+                    if (cache := self._cache_for_dataloaders) is not None:
+                        cache.invalidate(event)
                 if self._enable_prometheus:
                     from phoenix.server.prometheus import BULK_LOADER_INSERTION_TIME
 
                     BULK_LOADER_INSERTION_TIME.observe(perf_counter() - start)
-            except Exception:
+            except Exception as error:
+                transaction_result.failed_transactions.append(error)
                 if self._enable_prometheus:
                     from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
 
                     BULK_LOADER_EXCEPTIONS.inc()
                 logger.exception("Failed to insert evaluations")
         return transaction_result
+
+    def _observe_commit(self, num_items: int, latency: float) -> None:
+        self._flush_policy.observe_commit(num_items, latency)
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import BULK_LOADER_TRANSACTION_SIZE
+
+            BULK_LOADER_TRANSACTION_SIZE.observe(num_items)
@@ -103,7 +103,7 @@ def aio_sqlite_engine(
     engine = create_async_engine(
         url=url,
         echo=echo,
-        json_serializer=_dumps,
+        json_serializer=dumps_json,
         async_creator=async_creator,
     )
     event.listen(engine.sync_engine, "connect", set_sqlite_pragma)
@@ -126,14 +126,14 @@ def aio_postgresql_engine(
     migrate: bool = True,
     echo: bool = False,
 ) -> AsyncEngine:
-    engine = create_async_engine(url=url, echo=echo, json_serializer=_dumps)
+    engine = create_async_engine(url=url, echo=echo, json_serializer=dumps_json)
     if not migrate:
         return engine
     migrate_in_thread(engine.url)
     return engine
 
 
-def _dumps(obj: Any) -> str:
+def dumps_json(obj: Any) -> str:
     return json.dumps(obj, cls=_Encoder)
 
 
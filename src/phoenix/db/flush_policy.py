@@ -0,0 +1,80 @@
+from time import monotonic
+from typing import Optional
+
+from phoenix.config import (
+    BULK_INSERTER_BATCH_SIZE,
+    BULK_INSERTER_MAX_BATCH_BYTES,
+    BULK_INSERTER_MAX_LINGER_MS,
+    BULK_INSERTER_MAX_TRANSACTION_SIZE,
+    BULK_INSERTER_MIN_TRANSACTION_SIZE,
+    BULK_INSERTER_TARGET_COMMIT_LATENCY_MS,
+)
+
+
+class FlushPolicy:
+    def __init__(
+        self,
+        *,
+        batch_size: int = BULK_INSERTER_BATCH_SIZE,
+        max_linger: float = BULK_INSERTER_MAX_LINGER_MS / 1000,
+        max_bytes: int = BULK_INSERTER_MAX_BATCH_BYTES,
+        min_transaction_size: int = BULK_INSERTER_MIN_TRANSACTION_SIZE,
+        max_transaction_size: int = BULK_INSERTER_MAX_TRANSACTION_SIZE,
+        target_commit_latency: float = BULK_INSERTER_TARGET_COMMIT_LATENCY_MS / 1000,
+    ) -> None:
+        """
+        Decides when the bulk inserter flushes what it has queued, and how many
+        items it inserts per transaction.
+
+        :param batch_size: Flush as soon as this many items are queued.
+        :param max_linger: Flush once the oldest queued item has waited this many
+        seconds, however few items are queued.
+        :param max_bytes: Flush as soon as the queued items add up to this many bytes.
+        :param min_transaction_size: The smallest number of items per transaction.
+        :param max_transaction_size: The largest number of items per transaction.
+        :param target_commit_latency: The number of seconds a transaction should take.
+        The transaction size is halved when a transaction takes longer, and grown
+        when a full transaction takes less than half as long.
+        """
+        self._batch_size = batch_size
+        self._max_linger = max_linger
+        self._max_bytes = max_bytes
+        self._min_transaction_size = min_transaction_size
+        self._max_transaction_size = max_transaction_size
+        self._target_commit_latency = target_commit_latency
+        self._transaction_size = min(max(batch_size, min_transaction_size), max_transaction_size)
+
+    @property
+    def transaction_size(self) -> int:
+        return self._transaction_size
+
+    def is_due(self, num_items: int, num_bytes: int, oldest: Optional[float]) -> bool:
+        """
+        :param num_items: The number of items queued since the last flush.
+        :param num_bytes: The size of the items queued since the last flush.
+        :param oldest: When the oldest of them was queued, according to
+        `time.monotonic`, or None if nothing has been queued.
+        """
+        return (
+            num_items >= self._batch_size
+            or num_bytes >= self._max_bytes
+            or (oldest is not None and monotonic() - oldest >= self._max_linger)
+        )
+
+    def time_until_due(self, oldest: Optional[float]) -> Optional[float]:
+        """
+        Returns the number of seconds until the oldest queued item has lingered
+        for long enough, or None if nothing has been queued.
+        """
+        if oldest is None:
+            return None
+        return max(0.0, oldest + self._max_linger - monotonic())
+
+    def observe_commit(self, num_items: int, latency: float) -> None:
+        if latency > self._target_commit_latency:
+            self._transaction_size = max(self._min_transaction_size, self._transaction_size // 2)
+        elif latency < self._target_commit_latency / 2 and num_items >= self._transaction_size:
+            self._transaction_size = min(
+                self._max_transaction_size,
+                self._transaction_size + max(1, self._transaction_size // 4),
+            )
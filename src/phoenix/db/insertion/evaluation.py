@@ -112,14 +112,10 @@ async def _insert_span_evaluation(
     score: Optional[float],
     explanation: Optional[str],
 ) -> SpanEvaluationInsertionEvent:
-    stmt = (
-        select(
-            models.Trace.project_rowid,
-            models.Span.id,
-        )
-        .join_from(models.Span, models.Trace)
-        .where(models.Span.span_id == span_id)
-    )
+    stmt = select(
+        models.Span.project_rowid,
+        models.Span.id,
+    ).where(models.Span.span_id == span_id)
     if not (row := (await session.execute(stmt)).first()):
         raise InsertEvaluationError(
             f"Cannot insert a span evaluation for a missing span: {evaluation_name=}, {span_id=}"
@@ -162,15 +158,11 @@ async def _insert_document_evaluation(
     explanation: Optional[str],
 ) -> EvaluationInsertionResult:
     dialect = SupportedSQLDialect(session.bind.dialect.name)
-    stmt = (
-        select(
-            models.Trace.project_rowid,
-            models.Span.id,
-            num_docs_col(dialect),
-        )
-        .join_from(models.Span, models.Trace)
-        .where(models.Span.span_id == span_id)
-    )
+    stmt = select(
+        models.Span.project_rowid,
+        models.Span.id,
+        num_docs_col(dialect),
+    ).where(models.Span.span_id == span_id)
     if not (row := (await session.execute(stmt)).first()):
         raise InsertEvaluationError(
             f"Cannot insert a document evaluation for a missing span: {span_id=}"
@@ -0,0 +1,403 @@
+"""
+Set-based insertion of a batch of evaluations. Instead of resolving and
+upserting each evaluation inside its own savepoint (as `insert_evaluation`
+does), the evaluations are grouped by kind, the spans and traces they refer to
+are resolved with one IN query per chunk of ids, and the annotations are
+upserted with multi-row INSERT ... ON CONFLICT DO UPDATE statements. If a
+multi-row statement fails, only the evaluations in that statement are retried
+one by one, each inside its own savepoint.
+
+Evaluations that arrive column by column, e.g. from an Arrow record batch, go
+through the same steps without being turned into protobuf messages first.
+
+Evaluations whose span or trace doesn't exist (yet) are not treated as errors.
+They are handed back to the caller, who may retry them later, e.g. once the
+span they refer to has been inserted.
+"""
+
+import logging
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from sqlalchemy import literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import TypeAlias, assert_never
+
+import phoenix.trace.v1 as pb
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect, num_docs_col
+from phoenix.db.insertion.evaluation import (
+    DocumentEvaluationInsertionEvent,
+    EvaluationInsertionResult,
+    SpanEvaluationInsertionEvent,
+    TraceEvaluationInsertionEvent,
+)
+from phoenix.db.insertion.helpers import (
+    OnConflict,
+    chunks,
+    excluded,
+    insert_stmt,
+    max_rows_per_statement,
+)
+from phoenix.trace.schemas import SpanID, TraceID
+from phoenix.trace.span_evaluations import (
+    DocumentEvaluations,
+    EvaluationColumns,
+    SpanEvaluations,
+    TraceEvaluations,
+)
+
+logger = logging.getLogger(__name__)
+
+EvaluationName: TypeAlias = str
+ProjectRowId: TypeAlias = int
+SpanRowId: TypeAlias = int
+TraceRowId: TypeAlias = int
+DocumentPosition: TypeAlias = int
+
+
+class EvaluationBatchInsertionResult(NamedTuple):
+    events: List[EvaluationInsertionResult]
+    """One insertion event per project, evaluation name and kind of evaluation."""
+    missing: List[pb.Evaluation]
+    """The evaluations whose span or trace doesn't exist, in their original order."""
+    num_failures: int = 0
+    """The number of evaluations that could not be inserted due to errors."""
+
+
+class EvaluationColumnsInsertionResult(NamedTuple):
+    events: List[EvaluationInsertionResult]
+    """One insertion event per project, evaluation name and kind of evaluation."""
+    missing: List[int]
+    """The rows whose span or trace doesn't exist, in order."""
+    num_failures: int = 0
+    """The number of rows that could not be inserted due to errors."""
+
+
+class _Result(NamedTuple):
+    label: Optional[str]
+    score: Optional[float]
+    explanation: Optional[str]
+
+
+async def insert_evaluations(
+    session: AsyncSession,
+    evaluations: Iterable[pb.Evaluation],
+    *,
+    max_rows_per_upsert: Optional[int] = None,
+) -> EvaluationBatchInsertionResult:
+    """
+    Inserts a batch of evaluations, replacing existing annotations with the same
+    name and subject. When the batch has more than one evaluation for the same
+    name and subject, the last one wins, which is also what happens when they are
+    inserted one at a time. By default, the number of rows per statement is the
+    most that stays within the dialect's limit on bind parameters.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    grouped = _Grouped()
+    num_failures = 0
+    evaluations = list(evaluations)
+    for i, evaluation in enumerate(evaluations):
+        result = _result(evaluation)
+        name = evaluation.name
+        subject_id = evaluation.subject_id
+        if (evaluation_kind := subject_id.WhichOneof("kind")) is None:
+            num_failures += 1
+            logger.error(f"Cannot insert an evaluation that has no evaluation kind: {name=}")
+        elif evaluation_kind == "trace_id":
+            grouped.trace_evaluations[name, subject_id.trace_id] = i, result
+        elif evaluation_kind == "span_id":
+            grouped.span_evaluations[name, subject_id.span_id] = i, result
+        elif evaluation_kind == "document_retrieval_id":
+            document_retrieval_id = subject_id.document_retrieval_id
+            grouped.document_evaluations[
+                name, document_retrieval_id.span_id, document_retrieval_id.document_position
+            ] = i, result
+        else:
+            assert_never(evaluation_kind)
+    events, missing, failures = await _insert_grouped(
+        session, dialect, grouped, max_rows_per_upsert
+    )
+    return EvaluationBatchInsertionResult(
+        events,
+        [evaluations[i] for i in missing],
+        num_failures + failures,
+    )
+
+
+async def insert_evaluation_columns(
+    session: AsyncSession,
+    columns: EvaluationColumns,
+    *,
+    max_rows_per_upsert: Optional[int] = None,
+) -> EvaluationColumnsInsertionResult:
+    """
+    Same as `insert_evaluations`, but for evaluations that are already laid out
+    column by column, e.g. when they come from an Arrow record batch, so that no
+    object has to be created per evaluation.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    grouped = _Grouped()
+    name = columns.eval_name
+    results = map(_Result, columns.labels, columns.scores, columns.explanations)
+    if columns.evaluations_cls is TraceEvaluations:
+        grouped.trace_evaluations.update(
+            ((name, trace_id), (i, result))
+            for i, (trace_id, result) in enumerate(zip(columns.ids, results))
+        )
+    elif columns.evaluations_cls is SpanEvaluations:
+        grouped.span_evaluations.update(
+            ((name, span_id), (i, result))
+            for i, (span_id, result) in enumerate(zip(columns.ids, results))
+        )
+    elif columns.evaluations_cls is DocumentEvaluations:
+        grouped.document_evaluations.update(
+            ((name, span_id, document_position), (i, result))
+            for i, (span_id, document_position, result) in enumerate(
+                zip(columns.ids, columns.document_positions, results)
+            )
+        )
+    else:
+        raise ValueError(f"Unexpected kind of evaluations: {columns.evaluations_cls.__name__}")
+    events, missing, num_failures = await _insert_grouped(
+        session, dialect, grouped, max_rows_per_upsert
+    )
+    return EvaluationColumnsInsertionResult(events, missing, num_failures)
+
+
+class _Grouped:
+    """
+    The evaluations of a batch grouped by kind, keyed by name and subject, along
+    with their position in the batch.
+    """
+
+    def __init__(self) -> None:
+        self.trace_evaluations: Dict[Tuple[EvaluationName, TraceID], Tuple[int, _Result]] = {}
+        self.span_evaluations: Dict[Tuple[EvaluationName, SpanID], Tuple[int, _Result]] = {}
+        self.document_evaluations: Dict[
+            Tuple[EvaluationName, SpanID, DocumentPosition], Tuple[int, _Result]
+        ] = {}
+
+
+async def _insert_grouped(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    grouped: _Grouped,
+    max_rows_per_upsert: Optional[int],
+) -> Tuple[List[EvaluationInsertionResult], List[int], int]:
+    """
+    Returns the insertion events, the positions in the batch of the evaluations
+    whose span or trace doesn't exist, in order, and the number of failures.
+    """
+    trace_evaluations = grouped.trace_evaluations
+    span_evaluations = grouped.span_evaluations
+    document_evaluations = grouped.document_evaluations
+    num_failures = 0
+    traces = await _get_traces(session, dialect, {trace_id for _, trace_id in trace_evaluations})
+    spans = await _get_spans(
+        session,
+        dialect,
+        {span_id for _, span_id in span_evaluations}
+        | {span_id for _, span_id, _ in document_evaluations},
+        include_num_docs=bool(document_evaluations),
+    )
+    missing: List[int] = []
+    events: Set[EvaluationInsertionResult] = set()
+    trace_rows: List[Tuple[ProjectRowId, Dict[str, Any]]] = []
+    for (name, trace_id), (i, result) in trace_evaluations.items():
+        if (trace := traces.get(trace_id)) is None:
+            missing.append(i)
+            continue
+        trace_rowid, project_rowid = trace
+        trace_rows.append(
+            (project_rowid, dict(trace_rowid=trace_rowid, name=name, **_values(result)))
+        )
+    span_rows: List[Tuple[ProjectRowId, Dict[str, Any]]] = []
+    for (name, span_id), (i, result) in span_evaluations.items():
+        if (span := spans.get(span_id)) is None:
+            missing.append(i)
+            continue
+        span_rowid, project_rowid, _ = span
+        span_rows.append((project_rowid, dict(span_rowid=span_rowid, name=name, **_values(result))))
+    document_rows: List[Tuple[ProjectRowId, Dict[str, Any]]] = []
+    for (name, span_id, document_position), (i, result) in document_evaluations.items():
+        if (span := spans.get(span_id)) is None:
+            missing.append(i)
+            continue
+        span_rowid, project_rowid, num_docs = span
+        if num_docs is None or num_docs <= document_position:
+            num_failures += 1
+            logger.error(
+                f"Cannot insert a document evaluation for a non-existent "
+                f"document position: {name=}, {span_id=}, {document_position=}"
+            )
+            continue
+        document_rows.append(
+            (
+                project_rowid,
+                dict(
+                    span_rowid=span_rowid,
+                    document_position=document_position,
+                    name=name,
+                    **_values(result),
+                ),
+            )
+        )
+    for table, constraint, column_names, event_type, rows in (
+        (
+            models.TraceAnnotation,
+            "uq_trace_annotations_name_trace_rowid",
+            ("name", "trace_rowid"),
+            TraceEvaluationInsertionEvent,
+            trace_rows,
+        ),
+        (
+            models.SpanAnnotation,
+            "uq_span_annotations_name_span_rowid",
+            ("name", "span_rowid"),
+            SpanEvaluationInsertionEvent,
+            span_rows,
+        ),
+        (
+            models.DocumentAnnotation,
+            "uq_document_annotations_name_span_rowid_document_position",
+            ("name", "span_rowid", "document_position"),
+            DocumentEvaluationInsertionEvent,
+            document_rows,
+        ),
+    ):
+        if not rows:
+            continue
+        size = max_rows_per_upsert or max_rows_per_statement(dialect, len(table.__table__.columns))
+        for chunk in chunks(rows, size):
+            inserted, failures = await _upsert(
+                session, dialect, table, constraint, column_names, chunk
+            )
+            num_failures += failures
+            events.update(
+                event_type(project_rowid, values["name"]) for project_rowid, values in inserted
+            )
+    return list(events), sorted(missing), num_failures
+
+
+async def _get_traces(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    trace_ids: Iterable[TraceID],
+) -> Dict[TraceID, Tuple[TraceRowId, ProjectRowId]]:
+    traces: Dict[TraceID, Tuple[TraceRowId, ProjectRowId]] = {}
+    for chunk in chunks(trace_ids, max_rows_per_statement(dialect, 1)):
+        stmt = select(
+            models.Trace.trace_id,
+            models.Trace.id,
+            models.Trace.project_rowid,
+        ).where(models.Trace.trace_id.in_(chunk))
+        for trace_id, trace_rowid, project_rowid in await session.execute(stmt):
+            traces[trace_id] = trace_rowid, project_rowid
+    return traces
+
+
+async def _get_spans(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    span_ids: Iterable[SpanID],
+    include_num_docs: bool,
+) -> Dict[SpanID, Tuple[SpanRowId, ProjectRowId, Optional[int]]]:
+    """
+    Returns the rowids of the spans and their projects, along with the number of
+    documents of each span if `include_num_docs` is True.
+    """
+    spans: Dict[SpanID, Tuple[SpanRowId, ProjectRowId, Optional[int]]] = {}
+    for chunk in chunks(span_ids, max_rows_per_statement(dialect, 1)):
+        stmt = select(
+            models.Span.span_id,
+            models.Span.id,
+            models.Span.project_rowid,
+            num_docs_col(dialect) if include_num_docs else literal(None),
+        ).where(models.Span.span_id.in_(chunk))
+        for span_id, span_rowid, project_rowid, num_docs in await session.execute(stmt):
+            spans[span_id] = span_rowid, project_rowid, num_docs
+    return spans
+
+
+async def _upsert(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    table: Type[models.Base],
+    constraint: str,
+    column_names: Sequence[str],
+    rows: Sequence[Tuple[ProjectRowId, Dict[str, Any]]],
+) -> Tuple[List[Tuple[ProjectRowId, Dict[str, Any]]], int]:
+    """
+    Upserts the rows with one multi-row statement, falling back to one row at a
+    time if that fails. Returns the rows that were upserted, along with their
+    projects, and the number of rows that failed.
+    """
+    proposed = excluded(dialect, table)
+    # `metadata` must match database
+    set_ = {name: proposed[name] for name in _UPDATED_COLUMN_NAMES}
+
+    def stmt(values: List[Dict[str, Any]]) -> Any:
+        return insert_stmt(
+            dialect=dialect,
+            table=table,
+            values=values,
+            constraint=constraint,
+            column_names=column_names,
+            on_conflict=OnConflict.DO_UPDATE,
+            set_=set_,
+        )
+
+    try:
+        async with session.begin_nested():
+            await session.execute(stmt([values for _, values in rows]))
+        return list(rows), 0
+    except Exception:
+        logger.exception(
+            f"Failed to upsert a batch of {len(rows)} evaluations into {table.__tablename__}, "
+            "retrying one evaluation at a time"
+        )
+    upserted: List[Tuple[ProjectRowId, Dict[str, Any]]] = []
+    num_failures = 0
+    for project_rowid, values in rows:
+        try:
+            async with session.begin_nested():
+                await session.execute(stmt([values]))
+        except Exception:
+            num_failures += 1
+            logger.exception(f"Failed to insert evaluation: {values['name']=}")
+            continue
+        upserted.append((project_rowid, values))
+    return upserted, num_failures
+
+
+def _result(evaluation: pb.Evaluation) -> _Result:
+    result = evaluation.result
+    return _Result(
+        label=result.label.value if result.HasField("label") else None,
+        score=result.score.value if result.HasField("score") else None,
+        explanation=result.explanation.value if result.HasField("explanation") else None,
+    )
+
+
+def _values(result: _Result) -> Dict[str, Any]:
+    return dict(
+        label=result.label,
+        score=result.score,
+        explanation=result.explanation,
+        metadata_={},  # `metadata_` must match ORM
+        annotator_kind="LLM",
+    )
+
+
+_UPDATED_COLUMN_NAMES = ("label", "score", "explanation", "metadata", "annotator_kind")
@@ -1,13 +1,21 @@
 from enum import Enum, auto
-from typing import Any, Mapping, Optional, Sequence
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
 
-from sqlalchemy import Insert, insert
+from sqlalchemy import ColumnElement, Insert, func, insert
 from sqlalchemy.dialects.postgresql import insert as insert_postgresql
 from sqlalchemy.dialects.sqlite import insert as insert_sqlite
 from typing_extensions import assert_never
 
 from phoenix.db.helpers import SupportedSQLDialect
 
+# The maximum number of bind parameters in one statement. SQLite before 3.32
+# caps it at 999, and asyncpg at 32767 (the wire protocol uses a 16-bit count).
+_MAX_BIND_PARAMS = {
+    SupportedSQLDialect.SQLITE: 999,
+    SupportedSQLDialect.POSTGRESQL: 32767,
+}
+
 
 class OnConflict(Enum):
     DO_NOTHING = auto()
@@ -17,14 +25,15 @@ class OnConflict(Enum):
 def insert_stmt(
     dialect: SupportedSQLDialect,
     table: Any,
-    values: Mapping[str, Any],
+    values: Union[Mapping[str, Any], Sequence[Mapping[str, Any]]],
     constraint: Optional[str] = None,
     column_names: Sequence[str] = (),
     on_conflict: OnConflict = OnConflict.DO_NOTHING,
     set_: Optional[Mapping[str, Any]] = None,
 ) -> Insert:
     """
-    Dialect specific insertion statement using ON CONFLICT DO syntax.
+    Dialect specific insertion statement using ON CONFLICT DO syntax. A sequence
+    of `values` produces a single multi-row INSERT statement.
     """
     if bool(constraint) != bool(column_names):
         raise ValueError(
@@ -49,3 +58,48 @@ def insert_stmt(
             return stmt_sqlite.on_conflict_do_update(column_names, set_=set_)
         assert_never(on_conflict)
     assert_never(dialect)
+
+
+def excluded(dialect: SupportedSQLDialect, table: Any) -> Any:
+    """
+    The `excluded` pseudo-table of an ON CONFLICT DO UPDATE clause, i.e. the row
+    that was proposed for insertion. Useful for multi-row upserts where `set_`
+    must refer to the incoming values of each row.
+    """
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        return insert_postgresql(table).excluded
+    if dialect is SupportedSQLDialect.SQLITE:
+        return insert_sqlite(table).excluded
+    assert_never(dialect)
+
+
+def least(dialect: SupportedSQLDialect, *args: Any) -> ColumnElement[Any]:
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        return func.least(*args)
+    if dialect is SupportedSQLDialect.SQLITE:
+        # SQLite's multi-argument `min` is a scalar function
+        return func.min(*args)
+    assert_never(dialect)
+
+
+def greatest(dialect: SupportedSQLDialect, *args: Any) -> ColumnElement[Any]:
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        return func.greatest(*args)
+    if dialect is SupportedSQLDialect.SQLITE:
+        # SQLite's multi-argument `max` is a scalar function
+        return func.max(*args)
+    assert_never(dialect)
+
+
+def max_rows_per_statement(dialect: SupportedSQLDialect, num_columns: int) -> int:
+    """
+    The number of rows of `num_columns` bind parameters each that fit in one
+    multi-row statement (or one IN clause) without exceeding the dialect's limit.
+    """
+    return max(1, _MAX_BIND_PARAMS[dialect] // max(1, num_columns))
+
+
+def chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
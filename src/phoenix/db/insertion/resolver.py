@@ -0,0 +1,108 @@
+"""
+In-memory resolution of project names and trace ids to database rowids for the
+span ingestion path. Most spans in a batch share a handful of projects and
+traces, so once a rowid is known it doesn't need to be upserted or selected
+again until the bounds of its trace are widened.
+
+Entries learned during a transaction are staged and only become visible after
+the transaction commits, since the rowids are meaningless if it rolls back.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from cachetools import LRUCache
+from typing_extensions import TypeAlias
+
+from phoenix.db.insertion.span import ClearProjectSpansEvent
+
+ProjectName: TypeAlias = str
+ProjectRowId: TypeAlias = int
+TraceId: TypeAlias = str
+TraceRowId: TypeAlias = int
+
+
+class ResolvedTrace(NamedTuple):
+    rowid: TraceRowId
+    project_rowid: ProjectRowId
+    start_time: datetime
+    end_time: datetime
+
+    def covers(self, start_time: datetime, end_time: datetime) -> bool:
+        return self.start_time <= start_time and end_time <= self.end_time
+
+
+class ProjectTraceResolver:
+    def __init__(
+        self,
+        *,
+        max_num_projects: int = 1_000,
+        max_num_traces: int = 100_000,
+    ) -> None:
+        self._projects: LRUCache[ProjectName, ProjectRowId] = LRUCache(maxsize=max_num_projects)
+        self._traces: LRUCache[TraceId, ResolvedTrace] = LRUCache(maxsize=max_num_traces)
+        self._staged_projects: Dict[ProjectName, ProjectRowId] = {}
+        self._staged_traces: Dict[TraceId, ResolvedTrace] = {}
+
+    def project_rowid(self, project_name: ProjectName) -> Optional[ProjectRowId]:
+        if (rowid := self._staged_projects.get(project_name)) is not None:
+            return rowid
+        return self._projects.get(project_name)
+
+    def trace(self, trace_id: TraceId) -> Optional[ResolvedTrace]:
+        if (trace := self._staged_traces.get(trace_id)) is not None:
+            return trace
+        return self._traces.get(trace_id)
+
+    def stage_project(self, project_name: ProjectName, rowid: ProjectRowId) -> None:
+        self._staged_projects[project_name] = rowid
+
+    def stage_trace(self, trace_id: TraceId, trace: ResolvedTrace) -> None:
+        self._staged_traces[trace_id] = trace
+
+    def commit(self) -> None:
+        """
+        Makes the entries staged since the last commit or rollback visible.
+        Call after the transaction that produced them has committed.
+        """
+        self._projects.update(self._staged_projects)
+        self._traces.update(self._staged_traces)
+        self._staged_projects.clear()
+        self._staged_traces.clear()
+
+    def rollback(self) -> None:
+        self._staged_projects.clear()
+        self._staged_traces.clear()
+
+    def discard(
+        self,
+        project_names: Iterable[ProjectName] = (),
+        trace_ids: Iterable[TraceId] = (),
+    ) -> None:
+        """
+        Forgets entries that may no longer match the database, e.g. after a
+        statement that relied on them has failed.
+        """
+        for project_name in project_names:
+            self._projects.pop(project_name, None)
+            self._staged_projects.pop(project_name, None)
+        for trace_id in trace_ids:
+            self._traces.pop(trace_id, None)
+            self._staged_traces.pop(trace_id, None)
+
+    def invalidate(self, event: ClearProjectSpansEvent) -> None:
+        """
+        Forgets the traces of a project whose spans have been cleared, along
+        with the project itself in case it has been deleted.
+        """
+        project_rowid, *_ = event
+        for projects in (self._projects, self._staged_projects):
+            for name in [name for name, rowid in projects.items() if rowid == project_rowid]:
+                del projects[name]
+        for traces in (self._traces, self._staged_traces):
+            for trace_id in [
+                trace_id
+                for trace_id, trace in traces.items()
+                if trace.project_rowid == project_rowid
+            ]:
+                del traces[trace_id]
@@ -1,13 +1,16 @@
 from dataclasses import asdict
-from typing import NamedTuple, Optional, cast
+from typing import Iterable, NamedTuple, Optional, cast
 
 from openinference.semconv.trace import SpanAttributes
-from sqlalchemy import func, insert, select, update
+from sqlalchemy import exists, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from phoenix.db import models
 from phoenix.db.helpers import SupportedSQLDialect
-from phoenix.db.insertion.helpers import OnConflict, insert_stmt
+from phoenix.db.insertion.helpers import OnConflict, chunks, insert_stmt, max_rows_per_statement
+from phoenix.db.latency_sketches import update_latency_sketches
+from phoenix.db.span_rollups import add_to_span_rollups
 from phoenix.trace.attributes import get_attribute_value
 from phoenix.trace.schemas import Span, SpanStatusCode
 
@@ -42,6 +45,8 @@ async def insert_span(
         select(models.Trace).where(models.Trace.trace_id == span.context.trace_id)
     ):
         trace_rowid = trace.id
+        # The span goes to the trace's project, which may not be the one given.
+        project_rowid = trace.project_rowid
         if span.start_time < trace.start_time or trace.end_time < span.end_time:
             trace_start_time = min(trace.start_time, span.start_time)
             trace_end_time = max(trace.end_time, span.end_time)
@@ -53,6 +58,12 @@ async def insert_span(
                     end_time=trace_end_time,
                 )
             )
+            await update_latency_sketches(
+                session,
+                "trace",
+                [(project_rowid, trace_start_time, trace_end_time)],
+                [(project_rowid, trace.start_time, trace.end_time)],
+            )
     else:
         trace_rowid = cast(
             int,
@@ -67,6 +78,9 @@ async def insert_span(
                 .returning(models.Trace.id)
             ),
         )
+        await update_latency_sketches(
+            session, "trace", [(project_rowid, span.start_time, span.end_time)]
+        )
     cumulative_error_count = int(span.status_code is SpanStatusCode.ERROR)
     cumulative_llm_token_count_prompt = cast(
         int, get_attribute_value(span.attributes, SpanAttributes.LLM_TOKEN_COUNT_PROMPT) or 0
@@ -86,6 +100,11 @@ async def insert_span(
         cumulative_error_count += cast(int, accumulation[0] or 0)
         cumulative_llm_token_count_prompt += cast(int, accumulation[1] or 0)
         cumulative_llm_token_count_completion += cast(int, accumulation[2] or 0)
+    is_root = (
+        span.parent_id is None
+        or await session.scalar(select(models.Span.id).where(models.Span.span_id == span.parent_id))
+        is None
+    )
     span_rowid = await session.scalar(
         insert_stmt(
             dialect=dialect,
@@ -95,6 +114,7 @@ async def insert_span(
             values=dict(
                 span_id=span.context.span_id,
                 trace_rowid=trace_rowid,
+                project_rowid=project_rowid,
                 parent_id=span.parent_id,
                 span_kind=span.span_kind.value,
                 name=span.name,
@@ -104,6 +124,7 @@ async def insert_span(
                 events=[asdict(event) for event in span.events],
                 status_code=span.status_code.value,
                 status_message=span.status_message,
+                is_root=is_root,
                 cumulative_error_count=cumulative_error_count,
                 cumulative_llm_token_count_prompt=cumulative_llm_token_count_prompt,
                 cumulative_llm_token_count_completion=cumulative_llm_token_count_completion,
@@ -113,13 +134,69 @@ async def insert_span(
     )
     if span_rowid is None:
         return None
+    await update_root_flags(session, [span.context.span_id])
+    await add_to_span_rollups(session, [span_rowid])
+    await update_latency_sketches(
+        session, "span", [(project_rowid, span.start_time, span.end_time)]
+    )
     # Propagate cumulative values to ancestors. This is usually a no-op, since
     # the parent usually arrives after the child. But in the event that a
     # child arrives after its parent, we need to make sure that all the
     # ancestors' cumulative values are updated.
+    if span.parent_id:
+        await update_ancestors_cumulative_counts(
+            session,
+            span.parent_id,
+            cumulative_error_count,
+            cumulative_llm_token_count_prompt,
+            cumulative_llm_token_count_completion,
+        )
+    return SpanInsertionEvent(project_rowid)
+
+
+async def update_root_flags(
+    session: AsyncSession,
+    inserted_span_ids: Iterable[str],
+    missing_span_ids: Iterable[str] = (),
+) -> None:
+    """
+    Unmarks the children of newly inserted spans as root spans, since their
+    parents have arrived, and marks the children of spans that were expected but
+    failed to be inserted as root spans, unless their parents exist after all.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    for chunk in chunks(inserted_span_ids, max_rows_per_statement(dialect, 1)):
+        await session.execute(
+            update(models.Span)
+            .where(models.Span.is_root)
+            .where(models.Span.parent_id.in_(chunk))
+            .values(is_root=False)
+        )
+    parent = aliased(models.Span)
+    for chunk in chunks(missing_span_ids, max_rows_per_statement(dialect, 1)):
+        await session.execute(
+            update(models.Span)
+            .where(~models.Span.is_root)
+            .where(models.Span.parent_id.in_(chunk))
+            .where(~exists().where(parent.span_id == models.Span.parent_id))
+            .values(is_root=True)
+        )
+
+
+async def update_ancestors_cumulative_counts(
+    session: AsyncSession,
+    parent_id: str,
+    cumulative_error_count: int,
+    cumulative_llm_token_count_prompt: int,
+    cumulative_llm_token_count_completion: int,
+) -> None:
+    """
+    Adds the cumulative values of a newly inserted span to all of its ancestors
+    that are already in the database, starting from the span's parent.
+    """
     ancestors = (
         select(models.Span.id, models.Span.parent_id)
-        .where(models.Span.span_id == span.parent_id)
+        .where(models.Span.span_id == parent_id)
         .cte(recursive=True)
     )
     child = ancestors.alias()
@@ -139,4 +216,3 @@ async def insert_span(
             + cumulative_llm_token_count_completion,
         )
     )
-    return SpanInsertionEvent(project_rowid)
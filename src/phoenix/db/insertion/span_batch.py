@@ -0,0 +1,466 @@
+"""
+Set-based insertion of a batch of spans. Instead of running a handful of
+statements per span (as `insert_span` does), projects and traces for the whole
+batch are resolved with one multi-row upsert each, and spans are inserted with
+multi-row INSERT ... ON CONFLICT DO NOTHING statements, or optionally with COPY
+on PostgreSQL. If a multi-row span statement fails, only the spans in that
+statement are retried one by one, each inside its own savepoint, so that a
+single bad span can't fail the whole batch.
+Cumulative counts are computed for the whole batch in memory beforehand (see
+`phoenix.db.insertion.span_rollup`), and the hourly rollups of the projects
+are updated with one statement per chunk of inserted spans at the end (see
+`phoenix.db.span_rollups`), as are the latency sketches of the spans and of the
+traces whose bounds changed (see `phoenix.db.latency_sketches`).
+"""
+
+import logging
+from dataclasses import asdict
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import TypeAlias
+
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.insertion.helpers import (
+    OnConflict,
+    chunks,
+    excluded,
+    greatest,
+    insert_stmt,
+    least,
+    max_rows_per_statement,
+)
+from phoenix.db.insertion.resolver import ProjectTraceResolver, ResolvedTrace
+from phoenix.db.insertion.span import SpanInsertionEvent, insert_span, update_root_flags
+from phoenix.db.insertion.span_copy import copy_span_rows
+from phoenix.db.insertion.span_rollup import (
+    Rollup,
+    SpanRowId,
+    exclude,
+    get_cumulative_counts_of_children,
+    roll_up,
+    update_cumulative_counts,
+)
+from phoenix.db.latency_sketches import update_latency_sketches
+from phoenix.db.span_rollups import add_to_span_rollups
+from phoenix.trace.schemas import Span, SpanID, TraceID
+
+logger = logging.getLogger(__name__)
+
+ProjectName: TypeAlias = str
+ProjectRowId: TypeAlias = int
+
+
+class SpanBatchInsertionResult(NamedTuple):
+    events: List[SpanInsertionEvent]
+    """One insertion event per project that received new spans."""
+    num_failures: int = 0
+    """The number of spans that could not be inserted due to errors."""
+
+
+async def insert_spans(
+    session: AsyncSession,
+    spans: Iterable[Tuple[Span, ProjectName]],
+    *,
+    max_spans_per_statement: Optional[int] = None,
+    max_traces_per_statement: Optional[int] = None,
+    resolver: Optional[ProjectTraceResolver] = None,
+    use_copy: bool = False,
+) -> SpanBatchInsertionResult:
+    """
+    Inserts a batch of spans. Spans whose `span_id` already exists are skipped.
+    By default, the number of rows per statement is the most that stays within
+    the dialect's limit on bind parameters.
+
+    When `use_copy` is True and the database is PostgreSQL, the spans are
+    written with COPY (see `phoenix.db.insertion.span_copy`), all at once
+    unless `max_spans_per_statement` is given.
+
+    When a `resolver` is given, projects and traces it already knows about are
+    not upserted again, except for traces whose bounds are widened by the
+    batch. Newly resolved rowids are staged on the resolver, and it is up to
+    the caller to commit or roll them back along with the transaction.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    use_copy = use_copy and dialect is SupportedSQLDialect.POSTGRESQL
+    if max_spans_per_statement is None and not use_copy:
+        max_spans_per_statement = max_rows_per_statement(dialect, _NUM_SPAN_COLUMNS)
+    if max_traces_per_statement is None:
+        max_traces_per_statement = max_rows_per_statement(dialect, _NUM_TRACE_COLUMNS)
+    unique_spans = list(_dedupe(spans))
+    if not unique_spans:
+        return SpanBatchInsertionResult([])
+    try:
+        async with session.begin_nested():
+            project_rowids, traces = await _resolve(
+                session, dialect, unique_spans, max_traces_per_statement, resolver
+            )
+    except Exception:
+        logger.exception("Failed to upsert projects and traces for a batch of spans")
+        if resolver is not None:
+            _discard(resolver, unique_spans)
+        return await _insert_spans_one_by_one(session, unique_spans)
+    existing_span_ids = await _get_existing_span_ids(
+        session, dialect, [span.context.span_id for span, _ in unique_spans]
+    )
+    new_spans = [item for item in unique_spans if item[0].context.span_id not in existing_span_ids]
+    if not new_spans:
+        return SpanBatchInsertionResult([])
+    rollup = roll_up(
+        (span for span, _ in new_spans),
+        await get_cumulative_counts_of_children(
+            session, [span.context.span_id for span, _ in new_spans]
+        ),
+    )
+    root_span_ids = await _get_root_span_ids(session, dialect, [span for span, _ in new_spans])
+    span_rowids: Dict[SpanID, SpanRowId] = {}
+    num_failures = 0
+    for chunk in chunks(new_spans, max_spans_per_statement or len(new_spans)):
+        try:
+            async with session.begin_nested():
+                values = _span_values(chunk, traces, rollup, root_span_ids)
+                span_rowids.update(
+                    await copy_span_rows(session, values)
+                    if use_copy
+                    else await _insert_span_rows(session, dialect, values)
+                )
+            continue
+        except Exception:
+            logger.exception(
+                f"Failed to insert a batch of {len(chunk)} spans, retrying one span at a time"
+            )
+        if resolver is not None:
+            # A cached rowid may have gone stale, e.g. if its project was
+            # cleared while the batch was in flight, so it's resolved anew.
+            _discard(resolver, chunk)
+            try:
+                async with session.begin_nested():
+                    resolved = await _resolve(
+                        session, dialect, chunk, max_traces_per_statement, resolver
+                    )
+                project_rowids.update(resolved[0])
+                traces.update(resolved[1])
+            except Exception:
+                logger.exception("Failed to upsert projects and traces for a batch of spans")
+                _discard(resolver, chunk)
+        for values in _span_values(chunk, traces, rollup, root_span_ids):
+            try:
+                async with session.begin_nested():
+                    span_rowids.update(await _insert_span_rows(session, dialect, [values]))
+            except Exception:
+                num_failures += 1
+                logger.exception(f"Failed to insert span with span_id={values['span_id']}")
+    # Spans that failed, or that were inserted concurrently by someone else,
+    # must not be counted toward their ancestors.
+    missing_span_ids = {span.context.span_id for span, _ in new_spans} - span_rowids.keys()
+    corrections, boundary_counts = exclude(
+        rollup,
+        (span for span, _ in new_spans),
+        missing_span_ids,
+    )
+    await update_cumulative_counts(
+        session,
+        boundary_counts,
+        {span_rowids[span_id]: counts for span_id, counts in corrections.items()},
+    )
+    await update_root_flags(session, span_rowids.keys(), missing_span_ids)
+    await add_to_span_rollups(session, span_rowids.values())
+    await update_latency_sketches(
+        session,
+        "span",
+        (
+            (traces[span.context.trace_id].project_rowid, span.start_time, span.end_time)
+            for span, _ in new_spans
+            if span.context.span_id in span_rowids
+        ),
+    )
+    events = {
+        SpanInsertionEvent(traces[span.context.trace_id].project_rowid)
+        for span, _ in new_spans
+        if span.context.span_id in span_rowids
+    }
+    return SpanBatchInsertionResult(list(events), num_failures)
+
+
+async def _resolve(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    spans: Sequence[Tuple[Span, ProjectName]],
+    max_traces_per_statement: int,
+    resolver: Optional[ProjectTraceResolver] = None,
+) -> Tuple[Dict[ProjectName, ProjectRowId], Dict[TraceID, ResolvedTrace]]:
+    project_rowids = await _upsert_projects(
+        session,
+        dialect,
+        {project_name for _, project_name in spans},
+        resolver,
+    )
+    traces = await _upsert_traces(
+        session,
+        dialect,
+        spans,
+        project_rowids,
+        max_traces_per_statement,
+        resolver,
+    )
+    return project_rowids, traces
+
+
+async def _upsert_projects(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    project_names: Iterable[ProjectName],
+    resolver: Optional[ProjectTraceResolver] = None,
+) -> Dict[ProjectName, ProjectRowId]:
+    project_rowids: Dict[ProjectName, ProjectRowId] = {}
+    unresolved: List[ProjectName] = []
+    for name in sorted(project_names):
+        if resolver is not None and (rowid := resolver.project_rowid(name)) is not None:
+            project_rowids[name] = rowid
+        else:
+            unresolved.append(name)
+    if not unresolved:
+        return project_rowids
+    stmt = insert_stmt(
+        dialect=dialect,
+        table=models.Project,
+        values=[dict(name=name) for name in unresolved],
+        constraint="uq_projects_name",
+        column_names=("name",),
+        on_conflict=OnConflict.DO_UPDATE,
+        set_=dict(name=excluded(dialect, models.Project).name),
+    ).returning(models.Project.name, models.Project.id)
+    for name, rowid in await session.execute(stmt):
+        project_rowids[name] = rowid
+        if resolver is not None:
+            resolver.stage_project(name, rowid)
+    return project_rowids
+
+
+async def _upsert_traces(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    spans: Sequence[Tuple[Span, ProjectName]],
+    project_rowids: Mapping[ProjectName, ProjectRowId],
+    max_traces_per_statement: int,
+    resolver: Optional[ProjectTraceResolver] = None,
+) -> Dict[TraceID, ResolvedTrace]:
+    # An upsert can't touch the same row twice in one statement,
+    # so the bounds of each trace are aggregated beforehand.
+    values: Dict[TraceID, Dict[str, Any]] = {}
+    for span, project_name in spans:
+        trace_id = span.context.trace_id
+        if (trace := values.get(trace_id)) is None:
+            values[trace_id] = dict(
+                project_rowid=project_rowids[project_name],
+                trace_id=trace_id,
+                start_time=span.start_time,
+                end_time=span.end_time,
+            )
+        else:
+            trace["start_time"] = min(trace["start_time"], span.start_time)
+            trace["end_time"] = max(trace["end_time"], span.end_time)
+    traces: Dict[TraceID, ResolvedTrace] = {}
+    if resolver is not None:
+        # Known traces are only written back when the batch widens their bounds.
+        for trace_id, trace in list(values.items()):
+            if (resolved := resolver.trace(trace_id)) is None:
+                continue
+            if resolved.covers(trace["start_time"], trace["end_time"]):
+                traces[trace_id] = resolved
+                del values[trace_id]
+    proposed = excluded(dialect, models.Trace)
+    added: List[Tuple[ProjectRowId, datetime, datetime]] = []
+    removed: List[Tuple[ProjectRowId, datetime, datetime]] = []
+    for chunk in chunks(list(values.values()), max_traces_per_statement):
+        # The latencies of existing traces are replaced in the sketches.
+        old_bounds = {
+            trace_id: (project_rowid, start_time, end_time)
+            for trace_id, project_rowid, start_time, end_time in await session.execute(
+                select(
+                    models.Trace.trace_id,
+                    models.Trace.project_rowid,
+                    models.Trace.start_time,
+                    models.Trace.end_time,
+                ).where(models.Trace.trace_id.in_([trace["trace_id"] for trace in chunk]))
+            )
+        }
+        stmt = insert_stmt(
+            dialect=dialect,
+            table=models.Trace,
+            values=chunk,
+            constraint="uq_traces_trace_id",
+            column_names=("trace_id",),
+            on_conflict=OnConflict.DO_UPDATE,
+            # The project of an existing trace is never changed.
+            set_=dict(
+                start_time=least(dialect, models.Trace.start_time, proposed.start_time),
+                end_time=greatest(dialect, models.Trace.end_time, proposed.end_time),
+            ),
+        ).returning(
+            models.Trace.trace_id,
+            models.Trace.id,
+            models.Trace.project_rowid,
+            models.Trace.start_time,
+            models.Trace.end_time,
+        )
+        for trace_id, rowid, project_rowid, start_time, end_time in await session.execute(stmt):
+            traces[trace_id] = ResolvedTrace(rowid, project_rowid, start_time, end_time)
+            if (old := old_bounds.get(trace_id)) != (project_rowid, start_time, end_time):
+                added.append((project_rowid, start_time, end_time))
+                if old is not None:
+                    removed.append(old)
+            if resolver is not None:
+                resolver.stage_trace(trace_id, traces[trace_id])
+    await update_latency_sketches(session, "trace", added, removed)
+    return traces
+
+
+async def _get_existing_span_ids(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    span_ids: Sequence[SpanID],
+) -> Set[SpanID]:
+    existing_span_ids: Set[SpanID] = set()
+    for chunk in chunks(span_ids, max_rows_per_statement(dialect, 1)):
+        existing_span_ids.update(
+            await session.scalars(select(models.Span.span_id).where(models.Span.span_id.in_(chunk)))
+        )
+    return existing_span_ids
+
+
+async def _get_root_span_ids(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    spans: Sequence[Span],
+) -> Set[SpanID]:
+    """
+    Returns the spans whose parents are neither in the batch nor in the database.
+    """
+    span_ids = {span.context.span_id for span in spans}
+    parent_ids = {
+        span.parent_id for span in spans if span.parent_id and span.parent_id not in span_ids
+    }
+    existing_parent_ids = await _get_existing_span_ids(session, dialect, list(parent_ids))
+    return {
+        span.context.span_id
+        for span in spans
+        if not span.parent_id or span.parent_id in parent_ids - existing_parent_ids
+    }
+
+
+async def _insert_span_rows(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    values: Sequence[Mapping[str, Any]],
+) -> Dict[SpanID, SpanRowId]:
+    """
+    Inserts the spans with one multi-row statement and returns the rowids of
+    those that were actually inserted, i.e. excluding those that already existed.
+    """
+    stmt = insert_stmt(
+        dialect=dialect,
+        table=models.Span,
+        values=values,
+        constraint="uq_spans_span_id",
+        column_names=("span_id",),
+        on_conflict=OnConflict.DO_NOTHING,
+    ).returning(models.Span.span_id, models.Span.id)
+    return {span_id: rowid for span_id, rowid in await session.execute(stmt)}
+
+
+async def _insert_spans_one_by_one(
+    session: AsyncSession,
+    spans: Iterable[Tuple[Span, ProjectName]],
+) -> SpanBatchInsertionResult:
+    events: Set[SpanInsertionEvent] = set()
+    num_failures = 0
+    for span, project_name in spans:
+        try:
+            async with session.begin_nested():
+                event = await insert_span(session, span, project_name)
+        except Exception:
+            num_failures += 1
+            logger.exception(f"Failed to insert span with span_id={span.context.span_id}")
+            continue
+        if event is not None:
+            events.add(event)
+    return SpanBatchInsertionResult(list(events), num_failures)
+
+
+def _span_values(
+    spans: Iterable[Tuple[Span, ProjectName]],
+    traces: Mapping[TraceID, ResolvedTrace],
+    rollup: Rollup,
+    root_span_ids: Set[SpanID],
+) -> List[Dict[str, Any]]:
+    values: List[Dict[str, Any]] = []
+    for span, _ in spans:
+        cumulative_counts = rollup.cumulative_counts[span.context.span_id]
+        trace = traces[span.context.trace_id]
+        values.append(
+            dict(
+                span_id=span.context.span_id,
+                trace_rowid=trace.rowid,
+                # The span goes to the trace's project, which may not be the one given.
+                project_rowid=trace.project_rowid,
+                parent_id=span.parent_id,
+                span_kind=span.span_kind.value,
+                name=span.name,
+                start_time=span.start_time,
+                end_time=span.end_time,
+                attributes=span.attributes,
+                events=[asdict(event) for event in span.events],
+                status_code=span.status_code.value,
+                status_message=span.status_message,
+                is_root=span.context.span_id in root_span_ids,
+                cumulative_error_count=cumulative_counts.error_count,
+                cumulative_llm_token_count_prompt=cumulative_counts.llm_token_count_prompt,
+                cumulative_llm_token_count_completion=cumulative_counts.llm_token_count_completion,
+            )
+        )
+    return values
+
+
+def _dedupe(
+    spans: Iterable[Tuple[Span, ProjectName]],
+) -> Iterator[Tuple[Span, ProjectName]]:
+    # The first copy of a span wins, which is also what happens when spans are
+    # inserted one at a time.
+    seen: Set[SpanID] = set()
+    for span, project_name in spans:
+        if (span_id := span.context.span_id) in seen:
+            continue
+        seen.add(span_id)
+        yield span, project_name
+
+
+def _discard(
+    resolver: ProjectTraceResolver,
+    spans: Iterable[Tuple[Span, ProjectName]],
+) -> None:
+    project_names, trace_ids = set(), set()
+    for span, project_name in spans:
+        project_names.add(project_name)
+        trace_ids.add(span.context.trace_id)
+    resolver.discard(project_names, trace_ids)
+
+
+# Counting every column of the table, including the rowid, errs on the safe side.
+_NUM_SPAN_COLUMNS = len(models.Span.__table__.columns)
+_NUM_TRACE_COLUMNS = len(models.Trace.__table__.columns)
@@ -0,0 +1,79 @@
+"""
+Writes spans to PostgreSQL with COPY, which is much faster than INSERT
+statements for large batches, e.g. when backfilling. COPY can't skip rows that
+conflict with existing ones, so the rows are first copied into a temporary
+staging table, and then moved into the spans table with a single
+INSERT ... SELECT ... ON CONFLICT DO NOTHING. Everything happens inside the
+caller's transaction, on the connection of its session.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Mapping, Sequence
+
+from sqlalchemy import Column, MetaData, Table, select
+from sqlalchemy.dialects.postgresql import insert as insert_postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateTable
+from typing_extensions import TypeAlias
+
+from phoenix.datetime_utils import normalize_datetime
+from phoenix.db import models
+from phoenix.db.engines import dumps_json
+from phoenix.trace.schemas import SpanID
+
+SpanRowId: TypeAlias = int
+
+_SPANS_STAGING = Table(
+    "phoenix_spans_staging",
+    MetaData(),
+    *(
+        Column(column.name, column.type)
+        for column in models.Span.__table__.columns
+        if not column.primary_key
+    ),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DELETE ROWS",
+)
+_COLUMN_NAMES = tuple(column.name for column in _SPANS_STAGING.columns)
+_JSON_COLUMN_NAMES = frozenset(("attributes", "events"))
+
+
+async def copy_span_rows(
+    session: AsyncSession,
+    values: Sequence[Mapping[str, Any]],
+) -> Dict[SpanID, SpanRowId]:
+    """
+    Same as inserting the rows with a multi-row INSERT ... ON CONFLICT DO
+    NOTHING, i.e. returns the rowids of the spans that were actually inserted,
+    but with COPY. The session must be bound to PostgreSQL through asyncpg.
+    """
+    connection = await session.connection()
+    # A temporary table lives as long as the database connection, which is pooled.
+    await connection.execute(CreateTable(_SPANS_STAGING, if_not_exists=True))
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        _SPANS_STAGING.name,
+        records=[tuple(_copy_value(name, row[name]) for name in _COLUMN_NAMES) for row in values],
+        columns=_COLUMN_NAMES,
+    )
+    stmt = (
+        insert_postgresql(models.Span)
+        .from_select(_COLUMN_NAMES, select(*_SPANS_STAGING.columns))
+        .on_conflict_do_nothing(constraint="uq_spans_span_id")
+        .returning(models.Span.span_id, models.Span.id)
+    )
+    span_rowids = {span_id: rowid for span_id, rowid in await session.execute(stmt)}
+    # Emptied now rather than at commit, in case more rows are copied in the
+    # same transaction.
+    await session.execute(_SPANS_STAGING.delete())
+    return span_rowids
+
+
+def _copy_value(name: str, value: Any) -> Any:
+    # COPY bypasses the bind processing of the column types, so values are
+    # encoded the same way here.
+    if name in _JSON_COLUMN_NAMES:
+        return dumps_json(value)
+    if isinstance(value, datetime):
+        return normalize_datetime(value)
+    return value
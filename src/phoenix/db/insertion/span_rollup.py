@@ -0,0 +1,234 @@
+"""
+Cumulative counts (errors and LLM token counts) for a batch of new spans.
+
+The cumulative value of a span is its own count plus the cumulative values of
+its children. Instead of walking the ancestors of every new span in the
+database, the batch is arranged into a parent/child forest in memory and its
+values are computed bottom-up. The database only needs to be told about
+the roots of the forest whose parents were inserted in earlier batches, and
+all of their ancestors are updated with one grouped UPDATE.
+"""
+
+from collections import defaultdict
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
+
+from openinference.semconv.trace import SpanAttributes
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import TypeAlias
+
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.insertion.helpers import chunks, max_rows_per_statement
+from phoenix.trace.attributes import get_attribute_value
+from phoenix.trace.schemas import Span, SpanID, SpanStatusCode
+
+SpanRowId: TypeAlias = int
+
+
+class CumulativeCounts(NamedTuple):
+    error_count: int = 0
+    llm_token_count_prompt: int = 0
+    llm_token_count_completion: int = 0
+
+    def __add__(self, other: Any) -> "CumulativeCounts":
+        return CumulativeCounts(*(a + b for a, b in zip(self, other)))
+
+    def __sub__(self, other: Any) -> "CumulativeCounts":
+        return CumulativeCounts(*(a - b for a, b in zip(self, other)))
+
+    def __bool__(self) -> bool:
+        return any(self)
+
+
+class Rollup(NamedTuple):
+    cumulative_counts: Dict[SpanID, CumulativeCounts]
+    """The cumulative values of the spans in the batch."""
+    boundary_counts: Dict[SpanID, CumulativeCounts]
+    """The amounts to add to each parent outside the batch and to its ancestors."""
+
+
+def get_own_counts(span: Span) -> CumulativeCounts:
+    return CumulativeCounts(
+        int(span.status_code is SpanStatusCode.ERROR),
+        cast(int, get_attribute_value(span.attributes, LLM_TOKEN_COUNT_PROMPT) or 0),
+        cast(int, get_attribute_value(span.attributes, LLM_TOKEN_COUNT_COMPLETION) or 0),
+    )
+
+
+def roll_up(
+    spans: Iterable[Span],
+    counts_of_children: Mapping[SpanID, CumulativeCounts],
+) -> Rollup:
+    """
+    Computes the cumulative values of a batch of spans bottom-up. The
+    `counts_of_children` are the summed cumulative values of each span's
+    children that already exist outside the batch.
+    """
+    parent_ids: Dict[SpanID, SpanID] = {}
+    cumulative_counts: Dict[SpanID, CumulativeCounts] = {}
+    for span in spans:
+        span_id = span.context.span_id
+        cumulative_counts[span_id] = get_own_counts(span) + counts_of_children.get(
+            span_id, CumulativeCounts()
+        )
+        if span.parent_id:
+            parent_ids[span_id] = span.parent_id
+    num_children: DefaultDict[SpanID, int] = defaultdict(int)
+    for parent_id in parent_ids.values():
+        if parent_id in cumulative_counts:
+            num_children[parent_id] += 1
+    # Leaves first, and a parent once all of its children have been visited.
+    # Spans caught in a (malformed) parent cycle are never visited and so
+    # don't propagate anything.
+    ready = [span_id for span_id in cumulative_counts if not num_children[span_id]]
+    boundary_counts: DefaultDict[SpanID, CumulativeCounts] = defaultdict(CumulativeCounts)
+    while ready:
+        span_id = ready.pop()
+        if (parent_id := parent_ids.get(span_id)) is None:
+            continue
+        counts = cumulative_counts[span_id]
+        if parent_id not in cumulative_counts:
+            if counts:
+                boundary_counts[parent_id] += counts
+            continue
+        cumulative_counts[parent_id] += counts
+        num_children[parent_id] -= 1
+        if not num_children[parent_id]:
+            ready.append(parent_id)
+    return Rollup(cumulative_counts, dict(boundary_counts))
+
+
+def exclude(
+    rollup: Rollup,
+    spans: Iterable[Span],
+    excluded_span_ids: Set[SpanID],
+) -> Tuple[Dict[SpanID, CumulativeCounts], Dict[SpanID, CumulativeCounts]]:
+    """
+    Takes back the contributions of spans that ended up not being inserted.
+    Returns the corrections for the spans in the batch that were inserted, and
+    the boundary counts that remain.
+    """
+    parent_ids = {span.context.span_id: span.parent_id for span in spans}
+    corrections: DefaultDict[SpanID, CumulativeCounts] = defaultdict(CumulativeCounts)
+    boundary_counts: DefaultDict[SpanID, CumulativeCounts] = defaultdict(
+        CumulativeCounts, rollup.boundary_counts
+    )
+    for span_id in excluded_span_ids:
+        if not (counts := rollup.cumulative_counts[span_id]):
+            continue
+        visited = {span_id}
+        parent_id = parent_ids[span_id]
+        while parent_id and parent_id not in visited:
+            if parent_id not in parent_ids:
+                boundary_counts[parent_id] -= counts
+                break
+            if parent_id in excluded_span_ids:
+                # Its own cumulative value, which is taken back separately,
+                # already includes this span's.
+                break
+            corrections[parent_id] -= counts
+            visited.add(parent_id)
+            parent_id = parent_ids[parent_id]
+    return (
+        {span_id: counts for span_id, counts in corrections.items() if counts},
+        {parent_id: counts for parent_id, counts in boundary_counts.items() if counts},
+    )
+
+
+async def get_cumulative_counts_of_children(
+    session: AsyncSession,
+    span_ids: Sequence[SpanID],
+) -> Dict[SpanID, CumulativeCounts]:
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    counts_of_children: Dict[SpanID, CumulativeCounts] = {}
+    for chunk in chunks(span_ids, max_rows_per_statement(dialect, 1)):
+        stmt = (
+            select(
+                models.Span.parent_id,
+                func.sum(models.Span.cumulative_error_count),
+                func.sum(models.Span.cumulative_llm_token_count_prompt),
+                func.sum(models.Span.cumulative_llm_token_count_completion),
+            )
+            .where(models.Span.parent_id.in_(chunk))
+            .group_by(models.Span.parent_id)
+        )
+        for parent_id, errors, prompt, completion in await session.execute(stmt):
+            counts_of_children[parent_id] = CumulativeCounts(
+                int(errors or 0), int(prompt or 0), int(completion or 0)
+            )
+    return counts_of_children
+
+
+async def update_cumulative_counts(
+    session: AsyncSession,
+    boundary_counts: Mapping[SpanID, CumulativeCounts],
+    span_rowid_counts: Optional[Mapping[SpanRowId, CumulativeCounts]] = None,
+) -> None:
+    """
+    Adds the boundary counts to each of the given parents and all of their
+    ancestors, along with the given amounts to spans by rowid, using one
+    grouped UPDATE.
+    """
+    deltas: DefaultDict[SpanRowId, CumulativeCounts] = defaultdict(
+        CumulativeCounts, span_rowid_counts or {}
+    )
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    for chunk in chunks(boundary_counts, max_rows_per_statement(dialect, 1)):
+        ancestors = (
+            select(
+                models.Span.id,
+                models.Span.parent_id,
+                models.Span.span_id.label("origin"),
+            )
+            .where(models.Span.span_id.in_(chunk))
+            .cte(recursive=True)
+        )
+        child = ancestors.alias()
+        ancestors = ancestors.union_all(
+            select(models.Span.id, models.Span.parent_id, child.c.origin).join(
+                child, models.Span.span_id == child.c.parent_id
+            )
+        )
+        for rowid, origin in await session.execute(select(ancestors.c.id, ancestors.c.origin)):
+            deltas[rowid] += boundary_counts[origin]
+    if not (params := [_params(rowid, counts) for rowid, counts in deltas.items() if counts]):
+        return
+    table = models.Span.__table__
+    await session.execute(
+        update(table)
+        .where(table.c.id == bindparam("_rowid"))
+        .values(
+            cumulative_error_count=table.c.cumulative_error_count + bindparam("_error_count"),
+            cumulative_llm_token_count_prompt=table.c.cumulative_llm_token_count_prompt
+            + bindparam("_llm_token_count_prompt"),
+            cumulative_llm_token_count_completion=table.c.cumulative_llm_token_count_completion
+            + bindparam("_llm_token_count_completion"),
+        ),
+        params,
+    )
+
+
+def _params(rowid: SpanRowId, counts: CumulativeCounts) -> Dict[str, int]:
+    return dict(
+        _rowid=rowid,
+        _error_count=counts.error_count,
+        _llm_token_count_prompt=counts.llm_token_count_prompt,
+        _llm_token_count_completion=counts.llm_token_count_completion,
+    )
+
+
+LLM_TOKEN_COUNT_PROMPT = SpanAttributes.LLM_TOKEN_COUNT_PROMPT
+LLM_TOKEN_COUNT_COMPLETION = SpanAttributes.LLM_TOKEN_COUNT_COMPLETION
@@ -0,0 +1,303 @@
+"""
+Maintains the `latency_sketches` table, which keeps a DDSketch of the latencies
+of the spans, and one of the latencies of the traces, of each project per hour
+(by start time). Sketches of different hours merge into a sketch of the whole
+time range, from which any quantile can be estimated within a relative error of
+`RELATIVE_ACCURACY`, without reading every span or trace.
+
+Sketches are updated in the same transaction that inserts spans or changes the
+bounds of traces, and are recomputed for the affected hours in the same
+transaction that deletes traces (see `phoenix.db.span_rollups.delete_traces`).
+
+See https://arxiv.org/abs/1908.10693 for DDSketch.
+"""
+
+import math
+import struct
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import (
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import TypeAlias, assert_never
+
+from phoenix.datetime_utils import floor_to_hour
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.insertion.helpers import (
+    OnConflict,
+    chunks,
+    excluded,
+    insert_stmt,
+    max_rows_per_statement,
+)
+
+Kind: TypeAlias = Literal["span", "trace"]
+ProjectRowId: TypeAlias = int
+TraceRowId: TypeAlias = int
+Bucket: TypeAlias = Tuple[ProjectRowId, datetime]
+Bounds: TypeAlias = Tuple[ProjectRowId, datetime, datetime]
+"""The project, start time and end time of a span or trace."""
+
+RELATIVE_ACCURACY = 0.01
+
+_HOUR = timedelta(hours=1)
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+# Latencies below a microsecond are counted as zero, which bounds the number of bins.
+_MIN_LATENCY_MS = 1e-3
+_HEADER = struct.Struct("<qi")
+
+
+class DDSketch:
+    """
+    A sketch of non-negative values, each counted in the bin of the logarithm of
+    the value to the base `_GAMMA`. Values can also be removed, as long as they
+    were added before.
+    """
+
+    def __init__(self) -> None:
+        self._bins: DefaultDict[int, int] = defaultdict(int)
+        self._zero_count = 0
+
+    @property
+    def count(self) -> int:
+        return self._zero_count + sum(self._bins.values())
+
+    def __bool__(self) -> bool:
+        return self._zero_count != 0 or any(self._bins.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value < _MIN_LATENCY_MS:
+            self._zero_count += count
+        else:
+            self._bins[math.ceil(math.log(value) / _LOG_GAMMA)] += count
+
+    def merge(self, other: "DDSketch") -> None:
+        self._zero_count += other._zero_count
+        for index, count in other._bins.items():
+            self._bins[index] += count
+
+    def quantile(self, probability: float) -> Optional[float]:
+        """
+        Estimates the value at the probability, or returns None if the sketch is
+        empty.
+        """
+        if (count := self.count) <= 0:
+            return None
+        rank = probability * (count - 1)
+        cumulative = self._zero_count
+        if rank < cumulative:
+            return 0.0
+        for index in sorted(self._bins):
+            cumulative += self._bins[index]
+            if rank < cumulative:
+                return 2 * _GAMMA**index / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self._bins) / (_GAMMA + 1)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the sketch as the zero count and the index of the lowest bin,
+        followed by the counts of the contiguous bins from there on.
+        """
+        indices = [index for index, count in self._bins.items() if count]
+        if not indices:
+            return _HEADER.pack(max(0, self._zero_count), 0)
+        lowest, highest = min(indices), max(indices)
+        # A count can only go negative if a value is removed without having been
+        # added, which the sketch can't represent, so it's taken as zero.
+        counts = [max(0, self._bins.get(index, 0)) for index in range(lowest, highest + 1)]
+        return _HEADER.pack(max(0, self._zero_count), lowest) + struct.pack(
+            f"<{len(counts)}I", *counts
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DDSketch":
+        sketch = cls()
+        sketch._zero_count, lowest = _HEADER.unpack_from(data)
+        num_bins = (len(data) - _HEADER.size) // 4
+        for offset, count in enumerate(struct.unpack_from(f"<{num_bins}I", data, _HEADER.size)):
+            if count:
+                sketch._bins[lowest + offset] = count
+        return sketch
+
+
+async def update_latency_sketches(
+    session: AsyncSession,
+    kind: Kind,
+    added: Iterable[Bounds],
+    removed: Iterable[Bounds] = (),
+) -> None:
+    """
+    Adds the latencies of new spans or traces to the sketches, and removes
+    those of traces whose bounds have changed since they were added.
+    """
+    deltas: DefaultDict[Bucket, DDSketch] = defaultdict(DDSketch)
+    for sign, items in ((1, added), (-1, removed)):
+        for project_rowid, start_time, end_time in items:
+            deltas[(project_rowid, floor_to_hour(start_time))].add(
+                _latency_ms(start_time, end_time), sign
+            )
+    # E.g. a trace whose end moved by less than a bin doesn't change anything.
+    changes = {bucket: delta for bucket, delta in deltas.items() if delta}
+    if not changes:
+        return
+    sketches = await _get_sketches(session, kind, changes.keys(), for_update=True)
+    for bucket, delta in changes.items():
+        sketches.setdefault(bucket, DDSketch()).merge(delta)
+    await _put_sketches(session, kind, sketches)
+
+
+async def get_trace_buckets(
+    session: AsyncSession, trace_rowids: Sequence[TraceRowId]
+) -> Set[Bucket]:
+    """
+    Returns the project hours that the traces started in.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    buckets: Set[Bucket] = set()
+    for chunk in chunks(trace_rowids, max_rows_per_statement(dialect, 1)):
+        for project_rowid, start_time in await session.execute(
+            select(models.Trace.project_rowid, models.Trace.start_time).where(
+                models.Trace.id.in_(chunk)
+            )
+        ):
+            buckets.add((project_rowid, floor_to_hour(start_time)))
+    return buckets
+
+
+async def refresh_latency_sketches(
+    session: AsyncSession,
+    kind: Kind,
+    buckets: Iterable[Bucket],
+) -> None:
+    """
+    Recomputes the sketches of the project hours from the spans or traces that
+    are left.
+    """
+    sketches: Dict[Bucket, DDSketch] = {}
+    for project_rowid, hour in buckets:
+        hour = floor_to_hour(hour)
+        sketch = sketches[(project_rowid, hour)] = DDSketch()
+        if kind == "span":
+            stmt = (
+                select(models.Span.start_time, models.Span.end_time)
+                .where(models.Span.project_rowid == project_rowid)
+                .where(hour <= models.Span.start_time)
+                .where(models.Span.start_time < hour + _HOUR)
+            )
+        elif kind == "trace":
+            stmt = (
+                select(models.Trace.start_time, models.Trace.end_time)
+                .where(models.Trace.project_rowid == project_rowid)
+                .where(hour <= models.Trace.start_time)
+                .where(models.Trace.start_time < hour + _HOUR)
+            )
+        else:
+            assert_never(kind)
+        async for start_time, end_time in await session.stream(stmt):
+            sketch.add(_latency_ms(start_time, end_time))
+    await _put_sketches(session, kind, sketches)
+
+
+async def merge_latency_sketches(
+    session: AsyncSession,
+    kind: Kind,
+    project_rowids: Iterable[ProjectRowId],
+    start_hour: Optional[datetime],
+    end_hour: Optional[datetime],
+) -> DefaultDict[ProjectRowId, DDSketch]:
+    """
+    Merges the sketches of each project over the hours in [start_hour, end_hour).
+    """
+    stmt = (
+        select(models.LatencySketch.project_rowid, models.LatencySketch.sketch)
+        .where(models.LatencySketch.kind == kind)
+        .where(models.LatencySketch.project_rowid.in_(project_rowids))
+    )
+    if start_hour:
+        stmt = stmt.where(start_hour <= models.LatencySketch.hour)
+    if end_hour:
+        stmt = stmt.where(models.LatencySketch.hour < end_hour)
+    merged: DefaultDict[ProjectRowId, DDSketch] = defaultdict(DDSketch)
+    async for project_rowid, data in await session.stream(stmt):
+        merged[project_rowid].merge(DDSketch.from_bytes(data))
+    return merged
+
+
+async def _get_sketches(
+    session: AsyncSession,
+    kind: Kind,
+    buckets: Iterable[Bucket],
+    for_update: bool = False,
+) -> Dict[Bucket, DDSketch]:
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    hours_by_project: DefaultDict[ProjectRowId, List[datetime]] = defaultdict(list)
+    for project_rowid, hour in buckets:
+        hours_by_project[project_rowid].append(hour)
+    sketches: Dict[Bucket, DDSketch] = {}
+    table = models.LatencySketch
+    for project_rowid, hours in hours_by_project.items():
+        for chunk in chunks(hours, max_rows_per_statement(dialect, 1) - 2):
+            stmt = (
+                select(table.hour, table.sketch)
+                .where(table.kind == kind)
+                .where(table.project_rowid == project_rowid)
+                .where(table.hour.in_(chunk))
+            )
+            if for_update:
+                # Keeps a concurrent deletion from recomputing the sketches in between.
+                stmt = stmt.with_for_update()
+            for hour, data in await session.execute(stmt):
+                sketches[(project_rowid, hour)] = DDSketch.from_bytes(data)
+    return sketches
+
+
+async def _put_sketches(
+    session: AsyncSession,
+    kind: Kind,
+    sketches: Mapping[Bucket, DDSketch],
+) -> None:
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    table = models.LatencySketch
+    values = [
+        dict(project_rowid=project_rowid, hour=hour, kind=kind, sketch=sketch.to_bytes())
+        for (project_rowid, hour), sketch in sketches.items()
+        if sketch
+    ]
+    for chunk in chunks(values, max_rows_per_statement(dialect, 4)):
+        await session.execute(
+            insert_stmt(
+                dialect=dialect,
+                table=table,
+                values=chunk,
+                constraint="uq_latency_sketches_project_rowid_hour_kind",
+                column_names=("project_rowid", "hour", "kind"),
+                on_conflict=OnConflict.DO_UPDATE,
+                set_=dict(sketch=excluded(dialect, table).sketch),
+            )
+        )
+    for (project_rowid, hour), sketch in sketches.items():
+        if not sketch:
+            await session.execute(
+                delete(table)
+                .where(table.kind == kind)
+                .where(table.project_rowid == project_rowid)
+                .where(table.hour == hour)
+            )
+
+
+def _latency_ms(start_time: datetime, end_time: datetime) -> float:
+    return (end_time - start_time).total_seconds() * 1000
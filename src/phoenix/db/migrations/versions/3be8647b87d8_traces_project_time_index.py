@@ -0,0 +1,33 @@
+"""index traces by project and start time
+
+Revision ID: 3be8647b87d8
+Revises: cf03bd6bae1d
+Create Date: 2026-10-17 09:12:31.402117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3be8647b87d8"
+down_revision: Union[str, None] = "cf03bd6bae1d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Time-range queries on traces are almost always scoped to a project, so a
+    # composite index lets them, and deletions by age, scan only the rows of
+    # one project within the range.
+    op.create_index(
+        "ix_traces_project_rowid_start_time",
+        "traces",
+        ["project_rowid", "start_time"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_traces_project_rowid_start_time", table_name="traces")
@@ -0,0 +1,114 @@
+"""hourly rollups of spans
+
+Revision ID: 5a1f3c0e9d27
+Revises: 3be8647b87d8
+Create Date: 2026-10-17 14:03:52.118904
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5a1f3c0e9d27"
+down_revision: Union[str, None] = "3be8647b87d8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "span_rollups",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column(
+            "project_rowid",
+            sa.Integer,
+            sa.ForeignKey("projects.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("hour", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("span_kind", sa.String, nullable=False),
+        sa.Column("is_root", sa.Boolean, nullable=False),
+        sa.Column("num_spans", sa.Integer, nullable=False),
+        sa.Column("num_errors", sa.Integer, nullable=False),
+        sa.Column("llm_token_count_prompt", sa.Float, nullable=False),
+        sa.Column("llm_token_count_completion", sa.Float, nullable=False),
+        sa.Column("min_start_time", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("max_end_time", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.UniqueConstraint(
+            "project_rowid",
+            "hour",
+            "span_kind",
+            "is_root",
+            name="uq_span_rollups_project_rowid_hour_span_kind_is_root",
+        ),
+    )
+    # Roll up the spans that are already there, the same way `phoenix.db.span_rollups` does.
+    traces = sa.table("traces", sa.column("id"), sa.column("project_rowid"))
+    spans = sa.table(
+        "spans",
+        sa.column("trace_rowid"),
+        sa.column("parent_id"),
+        sa.column("span_kind"),
+        sa.column("start_time"),
+        sa.column("end_time"),
+        sa.column("attributes", sa.JSON),
+        sa.column("status_code"),
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        utc, hour_ = sa.literal_column("'UTC'"), sa.literal_column("'hour'")
+        hour = sa.func.timezone(
+            utc, sa.func.date_trunc(hour_, sa.func.timezone(utc, spans.c.start_time))
+        )
+    else:
+        hour = sa.func.strftime(sa.literal_column("'%Y-%m-%d %H:00:00.000000'"), spans.c.start_time)
+    is_root = spans.c.parent_id.is_(None)
+    op.execute(
+        sa.insert(
+            sa.table("span_rollups", *(sa.column(name) for name in _COLUMN_NAMES))
+        ).from_select(
+            _COLUMN_NAMES,
+            sa.select(
+                traces.c.project_rowid,
+                hour,
+                spans.c.span_kind,
+                is_root,
+                sa.func.count(),
+                sa.func.sum(sa.case((spans.c.status_code == "ERROR", 1), else_=0)),
+                sa.func.coalesce(
+                    sa.func.sum(spans.c.attributes[("llm", "token_count", "prompt")].as_float()),
+                    0,
+                ),
+                sa.func.coalesce(
+                    sa.func.sum(
+                        spans.c.attributes[("llm", "token_count", "completion")].as_float()
+                    ),
+                    0,
+                ),
+                sa.func.min(spans.c.start_time),
+                sa.func.max(spans.c.end_time),
+            )
+            .join_from(spans, traces, traces.c.id == spans.c.trace_rowid)
+            .group_by(traces.c.project_rowid, hour, spans.c.span_kind, is_root),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("span_rollups")
+
+
+_COLUMN_NAMES = (
+    "project_rowid",
+    "hour",
+    "span_kind",
+    "is_root",
+    "num_spans",
+    "num_errors",
+    "llm_token_count_prompt",
+    "llm_token_count_completion",
+    "min_start_time",
+    "max_end_time",
+)
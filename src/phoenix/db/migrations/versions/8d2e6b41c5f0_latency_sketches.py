@@ -0,0 +1,97 @@
+"""latency sketches
+
+Revision ID: 8d2e6b41c5f0
+Revises: 5a1f3c0e9d27
+Create Date: 2026-10-17 16:21:07.550183
+
+"""
+
+from collections import defaultdict
+from datetime import timezone
+from typing import DefaultDict, Sequence, Tuple, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from phoenix.db.latency_sketches import DDSketch
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2e6b41c5f0"
+down_revision: Union[str, None] = "5a1f3c0e9d27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    latency_sketches = op.create_table(
+        "latency_sketches",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column(
+            "project_rowid",
+            sa.Integer,
+            sa.ForeignKey("projects.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("hour", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column(
+            "kind",
+            sa.String,
+            sa.CheckConstraint("kind IN ('span', 'trace')", name="valid_kind"),
+            nullable=False,
+        ),
+        sa.Column("sketch", sa.LargeBinary, nullable=False),
+        sa.UniqueConstraint(
+            "project_rowid",
+            "hour",
+            "kind",
+            name="uq_latency_sketches_project_rowid_hour_kind",
+        ),
+    )
+    # Sketch the spans and traces that are already there. The sketches are
+    # built in Python, a row at a time, so the rows are streamed.
+    traces = sa.table(
+        "traces",
+        sa.column("id"),
+        sa.column("project_rowid"),
+        sa.column("start_time", sa.TIMESTAMP(timezone=True)),
+        sa.column("end_time", sa.TIMESTAMP(timezone=True)),
+    )
+    spans = sa.table(
+        "spans",
+        sa.column("trace_rowid"),
+        sa.column("start_time", sa.TIMESTAMP(timezone=True)),
+        sa.column("end_time", sa.TIMESTAMP(timezone=True)),
+    )
+    connection = op.get_bind()
+    for kind, stmt in (
+        (
+            "span",
+            sa.select(traces.c.project_rowid, spans.c.start_time, spans.c.end_time).join_from(
+                spans, traces, traces.c.id == spans.c.trace_rowid
+            ),
+        ),
+        (
+            "trace",
+            sa.select(traces.c.project_rowid, traces.c.start_time, traces.c.end_time),
+        ),
+    ):
+        sketches: DefaultDict[Tuple[int, object], DDSketch] = defaultdict(DDSketch)
+        result = connection.execution_options(yield_per=10_000).execute(stmt)
+        for project_rowid, start_time, end_time in result:
+            if start_time.tzinfo is None:
+                # SQLite returns the UTC timestamps without a time zone.
+                start_time = start_time.replace(tzinfo=timezone.utc)
+                end_time = end_time.replace(tzinfo=timezone.utc)
+            hour = start_time.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+            sketches[(project_rowid, hour)].add((end_time - start_time).total_seconds() * 1000)
+        op.bulk_insert(
+            latency_sketches,
+            [
+                dict(project_rowid=project_rowid, hour=hour, kind=kind, sketch=sketch.to_bytes())
+                for (project_rowid, hour), sketch in sketches.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("latency_sketches")
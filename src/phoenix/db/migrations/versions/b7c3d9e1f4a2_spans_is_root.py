@@ -0,0 +1,47 @@
+"""flag root spans
+
+Revision ID: b7c3d9e1f4a2
+Revises: 8d2e6b41c5f0
+Create Date: 2026-10-17 18:40:13.902655
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7c3d9e1f4a2"
+down_revision: Union[str, None] = "8d2e6b41c5f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "spans",
+        sa.Column("is_root", sa.Boolean, nullable=False, server_default=sa.false()),
+    )
+    # A root span is any span whose parent span is missing in the database,
+    # even if its `parent_id` may not be NULL.
+    spans = sa.table("spans", sa.column("span_id"), sa.column("parent_id"), sa.column("is_root"))
+    parents = spans.alias("parents")
+    op.execute(
+        spans.update()
+        .where(~sa.exists().where(parents.c.span_id == spans.c.parent_id))
+        .values(is_root=True)
+    )
+    op.create_index(
+        "ix_spans_root_trace_rowid_start_time",
+        "spans",
+        ["trace_rowid", "start_time"],
+        unique=False,
+        postgresql_where=sa.text("is_root"),
+        sqlite_where=sa.text("is_root"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_spans_root_trace_rowid_start_time", table_name="spans")
+    op.drop_column("spans", "is_root")
@@ -0,0 +1,66 @@
+"""denormalize the project of spans
+
+Revision ID: c4e8a2f6d1b3
+Revises: b7c3d9e1f4a2
+Create Date: 2026-10-17 20:12:45.306271
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e8a2f6d1b3"
+down_revision: Union[str, None] = "b7c3d9e1f4a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The column is added as nullable so that existing spans can be backfilled.
+    op.add_column("spans", sa.Column("project_rowid", sa.Integer, nullable=True))
+    spans = sa.table("spans", sa.column("trace_rowid"), sa.column("project_rowid"))
+    traces = sa.table("traces", sa.column("id"), sa.column("project_rowid"))
+    op.execute(
+        spans.update().values(
+            project_rowid=sa.select(traces.c.project_rowid)
+            .where(traces.c.id == spans.c.trace_rowid)
+            .scalar_subquery()
+        )
+    )
+    # SQLite can't add constraints to an existing column without recreating
+    # the table, which would lose the expression indexes on it, so there the
+    # column stays nullable and without a foreign key, although it's always set
+    # on insert and its spans are deleted along with their traces regardless.
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column("spans", "project_rowid", nullable=False)
+        op.create_foreign_key(
+            "fk_spans_project_rowid_projects",
+            "spans",
+            "projects",
+            ["project_rowid"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+    op.create_index(
+        "ix_spans_project_rowid_start_time",
+        "spans",
+        ["project_rowid", "start_time"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_spans_project_rowid_id",
+        "spans",
+        ["project_rowid", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_spans_project_rowid_id", table_name="spans")
+    op.drop_index("ix_spans_project_rowid_start_time", table_name="spans")
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("fk_spans_project_rowid_projects", "spans", type_="foreignkey")
+    op.drop_column("spans", "project_rowid")
@@ -15,8 +15,10 @@ from sqlalchemy import (
     String,
     TypeDecorator,
     UniqueConstraint,
+    false,
     func,
     insert,
+    literal_column,
     text,
 )
 from sqlalchemy.dialects import postgresql
@@ -158,6 +160,7 @@ class Trace(Base):
         UniqueConstraint(
             "trace_id",
         ),
+        Index("ix_traces_project_rowid_start_time", "project_rowid", "start_time"),
     )
 
 
@@ -168,6 +171,11 @@ class Span(Base):
         ForeignKey("traces.id", ondelete="CASCADE"),
         index=True,
     )
+    # Same as the trace's, so that spans can be filtered by project without
+    # joining the traces.
+    project_rowid: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"),
+    )
     span_id: Mapped[str]
     parent_id: Mapped[Optional[str]] = mapped_column(index=True)
     name: Mapped[str]
@@ -180,6 +188,8 @@ class Span(Base):
         CheckConstraint("status_code IN ('OK', 'ERROR', 'UNSET')", name="valid_status")
     )
     status_message: Mapped[str]
+    # Whether the span's parent, if any, is missing from the database.
+    is_root: Mapped[bool] = mapped_column(server_default=false())
 
     # TODO(mikeldking): is computed columns possible here
     cumulative_error_count: Mapped[int]
@@ -210,6 +220,15 @@ class Span(Base):
             sqlite_on_conflict="IGNORE",
         ),
         Index("ix_latency", text("(end_time - start_time)")),
+        Index("ix_spans_project_rowid_start_time", "project_rowid", "start_time"),
+        Index("ix_spans_project_rowid_id", "project_rowid", "id"),
+        Index(
+            "ix_spans_root_trace_rowid_start_time",
+            "trace_rowid",
+            "start_time",
+            postgresql_where=text("is_root"),
+            sqlite_where=text("is_root"),
+        ),
         Index(
             "ix_cumulative_llm_token_count_total",
             text("(cumulative_llm_token_count_prompt + cumulative_llm_token_count_completion)"),
@@ -254,6 +273,36 @@ def _(element: Any, compiler: Any, **kw: Any) -> Any:
     )
 
 
+class HourOf(expression.FunctionElement[datetime]):
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    inherit_cache = True
+    type = UtcTimeStamp()
+    name = "hour_of"
+
+
+@compiles(HourOf)  # type: ignore
+def _(element: Any, compiler: Any, **kw: Any) -> Any:
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    (timestamp,) = list(element.clauses)
+    # Truncate in UTC, because the session's time zone may be off by a fraction of an hour.
+    # The arguments are literals, so that the expression can also be grouped by.
+    utc, hour = literal_column("'UTC'"), literal_column("'hour'")
+    return compiler.process(
+        func.timezone(utc, func.date_trunc(hour, func.timezone(utc, timestamp))),
+        **kw,
+    )
+
+
+@compiles(HourOf, "sqlite")  # type: ignore
+def _(element: Any, compiler: Any, **kw: Any) -> Any:
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    (timestamp,) = list(element.clauses)
+    # The format matches how sqlalchemy stores timestamps in sqlite.
+    return compiler.process(
+        func.strftime(literal_column("'%Y-%m-%d %H:00:00.000000'"), timestamp), **kw
+    )
+
+
 class TextContains(expression.FunctionElement[str]):
     # See https://docs.sqlalchemy.org/en/20/core/compiler.html
     inherit_cache = True
@@ -293,6 +342,61 @@ async def init_models(engine: AsyncEngine) -> None:
         )
 
 
+class SpanRollup(Base):
+    """
+    Aggregates of the spans of a project that started within an hour, kept up to
+    date as spans are inserted and traces are deleted.
+    """
+
+    __tablename__ = "span_rollups"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    project_rowid: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"),
+    )
+    hour: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    span_kind: Mapped[str]
+    is_root: Mapped[bool]
+    num_spans: Mapped[int]
+    num_errors: Mapped[int]
+    llm_token_count_prompt: Mapped[float]
+    llm_token_count_completion: Mapped[float]
+    min_start_time: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    max_end_time: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    __table_args__ = (
+        UniqueConstraint(
+            "project_rowid",
+            "hour",
+            "span_kind",
+            "is_root",
+        ),
+    )
+
+
+class LatencySketch(Base):
+    """
+    A serialized sketch of the latencies of the spans, or of the traces, of a
+    project that started within an hour (see `phoenix.db.latency_sketches`).
+    """
+
+    __tablename__ = "latency_sketches"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    project_rowid: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"),
+    )
+    hour: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    kind: Mapped[str] = mapped_column(
+        CheckConstraint("kind IN ('span', 'trace')", name="valid_kind"),
+    )
+    sketch: Mapped[bytes]
+    __table_args__ = (
+        UniqueConstraint(
+            "project_rowid",
+            "hour",
+            "kind",
+        ),
+    )
+
+
 class SpanAnnotation(Base):
     __tablename__ = "span_annotations"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -0,0 +1,201 @@
+"""
+Clears and deletes projects in the background. The traces of a project are
+deleted in chunks ordered by rowid, each in its own transaction and with a pause
+in between, so that a large project doesn't hold the database, and with it the
+bulk inserter, for minutes. A project being deleted is hidden in the meantime.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import (
+    AbstractSet,
+    AsyncContextManager,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import TypeAlias
+
+from phoenix.db import models
+from phoenix.db.insertion.span import ClearProjectSpansEvent
+from phoenix.db.span_rollups import delete_traces
+from phoenix.server.api.dataloaders import CacheForDataLoaders
+
+logger = logging.getLogger(__name__)
+
+ProjectRowId: TypeAlias = int
+
+_CHUNK_SIZE = 500
+_PAUSE = 0.1
+_MAX_NUM_FINISHED_JOBS = 100
+
+
+class ProjectDeletionKind(Enum):
+    CLEAR = auto()
+    DELETE = auto()
+
+
+class ProjectDeletionStatus(Enum):
+    RUNNING = auto()
+    COMPLETED = auto()
+    FAILED = auto()
+
+
+@dataclass
+class ProjectDeletionJob:
+    id: int
+    project_rowid: ProjectRowId
+    kind: ProjectDeletionKind
+    status: ProjectDeletionStatus = ProjectDeletionStatus.RUNNING
+    num_deleted_traces: int = 0
+    error: Optional[str] = None
+
+
+class ProjectDeleter:
+    def __init__(
+        self,
+        db: Callable[[], AsyncContextManager[AsyncSession]],
+        *,
+        chunk_size: int = _CHUNK_SIZE,
+        pause: float = _PAUSE,
+        cache_for_dataloaders: Optional[CacheForDataLoaders] = None,
+        invalidate: Callable[[ClearProjectSpansEvent], None] = lambda _: None,
+    ) -> None:
+        """
+        :param db: A function to initiate a new database session.
+        :param chunk_size: The maximum number of traces deleted per transaction.
+        :param pause: The number of seconds to wait between transactions.
+        :param invalidate: Called with the projects whose traces have been deleted,
+        e.g. to drop the bulk inserter's cached rowids.
+        """
+        self._db = db
+        self._chunk_size = chunk_size
+        self._pause = pause
+        self._cache_for_dataloaders = cache_for_dataloaders
+        self._invalidate = invalidate
+        self._jobs: Dict[int, ProjectDeletionJob] = {}
+        self._finished_job_ids: Deque[int] = deque()
+        self._running_jobs_by_project: Dict[ProjectRowId, ProjectDeletionJob] = {}
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._last_job_id = 0
+
+    @property
+    def hidden_project_rowids(self) -> AbstractSet[ProjectRowId]:
+        """The projects that are being deleted."""
+        return {
+            project_rowid
+            for project_rowid, job in self._running_jobs_by_project.items()
+            if job.kind is ProjectDeletionKind.DELETE
+        }
+
+    def get_job(self, job_id: int) -> Optional[ProjectDeletionJob]:
+        return self._jobs.get(job_id)
+
+    async def __aenter__(self) -> None:
+        pass
+
+    async def __aexit__(self, *args: object) -> None:
+        # What's left of an interrupted job can simply be cleared or deleted again.
+        for task in self._tasks:
+            task.cancel()
+        for task in list(self._tasks):
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def clear_project(self, project_rowid: ProjectRowId) -> ProjectDeletionJob:
+        """
+        Starts deleting the traces of the project, except for those inserted
+        from now on.
+        """
+        if (job := self._running_jobs_by_project.get(project_rowid)) is not None:
+            return job
+        async with self._db() as session:
+            max_trace_rowid = await session.scalar(
+                select(func.max(models.Trace.id)).where(models.Trace.project_rowid == project_rowid)
+            )
+        return self._start(project_rowid, ProjectDeletionKind.CLEAR, max_trace_rowid or 0)
+
+    async def delete_project(self, project_rowid: ProjectRowId) -> ProjectDeletionJob:
+        """
+        Hides the project and starts deleting it along with its traces.
+        """
+        job = self._running_jobs_by_project.get(project_rowid)
+        if job is not None and job.kind is ProjectDeletionKind.DELETE:
+            return job
+        # A deletion overtakes a clear, which will find nothing left to delete.
+        return self._start(project_rowid, ProjectDeletionKind.DELETE, None)
+
+    def _start(
+        self,
+        project_rowid: ProjectRowId,
+        kind: ProjectDeletionKind,
+        max_trace_rowid: Optional[int],
+    ) -> ProjectDeletionJob:
+        self._last_job_id += 1
+        job = ProjectDeletionJob(id=self._last_job_id, project_rowid=project_rowid, kind=kind)
+        self._jobs[job.id] = job
+        self._running_jobs_by_project[project_rowid] = job
+        task = asyncio.create_task(self._run(job, max_trace_rowid))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: ProjectDeletionJob, max_trace_rowid: Optional[int]) -> None:
+        try:
+            while trace_rowids := await self._get_trace_rowids(job, max_trace_rowid):
+                async with self._db() as session:
+                    await delete_traces(session, trace_rowids)
+                job.num_deleted_traces += len(trace_rowids)
+                self._invalidate_project(job.project_rowid)
+                # Let the bulk inserter have the database before the next chunk.
+                await asyncio.sleep(self._pause)
+            if job.kind is ProjectDeletionKind.DELETE:
+                async with self._db() as session:
+                    await session.execute(
+                        delete(models.Project).where(models.Project.id == job.project_rowid)
+                    )
+                self._invalidate_project(job.project_rowid)
+            job.status = ProjectDeletionStatus.COMPLETED
+        except Exception as error:
+            logger.exception(f"Failed to {job.kind.name.lower()} project {job.project_rowid}")
+            job.status = ProjectDeletionStatus.FAILED
+            job.error = str(error)
+        finally:
+            self._finish(job)
+
+    async def _get_trace_rowids(
+        self, job: ProjectDeletionJob, max_trace_rowid: Optional[int]
+    ) -> List[int]:
+        stmt = (
+            select(models.Trace.id)
+            .where(models.Trace.project_rowid == job.project_rowid)
+            .order_by(models.Trace.id)
+            .limit(self._chunk_size)
+        )
+        if max_trace_rowid is not None:
+            stmt = stmt.where(models.Trace.id <= max_trace_rowid)
+        async with self._db() as session:
+            return list(await session.scalars(stmt))
+
+    def _invalidate_project(self, project_rowid: ProjectRowId) -> None:
+        event = ClearProjectSpansEvent(project_rowid=project_rowid)
+        if (cache := self._cache_for_dataloaders) is not None:
+            cache.invalidate(event)
+        self._invalidate(event)
+
+    def _finish(self, job: ProjectDeletionJob) -> None:
+        if self._running_jobs_by_project.get(job.project_rowid) is job:
+            del self._running_jobs_by_project[job.project_rowid]
+        self._finished_job_ids.append(job.id)
+        while len(self._finished_job_ids) > _MAX_NUM_FINISHED_JOBS:
+            self._jobs.pop(self._finished_job_ids.popleft(), None)
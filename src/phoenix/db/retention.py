@@ -0,0 +1,268 @@
+"""
+Ages traces out of the database according to retention policies, by deleting
+the oldest traces of each project a chunk at a time. Every chunk is deleted in
+its own transaction, with a pause in between, so that the bulk inserter isn't
+kept waiting for the database for long.
+"""
+
+import asyncio
+import contextlib
+import logging
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import (
+    AsyncContextManager,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import TypeAlias
+
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.insertion.span import ClearProjectSpansEvent
+from phoenix.db.span_rollups import delete_traces
+from phoenix.server.api.dataloaders import CacheForDataLoaders
+
+logger = logging.getLogger(__name__)
+
+ProjectRowId: TypeAlias = int
+TraceRowId: TypeAlias = int
+
+_INTERVAL = 600.0
+_CHUNK_SIZE = 500
+_PAUSE = 0.1
+
+
+class RetentionPolicy(NamedTuple):
+    max_age: Optional[timedelta] = None
+    """Traces that started longer ago than this are deleted."""
+    max_num_spans: Optional[int] = None
+    """The oldest traces are deleted while the project has more spans than this."""
+
+    def __bool__(self) -> bool:
+        return self.max_age is not None or self.max_num_spans is not None
+
+
+class TraceRetention:
+    def __init__(
+        self,
+        db: Callable[[], AsyncContextManager[AsyncSession]],
+        *,
+        default_policy: RetentionPolicy = RetentionPolicy(),
+        project_policies: Optional[Mapping[str, RetentionPolicy]] = None,
+        max_database_bytes: Optional[int] = None,
+        interval: float = _INTERVAL,
+        chunk_size: int = _CHUNK_SIZE,
+        pause: float = _PAUSE,
+        cache_for_dataloaders: Optional[CacheForDataLoaders] = None,
+        invalidate: Callable[[ClearProjectSpansEvent], None] = lambda _: None,
+        enable_prometheus: bool = False,
+    ) -> None:
+        """
+        :param db: A function to initiate a new database session.
+        :param default_policy: The policy of projects that don't have their own.
+        :param project_policies: The policies of individual projects, keyed by name.
+        A project's own policy replaces the default one.
+        :param max_database_bytes: The oldest traces, whatever their project, are
+        deleted while the database uses more bytes than this. Only supported for
+        SQLite, because PostgreSQL doesn't give back the space of deleted rows
+        until it is vacuumed.
+        :param interval: The number of seconds between passes over the projects.
+        :param chunk_size: The maximum number of traces deleted per transaction.
+        :param pause: The number of seconds to wait between transactions.
+        :param invalidate: Called with the projects whose traces have been deleted,
+        e.g. to drop the bulk inserter's cached rowids.
+        """
+        self._db = db
+        self._default_policy = default_policy
+        self._project_policies = dict(project_policies or {})
+        self._max_database_bytes = max_database_bytes
+        self._interval = interval
+        self._chunk_size = chunk_size
+        self._pause = pause
+        self._cache_for_dataloaders = cache_for_dataloaders
+        self._invalidate = invalidate
+        self._enable_prometheus = enable_prometheus
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def is_enabled(self) -> bool:
+        return bool(
+            self._default_policy
+            or any(self._project_policies.values())
+            or self._max_database_bytes is not None
+        )
+
+    async def __aenter__(self) -> None:
+        if self.is_enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def __aexit__(self, *args: object) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.enforce()
+            except Exception:
+                logger.exception("Failed to enforce the trace retention policies")
+                if self._enable_prometheus:
+                    from phoenix.server.prometheus import RETENTION_EXCEPTIONS
+
+                    RETENTION_EXCEPTIONS.inc()
+            await asyncio.sleep(self._interval)
+
+    async def enforce(self) -> int:
+        """
+        Deletes every trace that the policies say should go, and returns how many
+        were deleted.
+        """
+        start = perf_counter()
+        async with self._db() as session:
+            projects = (await session.execute(select(models.Project.id, models.Project.name))).all()
+        num_deleted = 0
+        for project_rowid, project_name in projects:
+            policy = self._project_policies.get(project_name, self._default_policy)
+            if policy.max_age is not None:
+                num_deleted += await self._delete_expired(
+                    project_rowid, datetime.now(timezone.utc) - policy.max_age
+                )
+            if policy.max_num_spans is not None:
+                num_deleted += await self._delete_excess_spans(project_rowid, policy.max_num_spans)
+        if self._max_database_bytes is not None:
+            num_deleted += await self._delete_excess_bytes(self._max_database_bytes)
+        if num_deleted:
+            logger.info(f"Deleted {num_deleted} traces according to the retention policies")
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import RETENTION_PASS_TIME
+
+            RETENTION_PASS_TIME.observe(perf_counter() - start)
+        return num_deleted
+
+    async def _delete_expired(self, project_rowid: ProjectRowId, cutoff: datetime) -> int:
+        num_deleted = 0
+        while True:
+            async with self._db() as session:
+                trace_rowids = list(
+                    await session.scalars(
+                        select(models.Trace.id)
+                        .where(models.Trace.project_rowid == project_rowid)
+                        .where(models.Trace.start_time < cutoff)
+                        .order_by(models.Trace.start_time)
+                        .limit(self._chunk_size)
+                    )
+                )
+            if not trace_rowids:
+                return num_deleted
+            await self._delete(trace_rowids, {project_rowid})
+            num_deleted += len(trace_rowids)
+
+    async def _delete_excess_spans(self, project_rowid: ProjectRowId, max_num_spans: int) -> int:
+        async with self._db() as session:
+            num_spans = await session.scalar(
+                select(func.count(models.Span.id)).where(models.Span.project_rowid == project_rowid)
+            )
+        num_excess_spans = (num_spans or 0) - max_num_spans
+        num_deleted = 0
+        while num_excess_spans > 0:
+            oldest = (
+                select(models.Trace.id, models.Trace.start_time)
+                .where(models.Trace.project_rowid == project_rowid)
+                .order_by(models.Trace.start_time)
+                .limit(self._chunk_size)
+                .subquery()
+            )
+            async with self._db() as session:
+                num_spans_by_trace = (
+                    await session.execute(
+                        select(oldest.c.id, func.count(models.Span.id))
+                        .outerjoin_from(oldest, models.Span, models.Span.trace_rowid == oldest.c.id)
+                        .group_by(oldest.c.id, oldest.c.start_time)
+                        .order_by(oldest.c.start_time)
+                    )
+                ).all()
+            if not num_spans_by_trace:
+                break
+            trace_rowids: List[TraceRowId] = []
+            for trace_rowid, num_trace_spans in num_spans_by_trace:
+                if num_excess_spans <= 0:
+                    break
+                trace_rowids.append(trace_rowid)
+                num_excess_spans -= num_trace_spans
+            await self._delete(trace_rowids, {project_rowid})
+            num_deleted += len(trace_rowids)
+        return num_deleted
+
+    async def _delete_excess_bytes(self, max_database_bytes: int) -> int:
+        num_deleted = 0
+        while True:
+            async with self._db() as session:
+                if (num_bytes := await _get_database_bytes(session)) is None:
+                    logger.warning(
+                        "A maximum database size is only supported for SQLite, so it is ignored"
+                    )
+                    self._max_database_bytes = None
+                    return num_deleted
+                if self._enable_prometheus:
+                    from phoenix.server.prometheus import RETENTION_DATABASE_BYTES
+
+                    RETENTION_DATABASE_BYTES.set(num_bytes)
+                if num_bytes <= max_database_bytes:
+                    return num_deleted
+                oldest = (
+                    await session.execute(
+                        select(models.Trace.id, models.Trace.project_rowid)
+                        .order_by(models.Trace.start_time)
+                        .limit(self._chunk_size)
+                    )
+                ).all()
+            if not oldest:
+                return num_deleted
+            await self._delete(
+                [trace_rowid for trace_rowid, _ in oldest],
+                {project_rowid for _, project_rowid in oldest},
+            )
+            num_deleted += len(oldest)
+
+    async def _delete(
+        self, trace_rowids: List[TraceRowId], project_rowids: Set[ProjectRowId]
+    ) -> None:
+        async with self._db() as session:
+            await delete_traces(session, trace_rowids)
+        for project_rowid in project_rowids:
+            event = ClearProjectSpansEvent(project_rowid=project_rowid)
+            if (cache := self._cache_for_dataloaders) is not None:
+                cache.invalidate(event)
+            self._invalidate(event)
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import RETENTION_DELETED_TRACES
+
+            RETENTION_DELETED_TRACES.inc(len(trace_rowids))
+        # Let the bulk inserter have the database before the next chunk.
+        await asyncio.sleep(self._pause)
+
+
+async def _get_database_bytes(session: AsyncSession) -> Optional[int]:
+    """
+    Returns the number of bytes used by the database, not counting free pages,
+    or None if that can't be known for the dialect.
+    """
+    if SupportedSQLDialect(session.bind.dialect.name) is not SupportedSQLDialect.SQLITE:
+        return None
+    pragmas: Dict[str, int] = {}
+    for pragma in ("page_size", "page_count", "freelist_count"):
+        pragmas[pragma] = int(await session.scalar(text(f"PRAGMA {pragma}")) or 0)
+    return (pragmas["page_count"] - pragmas["freelist_count"]) * pragmas["page_size"]
@@ -0,0 +1,210 @@
+"""
+Maintains the `span_rollups` table, which aggregates the spans of each project
+per hour (by the span's start time), per span kind and per whether the span is a
+root span. Project summaries over long time ranges then read a handful of rollup
+rows per hour instead of every span, and only scan raw spans for the partial
+hours at the edges of the time range (see `split_time_range`).
+
+The rollups are computed in SQL from the span rows themselves, so that they
+agree exactly with aggregating the raw spans. They are incremented in the same
+transaction that inserts the spans, and the affected hours are recomputed in the
+same transaction that deletes traces, along with the latency sketches (see
+`phoenix.db.latency_sketches`).
+
+Not to be confused with `phoenix.db.insertion.span_rollup`, which rolls up the
+cumulative counts of a span's descendants.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    DefaultDict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from openinference.semconv.trace import SpanAttributes
+from sqlalchemy import Insert, Select, case, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as insert_postgresql
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.functions import coalesce
+from typing_extensions import TypeAlias, assert_never
+
+from phoenix.datetime_utils import ceil_to_hour, floor_to_hour, normalize_datetime
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.insertion.helpers import chunks, excluded, greatest, least, max_rows_per_statement
+from phoenix.db.latency_sketches import get_trace_buckets, refresh_latency_sketches
+
+ProjectRowId: TypeAlias = int
+SpanRowId: TypeAlias = int
+TraceRowId: TypeAlias = int
+Bucket: TypeAlias = Tuple[ProjectRowId, datetime]
+TimeInterval: TypeAlias = Tuple[Optional[datetime], Optional[datetime]]
+
+HOUR = timedelta(hours=1)
+
+
+def split_time_range(
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> Tuple[Optional[TimeInterval], List[TimeInterval]]:
+    """
+    Splits the time range [start, end) into the whole hours that can be read
+    from the rollups, if any, and the partial hours at either edge that have to
+    be read from the raw spans. An open end stays open.
+    """
+    lo = None if start is None else ceil_to_hour(start)
+    hi = None if end is None else floor_to_hour(end)
+    if lo is not None and hi is not None and lo >= hi:
+        # There is no whole hour in between.
+        return None, [(start, end)]
+    edges: List[TimeInterval] = []
+    if start is not None and lo != normalize_datetime(start):
+        edges.append((start, lo))
+    if end is not None and hi != normalize_datetime(end):
+        edges.append((hi, end))
+    return (lo, hi), edges
+
+
+async def add_to_span_rollups(session: AsyncSession, span_rowids: Iterable[SpanRowId]) -> None:
+    """
+    Adds newly inserted spans to the rollups. Must be called in the transaction
+    that inserts the spans, and at most once per span.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    for chunk in chunks(span_rowids, max_rows_per_statement(dialect, 1)):
+        await session.execute(_increment(dialect, _aggregate().where(models.Span.id.in_(chunk))))
+
+
+async def delete_traces(session: AsyncSession, trace_rowids: Sequence[TraceRowId]) -> None:
+    """
+    Deletes the traces along with their spans, and recomputes the rollups and
+    latency sketches of the hours that the spans and traces were in.
+    """
+    buckets = await get_span_rollup_buckets(session, trace_rowids)
+    trace_buckets = await get_trace_buckets(session, trace_rowids)
+    await session.execute(delete(models.Trace).where(models.Trace.id.in_(trace_rowids)))
+    await refresh_span_rollups(session, buckets)
+    await refresh_latency_sketches(session, "span", buckets)
+    await refresh_latency_sketches(session, "trace", trace_buckets)
+
+
+async def get_span_rollup_buckets(
+    session: AsyncSession,
+    trace_rowids: Optional[Sequence[TraceRowId]] = None,
+) -> Set[Bucket]:
+    """
+    Returns the project hours that the spans of the traces are in, or that any
+    span is in if no traces are given.
+    """
+    stmt = select(models.Span.project_rowid, models.HourOf(models.Span.start_time)).distinct()
+    if trace_rowids is None:
+        return {tuple(row) for row in await session.execute(stmt)}  # type: ignore
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    buckets: Set[Bucket] = set()
+    for chunk in chunks(trace_rowids, max_rows_per_statement(dialect, 1)):
+        buckets.update(
+            tuple(row)  # type: ignore
+            for row in await session.execute(stmt.where(models.Span.trace_rowid.in_(chunk)))
+        )
+    return buckets
+
+
+async def refresh_span_rollups(session: AsyncSession, buckets: Iterable[Bucket]) -> None:
+    """
+    Recomputes the rollups of the project hours from the spans that are left.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    hours_by_project: DefaultDict[ProjectRowId, Set[datetime]] = defaultdict(set)
+    for project_rowid, hour in buckets:
+        hours_by_project[project_rowid].add(floor_to_hour(hour))
+    for project_rowid, hours in hours_by_project.items():
+        for chunk in chunks(sorted(hours), max_rows_per_statement(dialect, 1) - 3):
+            await session.execute(
+                delete(models.SpanRollup)
+                .where(models.SpanRollup.project_rowid == project_rowid)
+                .where(models.SpanRollup.hour.in_(chunk))
+            )
+            await session.execute(
+                insert(models.SpanRollup).from_select(
+                    _COLUMN_NAMES,
+                    _aggregate()
+                    .where(models.Span.project_rowid == project_rowid)
+                    # The range lets the project and start time index narrow down the scan.
+                    .where(chunk[0] <= models.Span.start_time)
+                    .where(models.Span.start_time < chunk[-1] + HOUR)
+                    .where(models.HourOf(models.Span.start_time).in_(chunk)),
+                )
+            )
+
+
+def _aggregate() -> Select[Any]:
+    hour = models.HourOf(models.Span.start_time)
+    is_root = models.Span.parent_id.is_(None)
+    return select(
+        models.Span.project_rowid,
+        hour,
+        models.Span.span_kind,
+        is_root,
+        func.count(),
+        func.sum(case((models.Span.status_code == "ERROR", 1), else_=0)),
+        coalesce(
+            func.sum(models.Span.attributes[_LLM_TOKEN_COUNT_PROMPT].as_float()),
+            0,
+        ),
+        coalesce(
+            func.sum(models.Span.attributes[_LLM_TOKEN_COUNT_COMPLETION].as_float()),
+            0,
+        ),
+        func.min(models.Span.start_time),
+        func.max(models.Span.end_time),
+    ).group_by(models.Span.project_rowid, hour, models.Span.span_kind, is_root)
+
+
+def _increment(dialect: SupportedSQLDialect, aggregate: Select[Any]) -> Insert:
+    proposed = excluded(dialect, models.SpanRollup)
+    table = models.SpanRollup
+    set_ = dict(
+        num_spans=table.num_spans + proposed.num_spans,
+        num_errors=table.num_errors + proposed.num_errors,
+        llm_token_count_prompt=table.llm_token_count_prompt + proposed.llm_token_count_prompt,
+        llm_token_count_completion=table.llm_token_count_completion
+        + proposed.llm_token_count_completion,
+        min_start_time=least(dialect, table.min_start_time, proposed.min_start_time),
+        max_end_time=greatest(dialect, table.max_end_time, proposed.max_end_time),
+    )
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        return (
+            insert_postgresql(table)
+            .from_select(_COLUMN_NAMES, aggregate)
+            .on_conflict_do_update(constraint=_CONSTRAINT, set_=set_)
+        )
+    if dialect is SupportedSQLDialect.SQLITE:
+        return (
+            insert_sqlite(table)
+            .from_select(_COLUMN_NAMES, aggregate)
+            .on_conflict_do_update(_KEY_COLUMN_NAMES, set_=set_)
+        )
+    assert_never(dialect)
+
+
+_KEY_COLUMN_NAMES = ("project_rowid", "hour", "span_kind", "is_root")
+_COLUMN_NAMES = (
+    *_KEY_COLUMN_NAMES,
+    "num_spans",
+    "num_errors",
+    "llm_token_count_prompt",
+    "llm_token_count_completion",
+    "min_start_time",
+    "max_end_time",
+)
+_CONSTRAINT = "uq_span_rollups_project_rowid_hour_span_kind_is_root"
+_LLM_TOKEN_COUNT_PROMPT = SpanAttributes.LLM_TOKEN_COUNT_PROMPT.split(".")
+_LLM_TOKEN_COUNT_COMPLETION = SpanAttributes.LLM_TOKEN_COUNT_COMPLETION.split(".")
@@ -0,0 +1,214 @@
+"""
+An append-only, on-disk spool for the bulk inserter, so that spans and
+evaluations accepted by the server survive a restart and a database outage
+doesn't have to be absorbed in memory.
+
+The spool is a directory of segment files named by sequence number. Each
+record in a segment is a one-byte kind, a four-byte big-endian length, and the
+payload: a serialized OTLP `ResourceSpans` holding one span (with the project
+name as a resource attribute) or a serialized `pb.Evaluation`. Records are read
+back in the order they were appended, and the read position is only committed,
+i.e. written to the `OFFSET` file, once the records up to it have been inserted.
+Anything after the committed position is read again after a restart.
+"""
+
+import logging
+import os
+import struct
+from enum import Enum
+from pathlib import Path
+from time import monotonic
+from typing import BinaryIO, List, NamedTuple, Tuple, Union
+
+from openinference.semconv.resource import ResourceAttributes
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from opentelemetry.proto.resource.v1.resource_pb2 import Resource
+from opentelemetry.proto.trace.v1.trace_pb2 import ResourceSpans, ScopeSpans
+from typing_extensions import assert_never
+
+import phoenix.trace.v1 as pb
+from phoenix.trace.otel import decode_otlp_span, encode_span_to_otlp
+from phoenix.trace.schemas import Span
+from phoenix.utilities.project import get_project_name
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">cI")
+_OFFSET_FILE_NAME = "OFFSET"
+_SEGMENT_SUFFIX = ".seg"
+
+
+class RecordKind(Enum):
+    SPAN = b"S"
+    EVALUATION = b"E"
+
+
+class SpoolPosition(NamedTuple):
+    segment: int
+    offset: int
+
+
+Record = Union[Tuple[Span, str], pb.Evaluation]
+
+
+class Spool:
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_segment_bytes: int = 64 * 2**20,
+        fsync_interval: float = 1.0,
+    ) -> None:
+        """
+        :param directory: The directory holding the segment files. It's created if
+        it doesn't exist.
+        :param max_segment_bytes: The size after which a new segment is started.
+        :param fsync_interval: The minimum number of seconds between fsyncs of the
+        segment being written, so that many appends share one fsync.
+        """
+        self._directory = directory
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_segment_bytes = max_segment_bytes
+        self._fsync_interval = fsync_interval
+        self._last_fsync = monotonic()
+        self._dirty = False
+        self._committed = self._read_committed_position()
+        self._reader = self._committed
+        segments = self._segments()
+        # Appending always starts a new segment, so that a record truncated by
+        # a crash is never followed by new records in the same file.
+        self._writer_segment = (segments[-1] + 1) if segments else self._committed.segment
+        self._writer: BinaryIO = open(self._segment_path(self._writer_segment), "ab")
+
+    def append_span(self, span: Span, project_name: str) -> None:
+        resource_spans = ResourceSpans(
+            resource=Resource(
+                attributes=[
+                    KeyValue(
+                        key=ResourceAttributes.PROJECT_NAME,
+                        value=AnyValue(string_value=project_name),
+                    )
+                ]
+            ),
+            scope_spans=[ScopeSpans(spans=[encode_span_to_otlp(span)])],
+        )
+        self._append(RecordKind.SPAN, resource_spans.SerializeToString())
+
+    def append_evaluation(self, evaluation: pb.Evaluation) -> None:
+        self._append(RecordKind.EVALUATION, evaluation.SerializeToString())
+
+    def read(self, max_num_records: int) -> Tuple[List[Record], SpoolPosition]:
+        """
+        Reads up to `max_num_records` records past the read position and
+        advances it. Returns the records and the position to commit once they
+        have been inserted.
+        """
+        self.sync()
+        records: List[Record] = []
+        segment, offset = self._reader
+        while len(records) < max_num_records and segment <= self._writer_segment:
+            path = self._segment_path(segment)
+            if not path.exists():
+                segment, offset = segment + 1, 0
+                continue
+            with open(path, "rb") as f:
+                f.seek(offset)
+                while len(records) < max_num_records:
+                    if len(header := f.read(_HEADER.size)) < _HEADER.size:
+                        break
+                    kind, length = _HEADER.unpack(header)
+                    if len(payload := f.read(length)) < length:
+                        break
+                    offset += _HEADER.size + length
+                    try:
+                        records.append(_decode(RecordKind(kind), payload))
+                    except Exception:
+                        logger.exception(f"Skipping a corrupt record in spool segment {path}")
+            if len(records) >= max_num_records or segment == self._writer_segment:
+                break
+            # Whatever is left of an older segment is a record truncated by a crash.
+            segment, offset = segment + 1, 0
+        self._reader = SpoolPosition(segment, offset)
+        return records, self._reader
+
+    def commit(self, position: SpoolPosition) -> None:
+        """
+        Marks everything up to `position` as inserted, and deletes the segments
+        that are no longer needed.
+        """
+        tmp = self._directory / f"{_OFFSET_FILE_NAME}.tmp"
+        tmp.write_text(f"{position.segment} {position.offset}")
+        os.replace(tmp, self._directory / _OFFSET_FILE_NAME)
+        self._committed = position
+        for segment in self._segments():
+            if segment < position.segment:
+                self._segment_path(segment).unlink(missing_ok=True)
+
+    def rewind(self) -> None:
+        """
+        Moves the read position back to the last commit, so that records read
+        but not inserted, e.g. due to a database outage, are read again.
+        """
+        self._reader = self._committed
+
+    def has_unread(self) -> bool:
+        segment, offset = self._reader
+        # Skip over older segments that have been read to the end, e.g. the
+        # last one written to before a restart.
+        while segment < self._writer_segment:
+            path = self._segment_path(segment)
+            if path.exists() and offset < path.stat().st_size:
+                return True
+            segment, offset = segment + 1, 0
+        return offset < self._writer.tell()
+
+    def sync(self, force: bool = False) -> None:
+        if not self._dirty:
+            return
+        self._writer.flush()
+        if force or monotonic() - self._last_fsync >= self._fsync_interval:
+            os.fsync(self._writer.fileno())
+            self._last_fsync = monotonic()
+            self._dirty = False
+
+    def close(self) -> None:
+        self.sync(force=True)
+        self._writer.close()
+
+    def _append(self, kind: RecordKind, payload: bytes) -> None:
+        if self._writer.tell() >= self._max_segment_bytes:
+            self.sync(force=True)
+            self._writer.close()
+            self._writer_segment += 1
+            self._writer = open(self._segment_path(self._writer_segment), "ab")
+        self._writer.write(_HEADER.pack(kind.value, len(payload)))
+        self._writer.write(payload)
+        self._dirty = True
+
+    def _segments(self) -> List[int]:
+        return sorted(
+            int(path.stem)
+            for path in self._directory.glob(f"*{_SEGMENT_SUFFIX}")
+            if path.stem.isnumeric()
+        )
+
+    def _segment_path(self, segment: int) -> Path:
+        return self._directory / f"{segment:020d}{_SEGMENT_SUFFIX}"
+
+    def _read_committed_position(self) -> SpoolPosition:
+        path = self._directory / _OFFSET_FILE_NAME
+        if path.exists():
+            segment, offset = path.read_text().split()
+            return SpoolPosition(int(segment), int(offset))
+        segments = self._segments()
+        return SpoolPosition(segments[0] if segments else 0, 0)
+
+
+def _decode(kind: RecordKind, payload: bytes) -> Record:
+    if kind is RecordKind.SPAN:
+        resource_spans = ResourceSpans.FromString(payload)
+        project_name = get_project_name(resource_spans.resource.attributes)
+        return decode_otlp_span(resource_spans.scope_spans[0].spans[0]), project_name
+    if kind is RecordKind.EVALUATION:
+        return pb.Evaluation.FromString(payload)
+    assert_never(kind)
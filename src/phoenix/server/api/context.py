@@ -10,6 +10,7 @@ from starlette.websockets import WebSocket
 from typing_extensions import TypeAlias
 
 from phoenix.core.model_schema import Model
+from phoenix.db.project_deletion import ProjectDeleter
 from phoenix.server.api.dataloaders import (
     CacheForDataLoaders,
     DocumentEvaluationsDataLoader,
@@ -56,3 +57,4 @@ class Context:
     corpus: Optional[Model] = None
     streaming_last_updated_at: Callable[[ProjectRowId], Optional[datetime]] = lambda _: None
     read_only: bool = False
+    project_deleter: Optional[ProjectDeleter] = None
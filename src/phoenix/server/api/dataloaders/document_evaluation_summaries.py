@@ -134,8 +134,7 @@ def _get_stmt(
             mda.score,
             mda.document_position,
         )
-        .join(models.Trace)
-        .where(models.Trace.project_rowid == project_rowid)
+        .where(models.Span.project_rowid == project_rowid)
         .join(mda)
         .where(mda.name.in_(eval_names))
         .where(mda.annotator_kind == "LLM")
@@ -147,6 +146,8 @@ def _get_stmt(
     if end_time:
         stmt = stmt.where(models.Span.start_time < end_time)
     if filter_condition:
+        # The filter may refer to the trace, e.g. by its trace id.
+        stmt = stmt.join_from(models.Span, models.Trace)
         span_filter = SpanFilter(condition=filter_condition)
         stmt = span_filter(stmt)
     return stmt
@@ -118,8 +118,11 @@ def _get_stmt(
         name_column, label_column, score_column = msa.name, msa.label, msa.score
         annotator_kind_column = msa.annotator_kind
         time_column = models.Span.start_time
-        stmt = stmt.join(models.Span).join_from(models.Span, models.Trace)
+        project_rowid_column = models.Span.project_rowid
+        stmt = stmt.join(models.Span)
         if filter_condition:
+            # The filter may refer to the trace, e.g. by its trace id.
+            stmt = stmt.join_from(models.Span, models.Trace)
             sf = SpanFilter(filter_condition)
             stmt = sf(stmt)
     elif kind == "trace":
@@ -127,6 +130,7 @@ def _get_stmt(
         name_column, label_column, score_column = mta.name, mta.label, mta.score
         annotator_kind_column = mta.annotator_kind
         time_column = models.Trace.start_time
+        project_rowid_column = models.Trace.project_rowid
         stmt = stmt.join(models.Trace)
     else:
         assert_never(kind)
@@ -140,7 +144,7 @@ def _get_stmt(
     )
     stmt = stmt.group_by(name_column, label_column)
     stmt = stmt.order_by(name_column, label_column)
-    stmt = stmt.where(models.Trace.project_rowid == project_rowid)
+    stmt = stmt.where(project_rowid_column == project_rowid)
     stmt = stmt.where(annotator_kind_column == "LLM")
     stmt = stmt.where(or_(score_column.is_not(None), label_column.is_not(None)))
     stmt = stmt.where(name_column.in_(eval_names))
@@ -34,6 +34,8 @@ from typing_extensions import TypeAlias, assert_never
 
 from phoenix.db import models
 from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.latency_sketches import merge_latency_sketches
+from phoenix.db.span_rollups import split_time_range
 from phoenix.server.api.dataloaders.cache import TwoTierCache
 from phoenix.server.api.input_types.TimeRange import TimeRange
 from phoenix.trace.dsl import SpanFilter
@@ -44,28 +46,30 @@ TimeInterval: TypeAlias = Tuple[Optional[datetime], Optional[datetime]]
 FilterCondition: TypeAlias = Optional[str]
 Probability: TypeAlias = float
 QuantileValue: TypeAlias = float
+Exact: TypeAlias = bool
 
-Segment: TypeAlias = Tuple[Kind, TimeInterval, FilterCondition]
+Segment: TypeAlias = Tuple[Kind, TimeInterval, FilterCondition, Exact]
 Param: TypeAlias = Tuple[ProjectRowId, Probability]
 
-Key: TypeAlias = Tuple[Kind, ProjectRowId, Optional[TimeRange], FilterCondition, Probability]
+Key: TypeAlias = Tuple[Kind, ProjectRowId, Optional[TimeRange], FilterCondition, Probability, Exact]
 Result: TypeAlias = Optional[QuantileValue]
 ResultPosition: TypeAlias = int
 DEFAULT_VALUE: Result = None
 
 FloatCol: TypeAlias = SQLColumnExpression[Float[float]]
+IntCol: TypeAlias = SQLColumnExpression[int]
 
 
 def _cache_key_fn(key: Key) -> Tuple[Segment, Param]:
-    kind, project_rowid, time_range, filter_condition, probability = key
+    kind, project_rowid, time_range, filter_condition, probability, exact = key
     interval = (
         (time_range.start, time_range.end) if isinstance(time_range, TimeRange) else (None, None)
     )
-    return (kind, interval, filter_condition), (project_rowid, probability)
+    return (kind, interval, filter_condition, exact), (project_rowid, probability)
 
 
 _Section: TypeAlias = ProjectRowId
-_SubKey: TypeAlias = Tuple[TimeInterval, FilterCondition, Kind, Probability]
+_SubKey: TypeAlias = Tuple[TimeInterval, FilterCondition, Exact, Kind, Probability]
 
 
 class LatencyMsQuantileCache(
@@ -77,12 +81,12 @@ class LatencyMsQuantileCache(
             # interval endpoints are rounded down to the hour by the UI, so anything
             # older than an hour most likely won't be a cache-hit anyway.
             main_cache=TTLCache(maxsize=64, ttl=3600),
-            sub_cache_factory=lambda: LFUCache(maxsize=2 * 2 * 2 * 16),
+            sub_cache_factory=lambda: LFUCache(maxsize=2 * 2 * 2 * 2 * 16),
         )
 
     def _cache_key(self, key: Key) -> Tuple[_Section, _SubKey]:
-        (kind, interval, filter_condition), (project_rowid, probability) = _cache_key_fn(key)
-        return project_rowid, (interval, filter_condition, kind, probability)
+        (kind, interval, filter_condition, exact), (project_rowid, probability) = _cache_key_fn(key)
+        return project_rowid, (interval, filter_condition, exact, kind, probability)
 
 
 class LatencyMsQuantileDataLoader(DataLoader[Key, Result]):
@@ -123,16 +127,72 @@ async def _get_results(
     segment: Segment,
     params: Mapping[Param, List[ResultPosition]],
 ) -> AsyncIterator[Tuple[ResultPosition, QuantileValue]]:
-    kind, (start_time, end_time), filter_condition = segment
-    stmt = select(models.Trace.project_rowid)
+    kind, (start_time, end_time), filter_condition, exact = segment
+    if not exact and not filter_condition:
+        hours, edges = split_time_range(start_time, end_time)
+        if hours is not None:
+            results = _get_results_from_sketches(session, kind, hours, edges, params)
+            async for position, quantile_value in results:
+                yield position, quantile_value
+            return
+    stmt, pid, latency_column = _get_base_stmt(kind, (start_time, end_time), filter_condition)
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        results = _get_results_postgresql(session, stmt, pid, latency_column, params)
+    elif dialect is SupportedSQLDialect.SQLITE:
+        results = _get_results_sqlite(session, stmt, pid, latency_column, params)
+    else:
+        assert_never(dialect)
+    async for position, quantile_value in results:
+        yield position, quantile_value
+
+
+async def _get_results_from_sketches(
+    session: AsyncSession,
+    kind: Kind,
+    hours: TimeInterval,
+    edges: List[TimeInterval],
+    params: Mapping[Param, List[ResultPosition]],
+) -> AsyncIterator[Tuple[ResultPosition, QuantileValue]]:
+    """
+    Estimates the quantiles from the latency sketches of the whole hours, into
+    which the latencies of the partial hours at the edges are added one by one.
+    """
+    project_rowids = {project_rowid for project_rowid, _ in params.keys()}
+    sketches = await merge_latency_sketches(session, kind, project_rowids, *hours)
+    for interval in edges:
+        stmt, pid, latency_column = _get_base_stmt(kind, interval, None)
+        stmt = stmt.add_columns(latency_column).where(pid.in_(project_rowids))
+        async for project_rowid, latency_ms in await session.stream(stmt):
+            sketches[project_rowid].add(latency_ms)
+    for (project_rowid, probability), positions in params.items():
+        if (sketch := sketches.get(project_rowid)) is None:
+            continue
+        if (quantile_value := sketch.quantile(probability)) is None:
+            continue
+        for position in positions:
+            yield position, quantile_value
+
+
+def _get_base_stmt(
+    kind: Kind,
+    interval: TimeInterval,
+    filter_condition: FilterCondition,
+) -> Tuple[Select[Any], IntCol, FloatCol]:
+    start_time, end_time = interval
+    pid: IntCol
     if kind == "trace":
+        pid = models.Trace.project_rowid
         latency_column = cast(FloatCol, models.Trace.latency_ms)
         time_column = models.Trace.start_time
+        stmt = select(pid)
     elif kind == "span":
+        pid = models.Span.project_rowid
         latency_column = cast(FloatCol, models.Span.latency_ms)
         time_column = models.Span.start_time
-        stmt = stmt.join(models.Span)
+        stmt = select(pid)
         if filter_condition:
+            # The filter may refer to the trace, e.g. by its trace id.
+            stmt = stmt.join(models.Trace)
             sf = SpanFilter(filter_condition)
             stmt = sf(stmt)
     else:
@@ -141,26 +201,19 @@ async def _get_results(
         stmt = stmt.where(start_time <= time_column)
     if end_time:
         stmt = stmt.where(time_column < end_time)
-    if dialect is SupportedSQLDialect.POSTGRESQL:
-        results = _get_results_postgresql(session, stmt, latency_column, params)
-    elif dialect is SupportedSQLDialect.SQLITE:
-        results = _get_results_sqlite(session, stmt, latency_column, params)
-    else:
-        assert_never(dialect)
-    async for position, quantile_value in results:
-        yield position, quantile_value
+    return stmt, pid, latency_column
 
 
 async def _get_results_sqlite(
     session: AsyncSession,
     base_stmt: Select[Any],
+    pid: IntCol,
     latency_column: FloatCol,
     params: Mapping[Param, List[ResultPosition]],
 ) -> AsyncIterator[Tuple[ResultPosition, QuantileValue]]:
     projects_per_prob: DefaultDict[Probability, List[ProjectRowId]] = defaultdict(list)
     for project_rowid, probability in params.keys():
         projects_per_prob[probability].append(project_rowid)
-    pid = models.Trace.project_rowid
     for probability, project_rowids in projects_per_prob.items():
         pctl: FloatCol = func.percentile(latency_column, probability * 100)
         stmt = base_stmt.add_columns(pctl)
@@ -175,6 +228,7 @@ async def _get_results_sqlite(
 async def _get_results_postgresql(
     session: AsyncSession,
     base_stmt: Select[Any],
+    pid: IntCol,
     latency_column: FloatCol,
     params: Mapping[Param, List[ResultPosition]],
 ) -> AsyncIterator[Tuple[ResultPosition, QuantileValue]]:
@@ -186,7 +240,6 @@ async def _get_results_postgresql(
         column("probabilities", ARRAY(Float[float])),
         name="project_probabilities",
     ).data(probs_per_project.items())  # type: ignore
-    pid = models.Trace.project_rowid
     pctl: FloatCol = percentile_cont(pp.c.probabilities).within_group(latency_column)
     stmt = base_stmt.add_columns(pp.c.probabilities, pctl)
     stmt = stmt.join(pp, pid == pp.c.project_rowid)
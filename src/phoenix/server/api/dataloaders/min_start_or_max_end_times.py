@@ -68,12 +68,13 @@ class MinStartOrMaxEndTimeDataLoader(DataLoader[Key, Result]):
         for position, key in enumerate(keys):
             segment, param = key
             arguments[segment][param].append(position)
-        pid = models.Trace.project_rowid
+        # The bounds of the traces are those of their spans, which the rollups keep.
+        pid = models.SpanRollup.project_rowid
         stmt = (
             select(
                 pid,
-                func.min(models.Trace.start_time).label("min_start"),
-                func.max(models.Trace.end_time).label("max_end"),
+                func.min(models.SpanRollup.min_start_time).label("min_start"),
+                func.max(models.SpanRollup.max_end_time).label("max_end"),
             )
             .where(pid.in_(arguments.keys()))
             .group_by(pid)
@@ -5,6 +5,7 @@ from typing import (
     AsyncContextManager,
     Callable,
     DefaultDict,
+    Iterator,
     List,
     Literal,
     Optional,
@@ -12,12 +13,13 @@ from typing import (
 )
 
 from cachetools import LFUCache, TTLCache
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, SQLColumnExpression, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from strawberry.dataloader import AbstractCache, DataLoader
 from typing_extensions import TypeAlias, assert_never
 
 from phoenix.db import models
+from phoenix.db.span_rollups import split_time_range
 from phoenix.server.api.dataloaders.cache import TwoTierCache
 from phoenix.server.api.input_types.TimeRange import TimeRange
 from phoenix.trace.dsl import SpanFilter
@@ -90,29 +92,67 @@ class RecordCountDataLoader(DataLoader[Key, Result]):
             arguments[segment][param].append(position)
         async with self._db() as session:
             for segment, params in arguments.items():
-                stmt = _get_stmt(segment, *params.keys())
-                data = await session.stream(stmt)
-                async for project_rowid, count in data:
-                    for position in params[project_rowid]:
-                        results[position] = count
+                for stmt in _get_stmts(segment, *params.keys()):
+                    data = await session.stream(stmt)
+                    async for project_rowid, count in data:
+                        for position in params[project_rowid]:
+                            results[position] += count
         return results
 
 
+def _get_stmts(
+    segment: Segment,
+    *project_rowids: Param,
+) -> Iterator[Select[Any]]:
+    kind, (start_time, end_time), filter_condition = segment
+    if kind != "span" or filter_condition:
+        yield _get_stmt(segment, *project_rowids)
+        return
+    # Whole hours are counted from the rollups, and partial hours from the spans.
+    hours, edges = split_time_range(start_time, end_time)
+    if hours is not None:
+        yield _get_rollup_stmt(hours, *project_rowids)
+    for interval in edges:
+        yield _get_stmt((kind, interval, filter_condition), *project_rowids)
+
+
+def _get_rollup_stmt(
+    hours: TimeInterval,
+    *project_rowids: Param,
+) -> Select[Any]:
+    start_hour, end_hour = hours
+    pid = models.SpanRollup.project_rowid
+    stmt = (
+        select(pid, func.sum(models.SpanRollup.num_spans).label("count"))
+        .where(pid.in_(project_rowids))
+        .group_by(pid)
+    )
+    if start_hour:
+        stmt = stmt.where(start_hour <= models.SpanRollup.hour)
+    if end_hour:
+        stmt = stmt.where(models.SpanRollup.hour < end_hour)
+    return stmt
+
+
 def _get_stmt(
     segment: Segment,
     *project_rowids: Param,
 ) -> Select[Any]:
     kind, (start_time, end_time), filter_condition = segment
-    pid = models.Trace.project_rowid
-    stmt = select(pid)
+    pid: SQLColumnExpression[int]
     if kind == "span":
+        pid = models.Span.project_rowid
         time_column = models.Span.start_time
-        stmt = stmt.join(models.Span)
+        stmt = select(pid)
         if filter_condition:
+            # The filter may refer to the trace, e.g. by its trace id.
+            stmt = stmt.join(models.Trace)
             sf = SpanFilter(filter_condition)
             stmt = sf(stmt)
     elif kind == "trace":
+        pid = models.Trace.project_rowid
         time_column = models.Trace.start_time
+        stmt = select(pid)
     else:
         assert_never(kind)
     stmt = stmt.add_columns(func.count().label("count"))
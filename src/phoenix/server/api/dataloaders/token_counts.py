@@ -5,6 +5,7 @@ from typing import (
     AsyncContextManager,
     Callable,
     DefaultDict,
+    Iterator,
     List,
     Literal,
     Optional,
@@ -20,6 +21,7 @@ from strawberry.dataloader import AbstractCache, DataLoader
 from typing_extensions import TypeAlias
 
 from phoenix.db import models
+from phoenix.db.span_rollups import split_time_range
 from phoenix.server.api.dataloaders.cache import TwoTierCache
 from phoenix.server.api.input_types.TimeRange import TimeRange
 from phoenix.trace.dsl import SpanFilter
@@ -92,42 +94,81 @@ class TokenCountDataLoader(DataLoader[Key, Result]):
             arguments[segment][param].append(position)
         async with self._db() as session:
             for segment, params in arguments.items():
-                stmt = _get_stmt(segment, *params.keys())
-                data = await session.stream(stmt)
-                async for project_rowid, prompt, completion, total in data:
-                    for position in params[(project_rowid, "prompt")]:
-                        results[position] = prompt
-                    for position in params[(project_rowid, "completion")]:
-                        results[position] = completion
-                    for position in params[(project_rowid, "total")]:
-                        results[position] = total
+                for stmt in _get_stmts(segment, *params.keys()):
+                    data = await session.stream(stmt)
+                    async for project_rowid, prompt, completion, total in data:
+                        for position in params[(project_rowid, "prompt")]:
+                            results[position] += prompt or 0
+                        for position in params[(project_rowid, "completion")]:
+                            results[position] += completion or 0
+                        for position in params[(project_rowid, "total")]:
+                            results[position] += total or 0
         return results
 
 
-def _get_stmt(
+def _get_stmts(
     segment: Segment,
     *params: Param,
-) -> Select[Any]:
+) -> Iterator[Select[Any]]:
     (start_time, end_time), filter_condition = segment
-    prompt = func.sum(models.Span.attributes[_LLM_TOKEN_COUNT_PROMPT].as_float())
-    completion = func.sum(models.Span.attributes[_LLM_TOKEN_COUNT_COMPLETION].as_float())
-    total = coalesce(prompt, 0) + coalesce(completion, 0)
-    pid = models.Trace.project_rowid
+    if filter_condition:
+        yield _get_stmt(segment, *params)
+        return
+    # Whole hours are summed from the rollups, and partial hours from the spans.
+    hours, edges = split_time_range(start_time, end_time)
+    if hours is not None:
+        yield _get_rollup_stmt(hours, *params)
+    for interval in edges:
+        yield _get_stmt((interval, filter_condition), *params)
+
+
+def _get_rollup_stmt(
+    hours: TimeInterval,
+    *params: Param,
+) -> Select[Any]:
+    start_hour, end_hour = hours
+    prompt = func.sum(models.SpanRollup.llm_token_count_prompt)
+    completion = func.sum(models.SpanRollup.llm_token_count_completion)
+    pid = models.SpanRollup.project_rowid
     stmt: Select[Any] = (
         select(
             pid,
             prompt.label("prompt"),
             completion.label("completion"),
-            total.label("total"),
+            (prompt + completion).label("total"),
         )
-        .join_from(models.Trace, models.Span)
+        .where(pid.in_([rowid for rowid, _ in params]))
         .group_by(pid)
     )
+    if start_hour:
+        stmt = stmt.where(start_hour <= models.SpanRollup.hour)
+    if end_hour:
+        stmt = stmt.where(models.SpanRollup.hour < end_hour)
+    return stmt
+
+
+def _get_stmt(
+    segment: Segment,
+    *params: Param,
+) -> Select[Any]:
+    (start_time, end_time), filter_condition = segment
+    prompt = func.sum(models.Span.attributes[_LLM_TOKEN_COUNT_PROMPT].as_float())
+    completion = func.sum(models.Span.attributes[_LLM_TOKEN_COUNT_COMPLETION].as_float())
+    total = coalesce(prompt, 0) + coalesce(completion, 0)
+    pid = models.Span.project_rowid
+    stmt: Select[Any] = select(
+        pid,
+        prompt.label("prompt"),
+        completion.label("completion"),
+        total.label("total"),
+    ).group_by(pid)
     if start_time:
         stmt = stmt.where(start_time <= models.Span.start_time)
     if end_time:
         stmt = stmt.where(models.Span.start_time < end_time)
     if filter_condition:
+        # The filter may refer to the trace, e.g. by its trace id.
+        stmt = stmt.join(models.Trace)
         sf = SpanFilter(filter_condition)
         stmt = sf(stmt)
     stmt = stmt.where(pid.in_([rowid for rowid, _ in params]))
@@ -1,6 +1,6 @@
 import gzip
 from itertools import chain
-from typing import AsyncContextManager, Callable, Iterator, Tuple
+from typing import AsyncContextManager, Callable, Iterator, List, Tuple
 
 import pandas as pd
 import pyarrow as pa
@@ -28,12 +28,12 @@ from phoenix.config import DEFAULT_PROJECT_NAME
 from phoenix.db import models
 from phoenix.exceptions import PhoenixEvaluationNameIsMissing
 from phoenix.server.api.routers.utils import table_to_bytes
-from phoenix.session.evaluation import encode_evaluations
 from phoenix.trace.span_evaluations import (
     DocumentEvaluations,
-    Evaluations,
+    EvaluationColumns,
     SpanEvaluations,
     TraceEvaluations,
+    read_evaluation_columns,
 )
 
 EvaluationName: TypeAlias = str
@@ -179,7 +179,8 @@ async def _process_pyarrow(request: Request) -> Response:
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
         )
     try:
-        evaluations = Evaluations.from_pyarrow_reader(reader)
+        # Every record batch is validated before any of them is inserted.
+        evaluation_columns = list(read_evaluation_columns(reader))
     except Exception as e:
         if isinstance(e, PhoenixEvaluationNameIsMissing):
             return Response(
@@ -190,12 +191,17 @@ async def _process_pyarrow(request: Request) -> Response:
             content="Invalid data in request body",
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
         )
-    return Response(background=BackgroundTask(_add_evaluations, request.state, evaluations))
+    return Response(
+        background=BackgroundTask(_add_evaluation_columns, request.state, evaluation_columns)
+    )
 
 
-async def _add_evaluations(state: State, evaluations: Evaluations) -> None:
-    for evaluation in encode_evaluations(evaluations):
-        await state.queue_evaluation_for_bulk_insert(evaluation)
+async def _add_evaluation_columns(
+    state: State,
+    evaluation_columns: List[EvaluationColumns],
+) -> None:
+    for columns in evaluation_columns:
+        await state.insert_evaluation_columns(columns)
 
 
 def _read_sql_trace_evaluations_into_dataframe(
@@ -236,8 +242,7 @@ def _read_sql_span_evaluations_into_dataframe(
     return pd.read_sql_query(
         select(models.SpanAnnotation, models.Span.span_id)
         .join_from(models.SpanAnnotation, models.Span)
-        .join_from(models.Span, models.Trace)
-        .join_from(models.Trace, models.Project)
+        .join_from(models.Span, models.Project)
         .where(models.Project.name == project_name)
         .where(models.SpanAnnotation.annotator_kind == "LLM"),
         connectable,
@@ -260,8 +265,7 @@ def _read_sql_document_evaluations_into_dataframe(
     return pd.read_sql(
         select(models.DocumentAnnotation, models.Span.span_id)
         .join_from(models.DocumentAnnotation, models.Span)
-        .join_from(models.Span, models.Trace)
-        .join_from(models.Trace, models.Project)
+        .join_from(models.Span, models.Project)
         .where(models.Project.name == project_name)
         .where(models.DocumentAnnotation.annotator_kind == "LLM"),
         connectable,
@@ -1,12 +1,7 @@
-import gzip
-import zlib
+from typing import List, Tuple
 
 from google.protobuf.message import DecodeError
-from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
-    ExportTraceServiceRequest,
-)
 from starlette.background import BackgroundTask
-from starlette.concurrency import run_in_threadpool
 from starlette.datastructures import State
 from starlette.requests import Request
 from starlette.responses import Response
@@ -14,10 +9,13 @@ from starlette.status import (
     HTTP_403_FORBIDDEN,
     HTTP_415_UNSUPPORTED_MEDIA_TYPE,
     HTTP_422_UNPROCESSABLE_ENTITY,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 
-from phoenix.trace.otel import decode_otlp_span
-from phoenix.utilities.project import get_project_name
+from phoenix.server.otlp_decoder import OtlpDecoder
+from phoenix.trace.schemas import Span
+
+RETRY_AFTER_SECONDS = 5
 
 
 async def post_traces(request: Request) -> Response:
@@ -42,6 +40,8 @@ async def post_traces(request: Request) -> Response:
         description: Unsupported content type, only gzipped protobuf
       422:
         description: Request body is invalid
+      503:
+        description: Too many spans are waiting to be inserted, retry after the given delay
     """
     if request.app.state.read_only:
         return Response(status_code=HTTP_403_FORBIDDEN)
@@ -58,25 +58,24 @@ async def post_traces(request: Request) -> Response:
             status_code=HTTP_415_UNSUPPORTED_MEDIA_TYPE,
         )
     body = await request.body()
-    if content_encoding == "gzip":
-        body = await run_in_threadpool(gzip.decompress, body)
-    elif content_encoding == "deflate":
-        body = await run_in_threadpool(zlib.decompress, body)
-    req = ExportTraceServiceRequest()
+    decoder: OtlpDecoder = request.state.otlp_decoder
     try:
-        await run_in_threadpool(req.ParseFromString, body)
+        spans, num_bytes = await decoder.decode(body, content_encoding)
     except DecodeError:
         return Response(
             content="Request body is invalid ExportTraceServiceRequest",
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
         )
-    return Response(background=BackgroundTask(_add_spans, req, request.state))
+    if not request.state.reserve_spans_for_bulk_insert(len(spans), num_bytes):
+        # OTLP exporters retry 503 responses, honoring the Retry-After header.
+        return Response(
+            content="Too many spans are waiting to be inserted",
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+    return Response(background=BackgroundTask(_add_spans, spans, request.state))
 
 
-async def _add_spans(req: ExportTraceServiceRequest, state: State) -> None:
-    for resource_spans in req.resource_spans:
-        project_name = get_project_name(resource_spans.resource.attributes)
-        for scope_span in resource_spans.scope_spans:
-            for otlp_span in scope_span.spans:
-                span = await run_in_threadpool(decode_otlp_span, otlp_span)
-                await state.queue_span_for_bulk_insert(span, project_name)
+async def _add_spans(spans: List[Tuple[Span, str]], state: State) -> None:
+    for span, project_name in spans:
+        await state.queue_span_for_bulk_insert(span, project_name)
@@ -4,7 +4,7 @@ from typing import Dict, List, Optional, Set, Union
 import numpy as np
 import numpy.typing as npt
 import strawberry
-from sqlalchemy import delete, select
+from sqlalchemy import select
 from sqlalchemy.orm import contains_eager, load_only
 from strawberry import ID, UNSET
 from strawberry.types import Info
@@ -12,7 +12,6 @@ from typing_extensions import Annotated
 
 from phoenix.config import DEFAULT_PROJECT_NAME
 from phoenix.db import models
-from phoenix.db.insertion.span import ClearProjectSpansEvent
 from phoenix.pointcloud.clustering import Hdbscan
 from phoenix.server.api.context import Context
 from phoenix.server.api.helpers import ensure_list
@@ -47,6 +46,10 @@ from phoenix.server.api.types.pagination import (
     connection_from_list,
 )
 from phoenix.server.api.types.Project import Project
+from phoenix.server.api.types.ProjectDeletionJob import (
+    ProjectDeletionJob,
+    to_gql_project_deletion_job,
+)
 from phoenix.server.api.types.Span import to_gql_span
 from phoenix.server.api.types.Trace import Trace
 
@@ -68,8 +71,13 @@ class Query:
             last=last,
             before=before if isinstance(before, CursorString) else None,
         )
+        stmt = select(models.Project)
+        if info.context.project_deleter and (
+            hidden_project_rowids := info.context.project_deleter.hidden_project_rowids
+        ):
+            stmt = stmt.where(models.Project.id.not_in(hidden_project_rowids))
         async with info.context.db() as session:
-            projects = await session.scalars(select(models.Project))
+            projects = await session.scalars(stmt)
         data = [
             Project(
                 id_attr=project.id,
@@ -113,7 +121,10 @@ class Query:
             ).where(models.Project.id == node_id)
             async with info.context.db() as session:
                 project = (await session.execute(project_stmt)).first()
-            if project is None:
+            if project is None or (
+                info.context.project_deleter
+                and project.id in info.context.project_deleter.hidden_project_rowids
+            ):
                 raise ValueError(f"Unknown project: {id}")
             return Project(
                 id_attr=project.id,
@@ -140,6 +151,12 @@ class Query:
             if span is None:
                 raise ValueError(f"Unknown span: {id}")
             return to_gql_span(span)
+        elif type_name == "ProjectDeletionJob":
+            if not info.context.project_deleter or not (
+                job := info.context.project_deleter.get_job(node_id)
+            ):
+                raise ValueError(f"Unknown project deletion job: {id}")
+            return to_gql_project_deletion_job(job)
         raise Exception(f"Unknown node type: {type_name}")
 
     @strawberry.field
@@ -273,10 +290,12 @@ class Query:
 
 @strawberry.type
 class Mutation(ExportEventsMutation):
-    @strawberry.mutation
-    async def delete_project(self, info: Info[Context, None], id: GlobalID) -> Query:
-        if info.context.read_only:
-            return Query()
+    @strawberry.mutation(
+        description="Starts deleting the project in the background, hiding it in the meantime.",
+    )  # type: ignore
+    async def delete_project(self, info: Info[Context, None], id: GlobalID) -> ProjectDeletionJob:
+        if info.context.read_only or not info.context.project_deleter:
+            raise ValueError("Projects cannot be deleted")
         node_id = from_global_id_with_expected_type(str(id), "Project")
         async with info.context.db() as session:
             project = await session.scalar(
@@ -288,20 +307,18 @@ class Mutation(ExportEventsMutation):
                 raise ValueError(f"Unknown project: {id}")
             if project.name == DEFAULT_PROJECT_NAME:
                 raise ValueError(f"Cannot delete the {DEFAULT_PROJECT_NAME} project")
-            await session.delete(project)
-        return Query()
+        job = await info.context.project_deleter.delete_project(node_id)
+        return to_gql_project_deletion_job(job)
 
-    @strawberry.mutation
-    async def clear_project(self, info: Info[Context, None], id: GlobalID) -> Query:
-        if info.context.read_only:
-            return Query()
+    @strawberry.mutation(
+        description="Starts deleting the traces of the project in the background.",
+    )  # type: ignore
+    async def clear_project(self, info: Info[Context, None], id: GlobalID) -> ProjectDeletionJob:
+        if info.context.read_only or not info.context.project_deleter:
+            raise ValueError("Projects cannot be cleared")
         project_id = from_global_id_with_expected_type(str(id), "Project")
-        delete_statement = delete(models.Trace).where(models.Trace.project_rowid == project_id)
-        async with info.context.db() as session:
-            await session.execute(delete_statement)
-            if cache := info.context.cache_for_dataloaders:
-                cache.invalidate(ClearProjectSpansEvent(project_rowid=project_id))
-        return Query()
+        job = await info.context.project_deleter.clear_project(project_id)
+        return to_gql_project_deletion_job(job)
 
 
 # This is the schema for generating `schema.graphql`.
@@ -9,6 +9,7 @@ from sqlalchemy.orm import contains_eager
 from sqlalchemy.sql.expression import tuple_
 from strawberry import ID, UNSET
 from strawberry.types import Info
+from typing_extensions import Annotated
 
 from phoenix.datetime_utils import right_open_time_range
 from phoenix.db import models
@@ -122,9 +123,18 @@ class Project(Node):
         info: Info[Context, None],
         probability: float,
         time_range: Optional[TimeRange] = UNSET,
+        exact: Annotated[
+            bool,
+            strawberry.argument(
+                description="Compute the quantile from every row instead of estimating it "
+                "from the hourly latency sketches, which are accurate to within 1%. "
+                "Quantiles over time ranges without a whole hour in them, or with a "
+                "filter condition, are always exact.",
+            ),
+        ] = False,
     ) -> Optional[float]:
         return await info.context.data_loaders.latency_ms_quantile.load(
-            ("trace", self.id_attr, time_range, None, probability),
+            ("trace", self.id_attr, time_range, None, probability, exact),
         )
 
     @strawberry.field
@@ -134,9 +144,18 @@ class Project(Node):
         probability: float,
         time_range: Optional[TimeRange] = UNSET,
         filter_condition: Optional[str] = UNSET,
+        exact: Annotated[
+            bool,
+            strawberry.argument(
+                description="Compute the quantile from every row instead of estimating it "
+                "from the hourly latency sketches, which are accurate to within 1%. "
+                "Quantiles over time ranges without a whole hour in them, or with a "
+                "filter condition, are always exact.",
+            ),
+        ] = False,
     ) -> Optional[float]:
         return await info.context.data_loaders.latency_ms_quantile.load(
-            ("span", self.id_attr, time_range, filter_condition, probability),
+            ("span", self.id_attr, time_range, filter_condition, probability, exact),
         )
 
     @strawberry.field
@@ -167,7 +186,7 @@ class Project(Node):
         stmt = (
             select(models.Span)
             .join(models.Trace)
-            .where(models.Trace.project_rowid == self.id_attr)
+            .where(models.Span.project_rowid == self.id_attr)
             .options(contains_eager(models.Span.trace))
         )
         if time_range:
@@ -180,11 +199,7 @@ class Project(Node):
         if root_spans_only:
             # A root span is any span whose parent span is missing in the
             # database, even if its `parent_span_id` may not be NULL.
-            parent = select(models.Span.span_id).alias()
-            stmt = stmt.outerjoin(
-                parent,
-                models.Span.parent_id == parent.c.span_id,
-            ).where(parent.c.span_id.is_(None))
+            stmt = stmt.where(models.Span.is_root)
         if filter_condition:
             span_filter = SpanFilter(condition=filter_condition)
             stmt = span_filter(stmt)
@@ -271,8 +286,7 @@ class Project(Node):
         stmt = (
             select(distinct(models.SpanAnnotation.name))
             .join(models.Span)
-            .join(models.Trace, models.Span.trace_rowid == models.Trace.id)
-            .where(models.Trace.project_rowid == self.id_attr)
+            .where(models.Span.project_rowid == self.id_attr)
             .where(models.SpanAnnotation.annotator_kind == "LLM")
         )
         async with info.context.db() as session:
@@ -289,8 +303,7 @@ class Project(Node):
         stmt = (
             select(distinct(models.DocumentAnnotation.name))
             .join(models.Span)
-            .join(models.Trace, models.Span.trace_rowid == models.Trace.id)
-            .where(models.Trace.project_rowid == self.id_attr)
+            .where(models.Span.project_rowid == self.id_attr)
             .where(models.DocumentAnnotation.annotator_kind == "LLM")
         )
         if span_id:
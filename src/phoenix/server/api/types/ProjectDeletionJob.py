@@ -0,0 +1,32 @@
+from typing import Optional
+
+import strawberry
+
+from phoenix.db import project_deletion
+from phoenix.server.api.types.node import GlobalID, Node
+
+ProjectDeletionKind = strawberry.enum(
+    project_deletion.ProjectDeletionKind,
+    description="Whether the traces of a project are deleted, or the project itself.",
+)
+ProjectDeletionStatus = strawberry.enum(project_deletion.ProjectDeletionStatus)
+
+
+@strawberry.type(description="A project being cleared or deleted in the background.")
+class ProjectDeletionJob(Node):
+    project_id: GlobalID
+    kind: ProjectDeletionKind  # type: ignore
+    status: ProjectDeletionStatus  # type: ignore
+    num_deleted_traces: int
+    error: Optional[str]
+
+
+def to_gql_project_deletion_job(job: project_deletion.ProjectDeletionJob) -> ProjectDeletionJob:
+    return ProjectDeletionJob(
+        id_attr=job.id,
+        project_id=GlobalID("Project", job.project_rowid),
+        kind=job.kind,
+        status=job.status,
+        num_deleted_traces=job.num_deleted_traces,
+        error=job.error,
+    )
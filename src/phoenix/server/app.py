@@ -1,6 +1,6 @@
 import contextlib
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
@@ -47,12 +47,29 @@ import phoenix.trace.v1 as pb
 from phoenix.config import (
     DEFAULT_PROJECT_NAME,
     SERVER_DIR,
+    get_env_bulk_inserter_batch_size,
+    get_env_bulk_inserter_max_batch_bytes,
+    get_env_bulk_inserter_max_linger,
+    get_env_bulk_inserter_max_transaction_size,
+    get_env_bulk_inserter_target_commit_latency,
+    get_env_max_queued_span_bytes,
+    get_env_max_queued_spans,
+    get_env_otlp_decoder_processes,
+    get_env_postgres_copy_spans,
+    get_env_spool_dir,
+    get_env_trace_retention_max_age_days,
+    get_env_trace_retention_max_database_bytes,
+    get_env_trace_retention_max_spans,
+    get_env_trace_retention_policies,
     server_instrumentation_is_enabled,
 )
 from phoenix.core.model_schema import Model
 from phoenix.db.bulk_inserter import BulkInserter
 from phoenix.db.engines import create_engine
+from phoenix.db.flush_policy import FlushPolicy
 from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.project_deletion import ProjectDeleter
+from phoenix.db.retention import RetentionPolicy, TraceRetention
 from phoenix.exceptions import PhoenixMigrationError
 from phoenix.pointcloud.umap_parameters import UMAPParameters
 from phoenix.server.api.context import Context, DataLoaders
@@ -74,6 +91,7 @@ from phoenix.server.api.routers.v1 import V1_ROUTES
 from phoenix.server.api.schema import schema
 from phoenix.server.grpc_server import GrpcServer
 from phoenix.server.openapi.docs import get_swagger_ui_html
+from phoenix.server.otlp_decoder import OtlpDecoder
 from phoenix.server.telemetry import initialize_opentelemetry_tracer_provider
 from phoenix.trace.schemas import Span
 
@@ -161,6 +179,7 @@ class GraphQLWithContext(GraphQL):  # type: ignore
         streaming_last_updated_at: Callable[[ProjectRowId], Optional[datetime]] = lambda _: None,
         cache_for_dataloaders: Optional[CacheForDataLoaders] = None,
         read_only: bool = False,
+        project_deleter: Optional[ProjectDeleter] = None,
     ) -> None:
         self.db = db
         self.model = model
@@ -169,6 +188,7 @@ class GraphQLWithContext(GraphQL):  # type: ignore
         self.streaming_last_updated_at = streaming_last_updated_at
         self.cache_for_dataloaders = cache_for_dataloaders
         self.read_only = read_only
+        self.project_deleter = project_deleter
         super().__init__(schema, graphiql=graphiql)
 
     async def get_context(
@@ -229,6 +249,7 @@ class GraphQLWithContext(GraphQL):  # type: ignore
             ),
             cache_for_dataloaders=self.cache_for_dataloaders,
             read_only=self.read_only,
+            project_deleter=self.project_deleter,
         )
 
 
@@ -251,6 +272,13 @@ async def version(_: Request) -> PlainTextResponse:
     return PlainTextResponse(f"{phoenix.__version__}")
 
 
+def _retention_policy(max_age_days: Optional[int], max_spans: Optional[int]) -> RetentionPolicy:
+    return RetentionPolicy(
+        max_age=None if max_age_days is None else timedelta(days=max_age_days),
+        max_num_spans=max_spans,
+    )
+
+
 def _db(engine: AsyncEngine) -> Callable[[], AsyncContextManager[AsyncSession]]:
     Session = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -265,6 +293,9 @@ def _db(engine: AsyncEngine) -> Callable[[], AsyncContextManager[AsyncSession]]:
 def _lifespan(
     *,
     bulk_inserter: BulkInserter,
+    trace_retention: TraceRetention,
+    project_deleter: ProjectDeleter,
+    otlp_decoder: OtlpDecoder,
     tracer_provider: Optional["TracerProvider"] = None,
     enable_prometheus: bool = False,
     clean_ups: Iterable[Callable[[], None]] = (),
@@ -272,15 +303,20 @@ def _lifespan(
 ) -> StatefulLifespan[Starlette]:
     @contextlib.asynccontextmanager
     async def lifespan(_: Starlette) -> AsyncIterator[Dict[str, Any]]:
-        async with bulk_inserter as (queue_span, queue_evaluation), GrpcServer(
+        async with bulk_inserter as (queue_span, queue_evaluation), otlp_decoder, GrpcServer(
             queue_span,
+            otlp_decoder,
+            reserve_spans=bulk_inserter.reserve_spans,
             disabled=read_only,
             tracer_provider=tracer_provider,
             enable_prometheus=enable_prometheus,
-        ):
+        ), trace_retention, project_deleter:
             yield {
                 "queue_span_for_bulk_insert": queue_span,
+                "reserve_spans_for_bulk_insert": bulk_inserter.reserve_spans,
+                "otlp_decoder": otlp_decoder,
                 "queue_evaluation_for_bulk_insert": queue_evaluation,
+                "insert_evaluation_columns": bulk_inserter.insert_evaluation_columns,
             }
         for clean_up in clean_ups:
             clean_up()
@@ -350,6 +386,44 @@ def create_app(
         cache_for_dataloaders=cache_for_dataloaders,
         initial_batch_of_spans=initial_batch_of_spans,
         initial_batch_of_evaluations=initial_batch_of_evaluations,
+        flush_policy=FlushPolicy(
+            batch_size=get_env_bulk_inserter_batch_size(),
+            max_linger=get_env_bulk_inserter_max_linger(),
+            max_bytes=get_env_bulk_inserter_max_batch_bytes(),
+            max_transaction_size=get_env_bulk_inserter_max_transaction_size(),
+            target_commit_latency=get_env_bulk_inserter_target_commit_latency(),
+        ),
+        max_queued_spans=get_env_max_queued_spans(),
+        max_queued_span_bytes=get_env_max_queued_span_bytes(),
+        spool_directory=get_env_spool_dir(),
+        copy_spans=get_env_postgres_copy_spans(),
+    )
+    trace_retention = (
+        TraceRetention(db)  # i.e. disabled
+        if read_only
+        else TraceRetention(
+            db,
+            default_policy=_retention_policy(
+                get_env_trace_retention_max_age_days(),
+                get_env_trace_retention_max_spans(),
+            ),
+            project_policies={
+                project_name: _retention_policy(max_age_days, max_spans)
+                for project_name, (
+                    max_age_days,
+                    max_spans,
+                ) in get_env_trace_retention_policies().items()
+            },
+            max_database_bytes=get_env_trace_retention_max_database_bytes(),
+            cache_for_dataloaders=cache_for_dataloaders,
+            invalidate=bulk_inserter.invalidate,
+            enable_prometheus=enable_prometheus,
+        )
+    )
+    project_deleter = ProjectDeleter(
+        db,
+        cache_for_dataloaders=cache_for_dataloaders,
+        invalidate=bulk_inserter.invalidate,
     )
     tracer_provider = None
     strawberry_extensions = schema.get_extensions()
@@ -392,6 +466,7 @@ def create_app(
         streaming_last_updated_at=bulk_inserter.last_updated_at,
         cache_for_dataloaders=cache_for_dataloaders,
         read_only=read_only,
+        project_deleter=project_deleter,
     )
     if enable_prometheus:
         from phoenix.server.prometheus import PrometheusMiddleware
@@ -403,6 +478,9 @@ def create_app(
         lifespan=_lifespan(
             read_only=read_only,
             bulk_inserter=bulk_inserter,
+            trace_retention=trace_retention,
+            project_deleter=project_deleter,
+            otlp_decoder=OtlpDecoder(get_env_otlp_decoder_processes()),
             tracer_provider=tracer_provider,
             enable_prometheus=enable_prometheus,
             clean_ups=clean_ups,
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING, Any, Awaitable, Callable, List, Optional
 
 import grpc
-from grpc.aio import RpcContext, Server, ServerInterceptor
+from grpc.aio import Server, ServerInterceptor, ServicerContext
 from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
     ExportTraceServiceRequest,
     ExportTraceServiceResponse,
@@ -13,9 +13,9 @@ from opentelemetry.proto.collector.trace.v1.trace_service_pb2_grpc import (
 from typing_extensions import TypeAlias
 
 from phoenix.config import get_env_grpc_port
-from phoenix.trace.otel import decode_otlp_span
+from phoenix.server.otlp_decoder import OtlpDecoder
+from phoenix.trace.otel import num_spans
 from phoenix.trace.schemas import Span
-from phoenix.utilities.project import get_project_name
 
 if TYPE_CHECKING:
     from opentelemetry.trace import TracerProvider
@@ -27,21 +27,29 @@ class Servicer(TraceServiceServicer):
     def __init__(
         self,
         callback: Callable[[Span, ProjectName], Awaitable[None]],
+        decoder: OtlpDecoder,
+        reserve_spans: Optional[Callable[[int, int], bool]] = None,
     ) -> None:
         super().__init__()
         self._callback = callback
+        self._decoder = decoder
+        self._reserve_spans = reserve_spans
 
     async def Export(
         self,
         request: ExportTraceServiceRequest,
-        context: RpcContext,
+        context: ServicerContext,
     ) -> ExportTraceServiceResponse:
-        for resource_spans in request.resource_spans:
-            project_name = get_project_name(resource_spans.resource.attributes)
-            for scope_span in resource_spans.scope_spans:
-                for otlp_span in scope_span.spans:
-                    span = decode_otlp_span(otlp_span)
-                    await self._callback(span, project_name)
+        if self._reserve_spans is not None and not self._reserve_spans(
+            num_spans(request), request.ByteSize()
+        ):
+            # OTLP exporters retry RESOURCE_EXHAUSTED with exponential backoff.
+            await context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                "Too many spans are waiting to be inserted. Try again later.",
+            )
+        for span, project_name in await self._decoder.decode_request(request):
+            await self._callback(span, project_name)
         return ExportTraceServiceResponse()
 
 
@@ -49,11 +57,15 @@ class GrpcServer:
     def __init__(
         self,
         callback: Callable[[Span, ProjectName], Awaitable[None]],
+        decoder: OtlpDecoder,
+        reserve_spans: Optional[Callable[[int, int], bool]] = None,
         tracer_provider: Optional["TracerProvider"] = None,
         enable_prometheus: bool = False,
         disabled: bool = False,
     ) -> None:
         self._callback = callback
+        self._decoder = decoder
+        self._reserve_spans = reserve_spans
         self._server: Optional[Server] = None
         self._tracer_provider = tracer_provider
         self._enable_prometheus = enable_prometheus
@@ -78,7 +90,8 @@ class GrpcServer:
             interceptors=interceptors,
         )
         server.add_insecure_port(f"[::]:{get_env_grpc_port()}")
-        add_TraceServiceServicer_to_server(Servicer(self._callback), server)  # type: ignore
+        servicer = Servicer(self._callback, self._decoder, self._reserve_spans)
+        add_TraceServiceServicer_to_server(servicer, server)  # type: ignore
         await server.start()
         self._server = server
 
@@ -0,0 +1,80 @@
+"""
+Decoding of OTLP trace export requests off the event loop. A whole request is
+decoded in one call to a worker, either a thread or, if configured, a process,
+so that decompression, protobuf parsing and the unflattening of attributes can
+use other cores than the one serving the event loop.
+"""
+
+import asyncio
+import gzip
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+
+from phoenix.trace.otel import decode_otlp_request
+from phoenix.trace.schemas import Span
+
+
+class DecodedRequest(NamedTuple):
+    spans: List[Tuple[Span, str]]
+    """The decoded spans, each paired with the name of its project."""
+    num_bytes: int
+    """The size of the uncompressed request."""
+
+
+class OtlpDecoder:
+    def __init__(self, num_processes: int = 0) -> None:
+        """
+        :param num_processes: The number of worker processes to decode requests in.
+        If 0, requests are decoded in the default thread pool of the event loop.
+        """
+        self._num_processes = num_processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def __aenter__(self) -> "OtlpDecoder":
+        if self._num_processes:
+            self._executor = ProcessPoolExecutor(max_workers=self._num_processes)
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def decode(
+        self,
+        body: bytes,
+        content_encoding: Optional[str] = None,
+    ) -> DecodedRequest:
+        """
+        Decodes a serialized, and possibly compressed, ExportTraceServiceRequest.
+        Raises google.protobuf.message.DecodeError if the request is invalid.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _decode, body, content_encoding)
+
+    async def decode_request(self, request: ExportTraceServiceRequest) -> List[Tuple[Span, str]]:
+        """
+        Decodes an already parsed request, e.g. one received over gRPC.
+        """
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            return await loop.run_in_executor(None, decode_otlp_request, request)
+        # Messages are passed to processes in their wire format, which is much
+        # cheaper to pickle.
+        decoded = await loop.run_in_executor(self._executor, _decode, request.SerializeToString())
+        return decoded.spans
+
+
+def _decode(body: bytes, content_encoding: Optional[str] = None) -> DecodedRequest:
+    if content_encoding == "gzip":
+        body = gzip.decompress(body)
+    elif content_encoding == "deflate":
+        body = zlib.decompress(body)
+    request = ExportTraceServiceRequest()
+    request.ParseFromString(body)
+    return DecodedRequest(decode_otlp_request(request), len(body))
@@ -5,6 +5,7 @@ import psutil
 from prometheus_client import (
     Counter,
     Gauge,
+    Histogram,
     Summary,
     start_http_server,
 )
@@ -45,11 +46,54 @@ BULK_LOADER_EVALUATION_INSERTIONS = Counter(
     name="bulk_loader_evaluation_insertions_total",
     documentation="Total count of bulk loader evaluation insertions",
 )
+BULK_LOADER_QUEUED_SPANS = Gauge(
+    name="bulk_loader_queued_spans",
+    documentation="Current number of spans waiting to be inserted",
+)
+BULK_LOADER_QUEUED_SPAN_BYTES = Gauge(
+    name="bulk_loader_queued_span_bytes",
+    documentation="Current total size of spans waiting to be inserted (bytes)",
+)
+BULK_LOADER_REJECTED_SPANS = Counter(
+    name="bulk_loader_rejected_spans_total",
+    documentation="Total count of spans rejected because the bulk loader queue was full",
+)
+BULK_LOADER_PARKED_EVALUATIONS = Gauge(
+    name="bulk_loader_parked_evaluations",
+    documentation="Current number of evaluations waiting for their span or trace to be inserted",
+)
+BULK_LOADER_BATCH_SIZE = Histogram(
+    name="bulk_loader_batch_size",
+    documentation="Histogram of the number of items inserted per flush",
+    buckets=(1, 10, 100, 1_000, 10_000, 100_000),
+)
+BULK_LOADER_TRANSACTION_SIZE = Histogram(
+    name="bulk_loader_transaction_size",
+    documentation="Histogram of the number of items inserted per transaction",
+    buckets=(1, 10, 100, 1_000, 10_000, 100_000),
+)
 BULK_LOADER_EXCEPTIONS = Counter(
     name="bulk_loader_exceptions_total",
     documentation="Total count of bulk loader exceptions",
 )
 
+RETENTION_DELETED_TRACES = Counter(
+    name="retention_deleted_traces_total",
+    documentation="Total count of traces deleted according to the retention policies",
+)
+RETENTION_PASS_TIME = Summary(
+    name="retention_pass_time_seconds_summary",
+    documentation="Summary of the time taken to enforce the retention policies (seconds)",
+)
+RETENTION_DATABASE_BYTES = Gauge(
+    name="retention_database_bytes",
+    documentation="Number of bytes used by the database when last measured for retention",
+)
+RETENTION_EXCEPTIONS = Counter(
+    name="retention_exceptions_total",
+    documentation="Total count of exceptions raised while enforcing the retention policies",
+)
+
 
 class PrometheusMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
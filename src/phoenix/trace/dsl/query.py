@@ -22,7 +22,7 @@ import pandas as pd
 from openinference.semconv.trace import SpanAttributes
 from sqlalchemy import JSON, Column, Label, Select, SQLColumnExpression, and_, func, select
 from sqlalchemy.dialects.postgresql import aggregate_order_by
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm import Session
 from typing_extensions import assert_never
 
 from phoenix.config import DEFAULT_PROJECT_NAME
@@ -541,7 +541,7 @@ class SpanQuery(_HasTmpSuffix):
             # it's too complex for the post hoc processing step in pandas.
             select(row_id)
             .join(models.Trace)
-            .join(models.Project)
+            .join_from(models.Span, models.Project)
             .where(models.Project.name == project_name)
         )
         if start_time:
@@ -551,11 +551,7 @@ class SpanQuery(_HasTmpSuffix):
         if limit is not None:
             stmt = stmt.limit(limit)
         if root_spans_only:
-            parent = aliased(models.Span)
-            stmt = stmt.outerjoin(
-                parent,
-                models.Span.parent_id == parent.span_id,
-            ).where(parent.span_id == None)  # noqa E711
+            stmt = stmt.where(models.Span.is_root)
         stmt0_orig: Select[Any] = stmt
         stmt1_filter: Optional[Select[Any]] = None
         if self._filter:
@@ -721,7 +717,7 @@ def _get_spans_dataframe(
             models.Span.attributes,
         )
         .join(models.Trace)
-        .join(models.Project)
+        .join_from(models.Span, models.Project)
         .where(models.Project.name == project_name)
     )
     if span_filter:
@@ -733,11 +729,7 @@ def _get_spans_dataframe(
     if limit is not None:
         stmt = stmt.limit(limit)
     if root_spans_only:
-        parent = aliased(models.Span)
-        stmt = stmt.outerjoin(
-            parent,
-            models.Span.parent_id == parent.span_id,
-        ).where(parent.span_id == None)  # noqa E711
+        stmt = stmt.where(models.Span.is_root)
     conn = session.connection()
     # set `drop=False` for backward-compatibility
     df = pd.read_sql_query(stmt, conn).set_index(span_id_label, drop=False)
@@ -7,6 +7,7 @@ from typing import (
     Dict,
     Iterable,
     Iterator,
+    List,
     Mapping,
     Optional,
     Sequence,
@@ -22,6 +23,7 @@ from openinference.semconv.trace import (
     OpenInferenceMimeTypeValues,
     SpanAttributes,
 )
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
 from opentelemetry.proto.common.v1.common_pb2 import AnyValue, ArrayValue, KeyValue
 from opentelemetry.util.types import Attributes, AttributeValue
 from typing_extensions import TypeAlias, assert_never
@@ -29,11 +31,9 @@ from typing_extensions import TypeAlias, assert_never
 from phoenix.trace.attributes import (
     JSON_STRING_ATTRIBUTES,
     flatten,
-    get_attribute_value,
     has_mapping,
-    load_json_strings,
-    unflatten,
 )
+from phoenix.trace.otlp_attributes import decode_otlp_attributes, get_path
 from phoenix.trace.schemas import (
     EXCEPTION_ESCAPED,
     EXCEPTION_MESSAGE,
@@ -48,6 +48,7 @@ from phoenix.trace.schemas import (
     SpanStatusCode,
     TraceID,
 )
+from phoenix.utilities.project import get_project_name
 
 DOCUMENT_METADATA = DocumentAttributes.DOCUMENT_METADATA
 INPUT_MIME_TYPE = SpanAttributes.INPUT_MIME_TYPE
@@ -68,15 +69,13 @@ def decode_otlp_span(otlp_span: otlp.Span) -> Span:
     start_time = _decode_unix_nano(otlp_span.start_time_unix_nano)
     end_time = _decode_unix_nano(otlp_span.end_time_unix_nano)
 
-    attributes = unflatten(load_json_strings(_decode_key_values(otlp_span.attributes)))
-    span_kind = SpanKind(get_attribute_value(attributes, OPENINFERENCE_SPAN_KIND))
+    attributes = decode_otlp_attributes(otlp_span.attributes)
+    span_kind = SpanKind(get_path(attributes, OPENINFERENCE_SPAN_KIND))
 
     status_code, status_message = _decode_status(otlp_span.status)
     events = [_decode_event(event) for event in otlp_span.events]
 
-    if (input_value := get_attribute_value(attributes, INPUT_VALUE)) and not isinstance(
-        input_value, str
-    ):
+    if (input_value := get_path(attributes, INPUT_VALUE)) and not isinstance(input_value, str):
         attributes["input"]["value"] = json.dumps(input_value)
         attributes["input"]["mime_type"] = OpenInferenceMimeTypeValues.JSON.value
 
@@ -98,6 +97,28 @@ def decode_otlp_span(otlp_span: otlp.Span) -> Span:
     )
 
 
+def num_spans(request: ExportTraceServiceRequest) -> int:
+    return sum(
+        len(scope_spans.spans)
+        for resource_spans in request.resource_spans
+        for scope_spans in resource_spans.scope_spans
+    )
+
+
+def decode_otlp_request(request: ExportTraceServiceRequest) -> List[Tuple[Span, str]]:
+    """
+    Decodes every span in the request, paired with the name of the project it
+    belongs to.
+    """
+    spans: List[Tuple[Span, str]] = []
+    for resource_spans in request.resource_spans:
+        project_name = get_project_name(resource_spans.resource.attributes)
+        for scope_spans in resource_spans.scope_spans:
+            for otlp_span in scope_spans.spans:
+                spans.append((decode_otlp_span(otlp_span), project_name))
+    return spans
+
+
 def _decode_identifier(identifier: bytes) -> Optional[str]:
     if not identifier:
         return None
@@ -0,0 +1,177 @@
+"""
+A fast path for decoding the attributes of an OTLP span into the nested form
+used by Phoenix, i.e. the equivalent of
+
+    unflatten(load_json_strings(_decode_key_values(otlp_span.attributes)))
+
+but without building a trie or going through generators. Each key is compiled
+once into the steps that lead to its value, with the OpenInference semantic
+conventions compiled in advance. Attribute sets that the nested form can't
+represent unambiguously, e.g. a key that is both a value and a prefix of other
+keys, fall back to the general `unflatten`, so the results are always the same.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from typing_extensions import TypeAlias, assert_never
+
+from phoenix.trace.attributes import (
+    JSON_STRING_ATTRIBUTES,
+    SEMANTIC_CONVENTIONS,
+    get_attribute_value,
+    unflatten,
+)
+
+_MAX_NUM_CACHED_KEYS = 10_000
+
+
+class _Ambiguous(Exception):
+    pass
+
+
+class _Indexed(Dict[int, Dict[str, Any]]):
+    """A node whose children are the elements of a list, keyed by index."""
+
+
+_Path: TypeAlias = Tuple[str, Tuple[Tuple[Union[str, int], type], ...], str]
+"""
+The key of the parent of a value, the (sub-key, node type) steps to the parent,
+and the value's own key.
+"""
+
+
+def _compile(key: str) -> Optional[_Path]:
+    """
+    Returns None if the key can't be placed without looking at the other keys,
+    e.g. if it starts or ends with an index.
+    """
+    sub_keys = key.split(".")
+    last = len(sub_keys) - 1
+    if sub_keys[0].isdigit() or sub_keys[last].isdigit() or (last and "" in sub_keys):
+        return None
+    steps: List[Tuple[Union[str, int], type]] = []
+    for i in range(last):
+        if sub_keys[i + 1].isdigit():
+            if sub_keys[i].isdigit():
+                # An index has to follow a key, not another index.
+                return None
+            steps.append((sub_keys[i], _Indexed))
+        elif sub_keys[i].isdigit():
+            steps.append((int(sub_keys[i]), dict))
+        else:
+            steps.append((sub_keys[i], dict))
+    return key[: -len(sub_keys[last]) - 1], tuple(steps), sub_keys[last]
+
+
+_PATHS: Dict[str, Optional[_Path]] = {key: _compile(key) for key in SEMANTIC_CONVENTIONS}
+_NUM_SEMANTIC_CONVENTIONS = len(_PATHS)
+
+
+def decode_otlp_attributes(key_values: Iterable[KeyValue]) -> Dict[str, Any]:
+    pairs: List[Tuple[str, Any]] = []
+    for kv in key_values:
+        key = kv.key
+        any_value = kv.value
+        if any_value.WhichOneof("value") == "string_value":
+            value = any_value.string_value
+        else:
+            value = decode_value(any_value)
+        if key.endswith(JSON_STRING_ATTRIBUTES):
+            try:
+                loaded = json.loads(value)
+            except Exception:
+                pass
+            else:
+                if not loaded:
+                    continue
+                value = loaded
+        pairs.append((key, value))
+    try:
+        return _unflatten(pairs)
+    except _Ambiguous:
+        return unflatten(pairs)
+
+
+def decode_value(any_value: AnyValue) -> Any:
+    which = any_value.WhichOneof("value")
+    if which == "string_value":
+        return any_value.string_value
+    if which == "int_value":
+        return any_value.int_value
+    if which == "double_value":
+        return any_value.double_value
+    if which == "bool_value":
+        return any_value.bool_value
+    if which == "array_value":
+        return [decode_value(value) for value in any_value.array_value.values]
+    if which == "kvlist_value":
+        return {kv.key: decode_value(kv.value) for kv in any_value.kvlist_value.values}
+    if which == "bytes_value":
+        return any_value.bytes_value
+    if which is None:
+        return None
+    assert_never(which)
+
+
+def get_path(attributes: Dict[str, Any], key: str) -> Optional[Any]:
+    """
+    Same as `phoenix.trace.attributes.get_attribute_value`, but using the
+    compiled path of the key.
+    """
+    if (path := _path(key)) is None:
+        return get_attribute_value(attributes, key)
+    _, steps, last = path
+    value: Any = attributes
+    for sub_key, _ in steps:
+        if not (value and isinstance(value, dict)):
+            return None
+        value = value.get(sub_key)
+    if not (value and isinstance(value, dict)):
+        return None
+    return value.get(last)
+
+
+def _path(key: str) -> Optional[_Path]:
+    try:
+        return _PATHS[key]
+    except KeyError:
+        path = _compile(key)
+        if len(_PATHS) < _NUM_SEMANTIC_CONVENTIONS + _MAX_NUM_CACHED_KEYS:
+            _PATHS[key] = path
+        return path
+
+
+def _unflatten(pairs: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    root: Dict[str, Any] = {}
+    parents: Dict[str, Any] = {"": root}
+    # Keys whose values are dicts, which mustn't be mistaken for nodes.
+    dict_keys: Tuple[str, ...] = ()
+    # Lists are built once all of their elements are known.
+    lists: List[Tuple[Dict[Any, Any], Union[str, int], _Indexed]] = []
+    for key, value in pairs:
+        if value is None:
+            continue
+        if (path := _path(key)) is None or (dict_keys and key.startswith(dict_keys)):
+            raise _Ambiguous
+        parent_key, steps, last = path
+        if (node := parents.get(parent_key)) is None:
+            node = root
+            for sub_key, node_type in steps:
+                if (child := node.get(sub_key)) is None:
+                    child = node[sub_key] = node_type()
+                    if node_type is _Indexed:
+                        lists.append((node, sub_key, child))
+                elif type(child) is not node_type:
+                    raise _Ambiguous
+                node = child
+            parents[parent_key] = node
+        if last in node:
+            raise _Ambiguous
+        node[last] = value
+        if type(value) is dict:
+            dict_keys += (f"{key}.",)
+    for parent, sub_key, indexed in lists:
+        parent[sub_key] = [indexed[index] for index in sorted(indexed)]
+    return root
@@ -4,13 +4,31 @@ from dataclasses import dataclass, field
 from itertools import product
 from pathlib import Path
 from types import MappingProxyType
-from typing import Any, Callable, List, Mapping, Optional, Sequence, Set, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 from uuid import UUID, uuid4
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from google.protobuf.wrappers_pb2 import DoubleValue, StringValue
 from pandas.api.types import is_integer_dtype, is_numeric_dtype, is_string_dtype
 from pyarrow import RecordBatchStreamReader, Schema, Table, parquet
 
+import phoenix.trace.v1 as pb
 from phoenix.config import TRACE_DATASET_DIR
 from phoenix.exceptions import PhoenixEvaluationNameIsMissing
 from phoenix.trace.errors import InvalidParquetMetadataError
@@ -327,6 +345,174 @@ class TraceEvaluations(
 ): ...
 
 
+class EvaluationColumns(NamedTuple):
+    """
+    The evaluations of one Arrow record batch, column by column. Rows without
+    a score, label or explanation are left out, as are blank labels and
+    explanations and NaN scores, the same as when the evaluations are encoded
+    one by one.
+    """
+
+    eval_name: str
+    evaluations_cls: Type[Evaluations]
+    ids: List[str]
+    """The span ids, or the trace ids of trace evaluations."""
+    document_positions: List[int]
+    """The document positions of document evaluations, otherwise empty."""
+    scores: List[Optional[float]]
+    labels: List[Optional[str]]
+    explanations: List[Optional[str]]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def slice(self, start: int, stop: int) -> "EvaluationColumns":
+        return EvaluationColumns(
+            self.eval_name,
+            self.evaluations_cls,
+            self.ids[start:stop],
+            self.document_positions[start:stop],
+            self.scores[start:stop],
+            self.labels[start:stop],
+            self.explanations[start:stop],
+        )
+
+    def to_evaluations(self, rows: Optional[Iterable[int]] = None) -> Iterator[pb.Evaluation]:
+        """
+        Encodes the given rows, or all of them, as protobuf messages.
+        """
+        for i in range(len(self.ids)) if rows is None else rows:
+            if self.evaluations_cls is TraceEvaluations:
+                subject_id = pb.Evaluation.SubjectId(trace_id=self.ids[i])
+            elif self.evaluations_cls is DocumentEvaluations:
+                subject_id = pb.Evaluation.SubjectId(
+                    document_retrieval_id=pb.Evaluation.SubjectId.DocumentRetrievalId(
+                        document_position=self.document_positions[i],
+                        span_id=self.ids[i],
+                    ),
+                )
+            else:
+                subject_id = pb.Evaluation.SubjectId(span_id=self.ids[i])
+            score, label, explanation = self.scores[i], self.labels[i], self.explanations[i]
+            yield pb.Evaluation(
+                name=self.eval_name,
+                result=pb.Evaluation.Result(
+                    score=DoubleValue(value=score) if score is not None else None,
+                    label=StringValue(value=label) if label is not None else None,
+                    explanation=StringValue(value=explanation) if explanation is not None else None,
+                ),
+                subject_id=subject_id,
+            )
+
+
+def read_evaluation_columns(reader: RecordBatchStreamReader) -> Iterator[EvaluationColumns]:
+    """
+    Reads a stream of evaluations one record batch at a time without going
+    through pandas. The columns are validated with vectorized checks that mirror
+    the ones made on the dataframe of `Evaluations`, and a ValueError is raised
+    for the first batch that fails them.
+    """
+    _, eval_name, evaluations_cls = _parse_schema_metadata(reader.schema)
+    schema = reader.schema
+    index_names = _find_arrow_index_names(evaluations_cls, schema)
+    result_names = [name for name in evaluations_cls.result_column_names if name in schema.names]
+    if not result_names or not all(
+        _ARROW_RESULT_COLUMN_TYPES[name](schema.field(name).type) for name in result_names
+    ):
+        raise ValueError(
+            f"The record batches must contain one of these columns with appropriate "
+            f"value types: {evaluations_cls.result_column_names.keys()} "
+        )
+    for batch in reader:
+        results = {name: _arrow_result_column(batch, name) for name in result_names}
+        has_result = None
+        for column in results.values():
+            is_valid = pc.is_valid(column)
+            has_result = is_valid if has_result is None else pc.or_(has_result, is_valid)
+        ids, *positions = (
+            pc.filter(_decode_dictionary(batch.column(name)), has_result) for name in index_names
+        )
+        if ids.null_count or any(position.null_count for position in positions):
+            raise ValueError(f"The index columns {index_names} must not contain nulls")
+        columns = {
+            name: pc.filter(column, has_result).to_pylist() for name, column in results.items()
+        }
+        no_values: List[None] = [None] * len(ids)
+        yield EvaluationColumns(
+            eval_name=eval_name,
+            evaluations_cls=evaluations_cls,
+            ids=ids.to_pylist(),
+            document_positions=positions[0].to_pylist() if positions else [],
+            scores=columns.get("score", no_values),
+            labels=columns.get("label", no_values),
+            explanations=columns.get("explanation", no_values),
+        )
+
+
+def _find_arrow_index_names(evaluations_cls: Type[Evaluations], schema: Schema) -> List[str]:
+    """
+    Returns the names of the index columns in the order of the preferred names,
+    i.e. the span or trace id first.
+    """
+    index_names = []
+    for names in evaluations_cls.index_names:
+        is_valid_type = pa.types.is_integer if "document_position" in names else _is_arrow_string
+        for name in names:
+            if name in schema.names and is_valid_type(_value_type(schema.field(name).type)):
+                index_names.append(name)
+                break
+        else:
+            raise ValueError(
+                f"The record batches must have the index columns "
+                f"{evaluations_cls.preferred_names()}, or their aliases"
+            )
+    return index_names
+
+
+def _arrow_result_column(batch: pa.RecordBatch, name: str) -> pa.Array:
+    column = _decode_dictionary(batch.column(name))
+    if name == "score":
+        column = pc.cast(column, pa.float64())
+        return pc.if_else(pc.is_nan(column), pa.scalar(None, pa.float64()), column)
+    column = pc.cast(column, pa.string())
+    return pc.if_else(pc.equal(column, ""), pa.scalar(None, pa.string()), column)
+
+
+def _decode_dictionary(column: pa.Array) -> pa.Array:
+    # Categorical columns in pandas are dictionary encoded in Arrow.
+    return column.dictionary_decode() if pa.types.is_dictionary(column.type) else column
+
+
+def _value_type(data_type: pa.DataType) -> pa.DataType:
+    return data_type.value_type if pa.types.is_dictionary(data_type) else data_type
+
+
+def _is_arrow_string(data_type: pa.DataType) -> bool:
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def _is_arrow_numeric(data_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_boolean(data_type)
+        or pa.types.is_null(data_type)
+    )
+
+
+_ARROW_RESULT_COLUMN_TYPES: Mapping[str, Callable[[pa.DataType], bool]] = MappingProxyType(
+    {
+        "score": lambda data_type: _is_arrow_numeric(_value_type(data_type)),
+        "label": lambda data_type: (
+            _is_arrow_string(_value_type(data_type)) or pa.types.is_null(data_type)
+        ),
+        "explanation": lambda data_type: (
+            _is_arrow_string(_value_type(data_type)) or pa.types.is_null(data_type)
+        ),
+    }
+)
+
+
 def _parse_schema_metadata(schema: Schema) -> Tuple[UUID, str, Type[Evaluations]]:
     """
     Validates and parses the pyarrow schema metadata.
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+import pytest
+from phoenix.trace.schemas import Span, SpanContext, SpanKind, SpanStatusCode
+
+T0 = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def make_span() -> Callable[..., Span]:
+    def factory(
+        span_id: str,
+        parent_id: Optional[str] = None,
+        trace_id: str = "trace",
+        start: int = 0,
+        end: int = 1,
+        prompt: int = 0,
+        error: bool = False,
+    ) -> Span:
+        return Span(
+            name=span_id,
+            context=SpanContext(trace_id=trace_id, span_id=span_id),
+            span_kind=SpanKind.LLM,
+            parent_id=parent_id,
+            start_time=T0 + timedelta(seconds=start),
+            end_time=T0 + timedelta(seconds=end),
+            status_code=SpanStatusCode.ERROR if error else SpanStatusCode.OK,
+            status_message="",
+            attributes={"llm": {"token_count": {"prompt": prompt}}} if prompt else {},
+            events=[],
+            conversation=None,
+        )
+
+    return factory
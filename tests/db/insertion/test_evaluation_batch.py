@@ -0,0 +1,177 @@
+import asyncio
+from dataclasses import replace
+from typing import AsyncContextManager, Callable, Optional
+
+import phoenix.trace.v1 as pb
+from google.protobuf.wrappers_pb2 import DoubleValue, StringValue
+from phoenix.db import models
+from phoenix.db.bulk_inserter import BulkInserter
+from phoenix.db.flush_policy import FlushPolicy
+from phoenix.db.insertion.evaluation import (
+    DocumentEvaluationInsertionEvent,
+    SpanEvaluationInsertionEvent,
+    TraceEvaluationInsertionEvent,
+)
+from phoenix.db.insertion.evaluation_batch import insert_evaluation_columns, insert_evaluations
+from phoenix.db.insertion.span_batch import insert_spans
+from phoenix.trace.schemas import Span
+from phoenix.trace.span_evaluations import (
+    DocumentEvaluations,
+    EvaluationColumns,
+    SpanEvaluations,
+)
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _evaluation(
+    score: float,
+    name: str = "score",
+    span_id: Optional[str] = None,
+    trace_id: Optional[str] = None,
+    document_position: Optional[int] = None,
+) -> pb.Evaluation:
+    if document_position is not None:
+        subject_id = pb.Evaluation.SubjectId(
+            document_retrieval_id=pb.Evaluation.SubjectId.DocumentRetrievalId(
+                span_id=span_id, document_position=document_position
+            )
+        )
+    elif span_id is not None:
+        subject_id = pb.Evaluation.SubjectId(span_id=span_id)
+    else:
+        subject_id = pb.Evaluation.SubjectId(trace_id=trace_id)
+    return pb.Evaluation(
+        name=name,
+        subject_id=subject_id,
+        result=pb.Evaluation.Result(score=DoubleValue(value=score), label=StringValue(value="ok")),
+    )
+
+
+async def test_insert_evaluations_upserts_each_kind_and_returns_missing(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    retriever = replace(
+        make_span("b", parent_id="a"),
+        attributes={"retrieval": {"documents": [{"document": {"id": "x"}}] * 2}},
+    )
+    async with db() as session:
+        await insert_spans(session, [(make_span("a"), "p"), (retriever, "p")])
+    async with db() as session:
+        await insert_evaluations(session, [_evaluation(0, span_id="a")])
+    missing_span = _evaluation(1, span_id="z")
+    missing_trace = _evaluation(1, trace_id="z")
+    async with db() as session:
+        result = await insert_evaluations(
+            session,
+            [
+                missing_span,
+                _evaluation(1, span_id="a"),
+                _evaluation(2, span_id="a"),  # the last one wins
+                _evaluation(3, name="other", span_id="a"),
+                missing_trace,
+                _evaluation(4, trace_id="trace"),
+                _evaluation(5, span_id="b", document_position=1),
+                _evaluation(6, span_id="b", document_position=2),  # out of range
+                _evaluation(7, span_id="b"),
+            ],
+            max_rows_per_upsert=1,
+        )
+    project_rowid = result.events[0].project_rowid
+    assert set(result.events) == {
+        SpanEvaluationInsertionEvent(project_rowid, "score"),
+        SpanEvaluationInsertionEvent(project_rowid, "other"),
+        TraceEvaluationInsertionEvent(project_rowid, "score"),
+        DocumentEvaluationInsertionEvent(project_rowid, "score"),
+    }
+    assert result.missing == [missing_span, missing_trace]
+    assert result.num_failures == 1
+    async with db() as session:
+        span_annotations = (
+            await session.execute(
+                select(models.Span.span_id, models.SpanAnnotation.name, models.SpanAnnotation.score)
+                .join_from(models.SpanAnnotation, models.Span)
+                .order_by(models.SpanAnnotation.score)
+            )
+        ).all()
+        trace_scores = list(await session.scalars(select(models.TraceAnnotation.score)))
+        document_annotations = (
+            await session.execute(
+                select(models.DocumentAnnotation.document_position, models.DocumentAnnotation.score)
+            )
+        ).all()
+    assert span_annotations == [("a", "score", 2), ("a", "other", 3), ("b", "score", 7)]
+    assert trace_scores == [4]
+    assert document_annotations == [(1, 5)]
+
+
+async def test_insert_evaluation_columns_returns_missing_rows(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    retriever = replace(
+        make_span("a"),
+        attributes={"retrieval": {"documents": [{"document": {"id": "x"}}] * 2}},
+    )
+    async with db() as session:
+        await insert_spans(session, [(retriever, "p")])
+    columns = EvaluationColumns(
+        eval_name="relevance",
+        evaluations_cls=DocumentEvaluations,
+        ids=["a", "z", "a"],
+        document_positions=[0, 0, 1],
+        scores=[1.0, 1.0, None],
+        labels=[None, None, "relevant"],
+        explanations=[None, None, None],
+    )
+    async with db() as session:
+        result = await insert_evaluation_columns(session, columns)
+    assert [event.evaluation_name for event in result.events] == ["relevance"]
+    assert result.missing == [1]
+    (evaluation,) = columns.to_evaluations(result.missing)
+    assert evaluation.subject_id.document_retrieval_id.span_id == "z"
+    assert evaluation.result.score.value == 1
+    assert not evaluation.result.HasField("label")
+    async with db() as session:
+        document_annotations = (
+            await session.execute(
+                select(
+                    models.DocumentAnnotation.document_position,
+                    models.DocumentAnnotation.score,
+                    models.DocumentAnnotation.label,
+                ).order_by(models.DocumentAnnotation.document_position)
+            )
+        ).all()
+    assert document_annotations == [(0, 1, None), (1, None, "relevant")]
+
+
+async def test_bulk_inserter_parks_evaluations_until_their_spans_arrive(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    bulk_inserter = BulkInserter(db, flush_policy=FlushPolicy(max_linger=0.01))
+    async with bulk_inserter as (queue_span, queue_evaluation):
+        await queue_evaluation(_evaluation(1, span_id="a"))
+        await bulk_inserter.insert_evaluation_columns(
+            EvaluationColumns(
+                eval_name="score",
+                evaluations_cls=SpanEvaluations,
+                ids=["b"],
+                document_positions=[],
+                scores=[1.0],
+                labels=[None],
+                explanations=[None],
+            )
+        )
+        await asyncio.sleep(0.1)
+        async with db() as session:
+            assert not await session.scalar(select(func.count(models.SpanAnnotation.id)))
+        await queue_span(make_span("a"), "p")
+        await queue_span(make_span("b"), "p")
+    # The in-memory database has a single connection, so it isn't read until the
+    # inserter is done with it.
+    assert bulk_inserter._task
+    await bulk_inserter._task
+    async with db() as session:
+        assert await session.scalar(select(func.count(models.SpanAnnotation.id))) == 2
@@ -0,0 +1,215 @@
+from datetime import datetime, timedelta, timezone
+from typing import AsyncContextManager, Callable
+
+from phoenix.db import models
+from phoenix.db.insertion.resolver import ProjectTraceResolver
+from phoenix.db.insertion.span import ClearProjectSpansEvent
+from phoenix.db.insertion.span_batch import insert_spans
+from phoenix.trace.schemas import Span
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_T0 = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+async def test_insert_spans_accumulates_counts_within_and_across_batches(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        result = await insert_spans(
+            session,
+            [
+                (make_span("c", parent_id="b", prompt=1, start=2, end=3), "p"),
+                (make_span("b", parent_id="a", prompt=10, error=True, start=1, end=4), "p"),
+            ],
+            max_spans_per_statement=1,
+        )
+    assert len(result.events) == 1
+    assert result.num_failures == 0
+    async with db() as session:
+        result = await insert_spans(
+            session,
+            [
+                (make_span("a", prompt=100, start=0, end=5), "p"),
+                (make_span("d", parent_id="c", prompt=1000, error=True, start=2, end=6), "p"),
+                (make_span("a", prompt=100, start=0, end=5), "p"),  # duplicate
+            ],
+        )
+    assert len(result.events) == 1
+    assert result.num_failures == 0
+    async with db() as session:
+        rows = dict(
+            (
+                await session.execute(
+                    select(
+                        models.Span.span_id,
+                        models.Span.cumulative_llm_token_count_prompt,
+                    )
+                )
+            ).all()
+        )
+        counts = dict(
+            (
+                await session.execute(
+                    select(models.Span.span_id, models.Span.cumulative_error_count)
+                )
+            ).all()
+        )
+        trace = await session.scalar(select(models.Trace))
+        project_names = list(await session.scalars(select(models.Project.name)))
+    assert rows == {"a": 1111, "b": 1011, "c": 1001, "d": 1000}
+    assert counts == {"a": 2, "b": 2, "c": 1, "d": 1}
+    assert trace is not None
+    assert trace.start_time == _T0
+    assert trace.end_time == _T0 + timedelta(seconds=6)
+    assert project_names.count("p") == 1
+
+
+async def test_insert_spans_skips_existing_spans(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        await insert_spans(session, [(make_span("a", prompt=1), "p")])
+    async with db() as session:
+        result = await insert_spans(session, [(make_span("a", prompt=1), "q")])
+    assert result.events == []
+    async with db() as session:
+        assert await session.scalar(select(models.Span.cumulative_llm_token_count_prompt)) == 1
+
+
+async def test_insert_spans_with_resolver_widens_cached_trace_bounds(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    resolver = ProjectTraceResolver()
+    async with db() as session:
+        await insert_spans(session, [(make_span("a", start=1, end=2), "p")], resolver=resolver)
+    resolver.commit()
+    async with db() as session:
+        project_rowid = await session.scalar(select(models.Project.id))
+    assert resolver.project_rowid("p") == project_rowid
+    async with db() as session:
+        await insert_spans(
+            session,
+            [(make_span("b", start=0, end=1), "p"), (make_span("c", start=1, end=3), "p")],
+            resolver=resolver,
+        )
+    resolver.commit()
+    async with db() as session:
+        trace = await session.scalar(select(models.Trace))
+    assert trace is not None
+    assert (trace.start_time, trace.end_time) == (_T0, _T0 + timedelta(seconds=3))
+    resolved = resolver.trace("trace")
+    assert resolved is not None
+    assert resolved.covers(_T0, _T0 + timedelta(seconds=3))
+    resolver.invalidate(ClearProjectSpansEvent(project_rowid=trace.project_rowid))
+    assert resolver.project_rowid("p") is None
+    assert resolver.trace("trace") is None
+
+
+async def test_insert_spans_counts_failures(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    bad_span = make_span("b")
+    bad_span.attributes["x"] = object()  # not JSON serializable
+    async with db() as session:
+        result = await insert_spans(session, [(make_span("a"), "p"), (bad_span, "p")])
+    assert len(result.events) == 1
+    assert result.num_failures == 1
+    async with db() as session:
+        assert list(await session.scalars(select(models.Span.span_id))) == ["a"]
+
+
+async def test_insert_spans_with_copy(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    # COPY is only used for PostgreSQL, but the results must be the same either way.
+    async with db() as session:
+        await insert_spans(session, [(make_span("a", prompt=1), "p")], use_copy=True)
+    async with db() as session:
+        result = await insert_spans(
+            session,
+            [
+                (make_span("a", prompt=1), "p"),
+                (make_span("b", parent_id="a", prompt=10, error=True), "p"),
+            ],
+            use_copy=True,
+        )
+    assert len(result.events) == 1
+    assert result.num_failures == 0
+    async with db() as session:
+        rows = (
+            await session.execute(
+                select(
+                    models.Span.span_id,
+                    models.Span.cumulative_llm_token_count_prompt,
+                    models.Span.cumulative_error_count,
+                    models.Span.attributes,
+                ).order_by(models.Span.span_id)
+            )
+        ).all()
+    assert rows == [
+        ("a", 11, 1, {"llm": {"token_count": {"prompt": 1}}}),
+        ("b", 10, 1, {"llm": {"token_count": {"prompt": 10}}}),
+    ]
+
+
+async def test_insert_spans_unmarks_root_spans_when_their_parents_arrive(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (make_span("c", parent_id="b"), "p"),
+                (make_span("b", parent_id="a"), "p"),
+                (make_span("e", parent_id="x"), "p"),
+            ],
+        )
+        is_root = dict(
+            (await session.execute(select(models.Span.span_id, models.Span.is_root))).all()
+        )
+    assert is_root == {"b": True, "c": False, "e": True}
+    async with db() as session:
+        await insert_spans(session, [(make_span("a"), "p"), (make_span("d", parent_id="c"), "p")])
+        is_root = dict(
+            (await session.execute(select(models.Span.span_id, models.Span.is_root))).all()
+        )
+    assert is_root == {"a": True, "b": False, "c": False, "d": False, "e": True}
+
+
+async def test_insert_spans_puts_spans_in_the_projects_of_their_traces(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        await insert_spans(session, [(make_span("a", trace_id="t"), "p")])
+    async with db() as session:
+        result = await insert_spans(
+            session,
+            [
+                (make_span("b", parent_id="a", trace_id="t"), "q"),
+                (make_span("c", trace_id="u"), "q"),
+            ],
+        )
+        project_rowids = dict(
+            (await session.execute(select(models.Project.name, models.Project.id))).all()
+        )
+        rows = (
+            await session.execute(
+                select(models.Span.span_id, models.Span.project_rowid, models.Trace.project_rowid)
+                .join(models.Trace)
+                .order_by(models.Span.span_id)
+            )
+        ).all()
+    assert [tuple(row) for row in rows] == [
+        ("a", project_rowids["p"], project_rowids["p"]),
+        ("b", project_rowids["p"], project_rowids["p"]),
+        ("c", project_rowids["q"], project_rowids["q"]),
+    ]
+    assert {event.project_rowid for event in result.events} == set(project_rowids.values())
@@ -0,0 +1,39 @@
+from typing import Callable
+
+from phoenix.db.insertion.span_rollup import CumulativeCounts, exclude, roll_up
+from phoenix.trace.schemas import Span
+
+
+def test_roll_up_computes_counts_bottom_up(make_span: Callable[..., Span]) -> None:
+    spans = [
+        make_span("c", parent_id="b", prompt=1),
+        make_span("b", parent_id="a", prompt=10),
+        make_span("d", parent_id="b", prompt=100),
+        make_span("e", parent_id="x", prompt=1000),
+    ]
+    rollup = roll_up(spans, {"c": CumulativeCounts(0, 10000, 0)})
+    assert {k: v.llm_token_count_prompt for k, v in rollup.cumulative_counts.items()} == {
+        "b": 10111,
+        "c": 10001,
+        "d": 100,
+        "e": 1000,
+    }
+    assert {k: v.llm_token_count_prompt for k, v in rollup.boundary_counts.items()} == {
+        "a": 10111,
+        "x": 1000,
+    }
+
+
+def test_exclude_takes_back_contributions_of_spans_not_inserted(
+    make_span: Callable[..., Span],
+) -> None:
+    spans = [
+        make_span("c", parent_id="b", prompt=1),
+        make_span("b", parent_id="a", prompt=10),
+        make_span("a", parent_id="x", prompt=100),
+        make_span("d", parent_id="a", prompt=1000),
+    ]
+    rollup = roll_up(spans, {})
+    corrections, boundary_counts = exclude(rollup, spans, {"b", "c"})
+    assert corrections == {"a": CumulativeCounts(0, -11, 0)}
+    assert boundary_counts == {"x": CumulativeCounts(0, 1100, 0)}
@@ -0,0 +1,18 @@
+from typing import AsyncContextManager, Callable
+
+from phoenix.db.bulk_inserter import BulkInserter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def test_reserve_spans_rejects_when_full_and_releases_after_insertion(
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    bulk_inserter = BulkInserter(db, max_queued_spans=3, max_queued_span_bytes=100)
+    assert bulk_inserter.reserve_spans(2, 50)
+    assert not bulk_inserter.reserve_spans(2, 10)  # too many spans
+    assert not bulk_inserter.reserve_spans(1, 60)  # too many bytes
+    assert bulk_inserter.reserve_spans(1, 50)
+    bulk_inserter._release_spans(1)
+    assert bulk_inserter.reserve_spans(1, 25)
+    bulk_inserter._release_spans(10)
+    assert bulk_inserter.reserve_spans(3, 100)
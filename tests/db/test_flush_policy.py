@@ -0,0 +1,38 @@
+from time import monotonic
+
+from phoenix.db.flush_policy import FlushPolicy
+
+
+def test_is_due_on_whichever_trigger_comes_first() -> None:
+    policy = FlushPolicy(batch_size=10, max_linger=60, max_bytes=100)
+    now = monotonic()
+    assert not policy.is_due(0, 0, None)
+    assert not policy.is_due(9, 99, now)
+    assert policy.is_due(10, 0, now)
+    assert policy.is_due(1, 100, now)
+    assert policy.is_due(1, 0, now - 60)
+    assert policy.time_until_due(None) is None
+    assert 59 < (policy.time_until_due(now) or 0) <= 60
+    assert policy.time_until_due(now - 120) == 0
+
+
+def test_transaction_size_adapts_to_commit_latency() -> None:
+    policy = FlushPolicy(
+        batch_size=1000,
+        min_transaction_size=100,
+        max_transaction_size=2000,
+        target_commit_latency=1,
+    )
+    assert policy.transaction_size == 1000
+    policy.observe_commit(1000, 2)
+    assert policy.transaction_size == 500
+    policy.observe_commit(10, 0.1)  # not a full transaction, so nothing is learned
+    assert policy.transaction_size == 500
+    policy.observe_commit(500, 0.1)
+    assert policy.transaction_size == 625
+    for _ in range(10):
+        policy.observe_commit(policy.transaction_size, 0.1)
+    assert policy.transaction_size == 2000
+    for _ in range(10):
+        policy.observe_commit(policy.transaction_size, 5)
+    assert policy.transaction_size == 100
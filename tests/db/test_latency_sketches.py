@@ -0,0 +1,111 @@
+from datetime import timedelta
+from random import Random
+from typing import AsyncContextManager, Callable, Dict, Tuple
+
+import numpy as np
+import pytest
+from phoenix.db import models
+from phoenix.db.insertion.span_batch import insert_spans
+from phoenix.db.latency_sketches import RELATIVE_ACCURACY, DDSketch
+from phoenix.db.span_rollups import delete_traces
+from phoenix.server.api.dataloaders import LatencyMsQuantileDataLoader
+from phoenix.server.api.input_types.TimeRange import TimeRange
+from phoenix.trace.schemas import Span
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .conftest import T0
+
+_HOUR = 3600
+
+
+def test_ddsketch_estimates_quantiles_within_the_relative_accuracy() -> None:
+    rng = Random(42)
+    values = [rng.lognormvariate(3, 2) for _ in range(10_000)] + [0.0] * 100
+    sketch, other = DDSketch(), DDSketch()
+    for i, value in enumerate(values):
+        (sketch if i % 2 else other).add(value)
+    sketch.merge(other)
+    sketch = DDSketch.from_bytes(sketch.to_bytes())
+    assert sketch.count == len(values)
+    for probability in (0.01, 0.25, 0.5, 0.9, 0.99):
+        expected = float(np.quantile(values, probability, method="lower"))
+        assert sketch.quantile(probability) == pytest.approx(expected, rel=RELATIVE_ACCURACY)
+    for value in values[:5000]:
+        sketch.add(value, -1)
+    assert sketch.count == len(values) - 5000
+    assert DDSketch().quantile(0.5) is None
+
+
+async def _sketches(session: AsyncSession) -> Dict[Tuple[str, int], int]:
+    return {
+        (kind, int((hour - T0).total_seconds()) // _HOUR): DDSketch.from_bytes(data).count
+        for kind, hour, data in await session.execute(
+            select(
+                models.LatencySketch.kind,
+                models.LatencySketch.hour,
+                models.LatencySketch.sketch,
+            )
+        )
+    }
+
+
+async def test_sketches_are_kept_up_to_date_and_estimate_quantiles(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (make_span(f"{i}", trace_id=f"{i}", start=i * 60, end=i * 60 + i), "a")
+                for i in range(1, 150)
+            ],
+        )
+        # A late span moves the start of trace "1" an hour earlier.
+        await insert_spans(
+            session, [(make_span("0", "1", trace_id="1", start=-_HOUR, end=-_HOUR + 1), "a")]
+        )
+        assert await _sketches(session) == {
+            ("span", -1): 1,
+            ("span", 0): 59,
+            ("span", 1): 60,
+            ("span", 2): 30,
+            ("trace", -1): 1,
+            ("trace", 0): 58,
+            ("trace", 1): 60,
+            ("trace", 2): 30,
+        }
+        project_rowid = await session.scalar(select(models.Project.id))
+        assert project_rowid is not None
+
+    # The whole hour is read from the sketches, and the partial hours around it from the rows.
+    time_range = TimeRange(start=T0 + timedelta(minutes=30), end=T0 + timedelta(minutes=150))
+    loader = LatencyMsQuantileDataLoader(db)
+    keys = [
+        (kind, project_rowid, time_range, None, probability, exact)
+        for exact in (False, True)
+        for kind in ("span", "trace")
+        for probability in (0.1, 0.5, 0.9)
+    ]
+    results = await loader._load_fn(keys)
+    latencies = [i * 1000 for i in range(30, 150)]
+    # Estimates are off by the relative accuracy from a value of the data, while exact
+    # values are interpolated between the values of the data.
+    for actual, method, rel in (
+        (results[:6], "lower", RELATIVE_ACCURACY),
+        (results[6:], "linear", 1e-7),
+    ):
+        expected = [float(np.quantile(latencies, p, method=method)) for p in (0.1, 0.5, 0.9)]
+        assert actual == pytest.approx(expected * 2, rel=rel)
+
+    async with db() as session:
+        trace_rowids = list(
+            await session.scalars(
+                select(models.Trace.id).where(models.Trace.trace_id.in_(["1", "2"]))
+            )
+        )
+        await delete_traces(session, trace_rowids)
+        sketches = await _sketches(session)
+    assert ("span", -1) not in sketches and ("trace", -1) not in sketches
+    assert sketches[("span", 0)] == sketches[("trace", 0)] == 57
@@ -0,0 +1,58 @@
+import asyncio
+from typing import AsyncContextManager, Callable, List
+
+from phoenix.db import models
+from phoenix.db.insertion.span import ClearProjectSpansEvent
+from phoenix.db.insertion.span_batch import insert_spans
+from phoenix.db.project_deletion import (
+    ProjectDeleter,
+    ProjectDeletionJob,
+    ProjectDeletionKind,
+    ProjectDeletionStatus,
+)
+from phoenix.trace.schemas import Span
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _wait(job: ProjectDeletionJob) -> None:
+    for _ in range(100):
+        if job.status is not ProjectDeletionStatus.RUNNING:
+            return
+        await asyncio.sleep(0.01)
+    assert False, "the job never finished"
+
+
+async def test_clear_and_delete_projects_in_chunks(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        await insert_spans(
+            session,
+            [(make_span(f"{i}", trace_id=f"{i}"), "a") for i in range(3)]
+            + [(make_span("3", trace_id="3"), "b")],
+        )
+        project_rowids = dict(
+            (await session.execute(select(models.Project.name, models.Project.id))).all()
+        )
+    events: List[ClearProjectSpansEvent] = []
+    deleter = ProjectDeleter(db, chunk_size=2, pause=0, invalidate=events.append)
+    async with deleter:
+        job = await deleter.clear_project(project_rowids["a"])
+        assert job.kind is ProjectDeletionKind.CLEAR
+        assert not deleter.hidden_project_rowids
+        await _wait(job)
+        assert job.status is ProjectDeletionStatus.COMPLETED
+        assert job.num_deleted_traces == 3
+        assert deleter.get_job(job.id) is job
+        job = await deleter.delete_project(project_rowids["b"])
+        assert deleter.hidden_project_rowids == {project_rowids["b"]}
+        await _wait(job)
+        assert job.status is ProjectDeletionStatus.COMPLETED
+        assert job.num_deleted_traces == 1
+        assert not deleter.hidden_project_rowids
+    assert set(events) == {ClearProjectSpansEvent(rowid) for rowid in project_rowids.values()}
+    async with db() as session:
+        assert list(await session.scalars(select(models.Project.name))) == ["a"]
+        assert not list(await session.scalars(select(models.Trace.id)))
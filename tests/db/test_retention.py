@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+from typing import AsyncContextManager, Callable, List
+
+import pytest
+from phoenix.db import models
+from phoenix.db.insertion.span import ClearProjectSpansEvent
+from phoenix.db.insertion.span_batch import insert_spans
+from phoenix.db.retention import RetentionPolicy, TraceRetention
+from phoenix.trace.schemas import Span
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .conftest import T0
+
+
+async def _trace_ids(db: Callable[[], AsyncContextManager[AsyncSession]]) -> List[str]:
+    async with db() as session:
+        return list(
+            await session.scalars(select(models.Trace.trace_id).order_by(models.Trace.start_time))
+        )
+
+
+async def test_enforce_deletes_the_oldest_traces_in_chunks(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (make_span(f"{i}", trace_id=f"{i}", start=i * 100, end=i * 100 + 1), project)
+                for i, project in enumerate(["a", "a", "a", "b", "b", "c"])
+            ]
+            + [(make_span("4x", parent_id="4", trace_id="4", start=400, end=401), "b")],
+        )
+    events: List[ClearProjectSpansEvent] = []
+    retention = TraceRetention(
+        db,
+        # The traces of projects without a policy of their own that started before T0 + 150s.
+        default_policy=RetentionPolicy(
+            max_age=datetime.now(timezone.utc) - (T0 + timedelta(seconds=150))
+        ),
+        project_policies={"b": RetentionPolicy(max_num_spans=2), "c": RetentionPolicy()},
+        chunk_size=1,
+        pause=0,
+        invalidate=events.append,
+    )
+    assert retention.is_enabled
+    assert await retention.enforce() == 3
+    assert await _trace_ids(db) == ["2", "4", "5"]
+    assert len(events) == 3
+    assert await retention.enforce() == 0
+    assert not TraceRetention(db, project_policies={"c": RetentionPolicy()}).is_enabled
+
+
+async def test_enforce_deletes_the_oldest_traces_while_the_database_is_too_large(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        if session.bind.dialect.name != "sqlite":
+            pytest.skip("A maximum database size is only supported for SQLite")
+        await insert_spans(
+            session,
+            [(make_span(f"{i}", trace_id=f"{i}", start=i, end=i + 1), "a") for i in range(3)],
+        )
+    retention = TraceRetention(db, max_database_bytes=0, chunk_size=2, pause=0)
+    assert await retention.enforce() == 3
+    assert await _trace_ids(db) == []
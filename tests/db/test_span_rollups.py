@@ -0,0 +1,116 @@
+from datetime import timedelta
+from typing import AsyncContextManager, Callable, List, Tuple
+
+from phoenix.db import models
+from phoenix.db.insertion.span_batch import insert_spans
+from phoenix.db.span_rollups import (
+    delete_traces,
+    get_span_rollup_buckets,
+    refresh_span_rollups,
+    split_time_range,
+)
+from phoenix.server.api.dataloaders import (
+    MinStartOrMaxEndTimeDataLoader,
+    RecordCountDataLoader,
+    TokenCountDataLoader,
+)
+from phoenix.server.api.input_types.TimeRange import TimeRange
+from phoenix.trace.schemas import Span
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .conftest import T0
+
+_HOUR = 3600
+
+
+async def _rollups(session: AsyncSession) -> List[Tuple[object, ...]]:
+    table = models.SpanRollup
+    return [
+        tuple(row)
+        for row in await session.execute(
+            select(
+                table.project_rowid,
+                table.hour,
+                table.span_kind,
+                table.is_root,
+                table.num_spans,
+                table.num_errors,
+                table.llm_token_count_prompt,
+                table.min_start_time,
+                table.max_end_time,
+            ).order_by(table.project_rowid, table.hour, table.is_root)
+        )
+    ]
+
+
+def test_split_time_range() -> None:
+    h = timedelta(hours=1)
+    assert split_time_range(None, None) == ((None, None), [])
+    assert split_time_range(T0, T0 + 2 * h) == ((T0, T0 + 2 * h), [])
+    assert split_time_range(T0 + h / 2, T0 + 3 * h + h / 2) == (
+        (T0 + h, T0 + 3 * h),
+        [(T0 + h / 2, T0 + h), (T0 + 3 * h, T0 + 3 * h + h / 2)],
+    )
+    assert split_time_range(T0 + h / 2, None) == ((T0 + h, None), [(T0 + h / 2, T0 + h)])
+    assert split_time_range(T0 + h / 2, T0 + h + h / 2) == (None, [(T0 + h / 2, T0 + h + h / 2)])
+
+
+async def test_rollups_are_kept_up_to_date(
+    make_span: Callable[..., Span],
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+) -> None:
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (make_span("0", trace_id="0", start=10, end=20, prompt=1), "a"),
+                (
+                    make_span("1", "0", trace_id="0", start=_HOUR - 1, end=_HOUR + 5, error=True),
+                    "a",
+                ),
+                (make_span("2", trace_id="2", start=_HOUR + 10, end=_HOUR + 30, prompt=2), "a"),
+                (make_span("3", trace_id="3", start=3 * _HOUR + 10, end=3 * _HOUR + 20), "b"),
+            ],
+        )
+        # A second batch adds to the rollups of the same hour.
+        await insert_spans(
+            session,
+            [(make_span("4", trace_id="4", start=_HOUR + 20, end=_HOUR + 40, prompt=4), "a")],
+        )
+        project_rowids = dict(
+            (await session.execute(select(models.Project.name, models.Project.id))).all()
+        )
+        a, b = project_rowids["a"], project_rowids["b"]
+        h = timedelta(hours=1)
+        s = timedelta(seconds=1)
+        assert await _rollups(session) == [
+            (a, T0, "LLM", False, 1, 1, 0, T0 + h - s, T0 + h + 5 * s),
+            (a, T0, "LLM", True, 1, 0, 1, T0 + 10 * s, T0 + 20 * s),
+            (a, T0 + h, "LLM", True, 2, 0, 6, T0 + h + 10 * s, T0 + h + 40 * s),
+            (b, T0 + 3 * h, "LLM", True, 1, 0, 0, T0 + 3 * h + 10 * s, T0 + 3 * h + 20 * s),
+        ]
+        incremental = await _rollups(session)
+        await refresh_span_rollups(session, await get_span_rollup_buckets(session))
+        assert await _rollups(session) == incremental
+
+    # The spans of the whole hour are read from the rollups, and those before it from the spans.
+    time_range = TimeRange(start=T0 + 30 * s, end=T0 + 2 * h + 15 * s)
+    assert await RecordCountDataLoader(db)._load_fn(
+        [("span", a, time_range, None), ("span", a, None, None), ("span", b, None, None)]
+    ) == [3, 4, 1]
+    assert await TokenCountDataLoader(db)._load_fn(
+        [("prompt", a, time_range, None), ("total", a, None, None)]
+    ) == [6, 7]
+    assert await MinStartOrMaxEndTimeDataLoader(db)._load_fn([(a, "start"), (a, "end")]) == [
+        T0 + 10 * s,
+        T0 + h + 40 * s,
+    ]
+
+    async with db() as session:
+        trace_rowid = await session.scalar(
+            select(models.Trace.id).where(models.Trace.trace_id == "0")
+        )
+        assert trace_rowid is not None
+        await delete_traces(session, [trace_rowid])
+        assert await _rollups(session) == incremental[2:]
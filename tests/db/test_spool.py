@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncContextManager, Callable
+
+import phoenix.trace.v1 as pb
+from google.protobuf.wrappers_pb2 import DoubleValue, StringValue
+from phoenix.db import models
+from phoenix.db.bulk_inserter import BulkInserter
+from phoenix.db.flush_policy import FlushPolicy
+from phoenix.db.spool import Spool
+from phoenix.trace.schemas import Span, SpanContext, SpanKind, SpanStatusCode
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _span(span_id: str) -> Span:
+    return Span(
+        name="span",
+        context=SpanContext(trace_id="0" * 31 + "1", span_id=span_id),
+        span_kind=SpanKind.CHAIN,
+        parent_id=None,
+        start_time=datetime(2021, 1, 1, tzinfo=timezone.utc),
+        end_time=datetime(2021, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+        status_code=SpanStatusCode.OK,
+        status_message="",
+        attributes={},
+        events=[],
+        conversation=None,
+    )
+
+
+def _evaluation(span_id: str) -> pb.Evaluation:
+    return pb.Evaluation(
+        name="score",
+        subject_id=pb.Evaluation.SubjectId(span_id=span_id),
+        result=pb.Evaluation.Result(score=DoubleValue(value=1.0), label=StringValue(value="good")),
+    )
+
+
+def test_spool_replays_uncommitted_records_after_reopening(tmp_path: Path) -> None:
+    spool = Spool(tmp_path, max_segment_bytes=1)
+    spool.append_span(_span("0" * 15 + "1"), "a")
+    spool.append_evaluation(_evaluation("0" * 15 + "1"))
+    spool.append_span(_span("0" * 15 + "2"), "b")
+    records, position = spool.read(2)
+    assert len(records) == 2
+    span, project_name = records[0]
+    assert span.context.span_id == "0" * 15 + "1" and project_name == "a"
+    assert isinstance(records[1], pb.Evaluation)
+    spool.commit(position)
+    records, _ = spool.read(10)
+    assert len(records) == 1
+    assert not spool.has_unread()
+    spool.close()
+
+    spool = Spool(tmp_path)
+    assert spool.has_unread()
+    records, position = spool.read(10)
+    assert [(span.context.span_id, project_name) for span, project_name in records] == [
+        ("0" * 15 + "2", "b")
+    ]
+    spool.rewind()
+    assert spool.read(10)[0] == records
+    spool.commit(position)
+    spool.close()
+    assert not Spool(tmp_path).has_unread()
+
+
+def test_spool_skips_record_truncated_by_crash(tmp_path: Path) -> None:
+    spool = Spool(tmp_path)
+    spool.append_span(_span("0" * 15 + "1"), "a")
+    spool.close()
+    (segment,) = tmp_path.glob("*.seg")
+    segment.write_bytes(segment.read_bytes()[:-1])
+    spool = Spool(tmp_path)
+    spool.append_span(_span("0" * 15 + "2"), "a")
+    records, _ = spool.read(10)
+    assert [span.context.span_id for span, _ in records] == ["0" * 15 + "2"]
+    spool.close()
+
+
+async def test_bulk_inserter_inserts_spooled_spans_and_evaluations(
+    db: Callable[[], AsyncContextManager[AsyncSession]],
+    tmp_path: Path,
+) -> None:
+    spool = Spool(tmp_path)
+    spool.append_span(_span("0" * 15 + "1"), "a")
+    spool.append_evaluation(_evaluation("0" * 15 + "1"))
+    spool.close()
+    bulk_inserter = BulkInserter(
+        db, spool_directory=tmp_path, flush_policy=FlushPolicy(max_linger=0.01)
+    )
+    async with bulk_inserter as (queue_span, _):
+        await queue_span(_span("0" * 15 + "2"), "a")
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if bulk_inserter.last_updated_at() and not bulk_inserter._has_unread_spool():
+                break
+    async with db() as session:
+        assert await session.scalar(select(func.count(models.Span.id))) == 2
+        assert await session.scalar(select(func.count(models.SpanAnnotation.id))) == 1
@@ -4,7 +4,9 @@ from typing import AsyncContextManager, Callable
 
 import pytest
 from phoenix.db import models
-from sqlalchemy import insert
+from phoenix.db.latency_sketches import get_trace_buckets, refresh_latency_sketches
+from phoenix.db.span_rollups import get_span_rollup_buckets, refresh_span_rollups
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -53,8 +55,10 @@ async def data_for_testing_dataloaders(
                         insert(models.Span)
                         .values(
                             trace_rowid=trace_row_id,
+                            project_rowid=project_row_id,
                             span_id=f"{i}_{j}_{k}",
                             parent_id=None,
+                            is_root=True,
                             name=f"{i}_{j}_{k}",
                             span_kind="UNKNOWN",
                             start_time=start_time,
@@ -87,3 +91,11 @@ async def data_for_testing_dataloaders(
                                 annotator_kind="LLM",
                             )
                         )
+        # The spans are inserted directly, so they are rolled up as the migrations would.
+        buckets = await get_span_rollup_buckets(session)
+        await refresh_span_rollups(session, buckets)
+        await refresh_latency_sketches(session, "span", buckets)
+        trace_rowids = list(await session.scalars(select(models.Trace.id)))
+        await refresh_latency_sketches(
+            session, "trace", await get_trace_buckets(session, trace_rowids)
+        )
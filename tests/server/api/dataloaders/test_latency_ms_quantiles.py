@@ -54,6 +54,7 @@ async def test_latency_ms_quantiles_p25_p50_p75(
                 TimeRange(start=start_time, end=end_time),
                 "'_5_' in name" if kind == "span" else None,
                 probability,
+                False,
             )
             for kind in ("trace", "span")
             for id_ in range(10)
@@ -0,0 +1,68 @@
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+from google.protobuf.message import DecodeError
+from openinference.semconv.resource import ResourceAttributes
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from opentelemetry.proto.resource.v1.resource_pb2 import Resource
+from opentelemetry.proto.trace.v1.trace_pb2 import ResourceSpans, ScopeSpans
+from phoenix.config import DEFAULT_PROJECT_NAME
+from phoenix.server.otlp_decoder import OtlpDecoder
+from phoenix.trace.otel import encode_span_to_otlp
+from phoenix.trace.schemas import Span, SpanContext, SpanKind, SpanStatusCode
+
+
+def _span(span_id: str) -> Span:
+    return Span(
+        name=span_id,
+        context=SpanContext(trace_id="0" * 32, span_id=span_id),
+        span_kind=SpanKind.CHAIN,
+        parent_id=None,
+        start_time=datetime(2021, 1, 1, tzinfo=timezone.utc),
+        end_time=datetime(2021, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+        status_code=SpanStatusCode.OK,
+        status_message="",
+        attributes={"input": {"value": span_id}},
+        events=[],
+        conversation=None,
+    )
+
+
+@pytest.fixture
+def export_request() -> ExportTraceServiceRequest:
+    project = KeyValue(key=ResourceAttributes.PROJECT_NAME, value=AnyValue(string_value="abc"))
+    return ExportTraceServiceRequest(
+        resource_spans=[
+            ResourceSpans(
+                resource=Resource(attributes=[project]),
+                scope_spans=[
+                    ScopeSpans(spans=[encode_span_to_otlp(_span("0" * 15 + "1"))]),
+                    ScopeSpans(spans=[encode_span_to_otlp(_span("0" * 15 + "2"))]),
+                ],
+            ),
+            ResourceSpans(
+                scope_spans=[ScopeSpans(spans=[encode_span_to_otlp(_span("0" * 15 + "3"))])],
+            ),
+        ]
+    )
+
+
+@pytest.mark.parametrize("num_processes", [0, 1])
+async def test_decode(export_request: ExportTraceServiceRequest, num_processes: int) -> None:
+    body = export_request.SerializeToString()
+    expected = [
+        ("0" * 15 + "1", "abc"),
+        ("0" * 15 + "2", "abc"),
+        ("0" * 15 + "3", DEFAULT_PROJECT_NAME),
+    ]
+    async with OtlpDecoder(num_processes) as decoder:
+        spans, num_bytes = await decoder.decode(gzip.compress(body), "gzip")
+        assert [(span.context.span_id, project_name) for span, project_name in spans] == expected
+        assert spans[0][0].attributes["input"] == {"value": "0" * 15 + "1"}
+        assert num_bytes == len(body)
+        spans = await decoder.decode_request(export_request)
+        assert [(span.context.span_id, project_name) for span, project_name in spans] == expected
+        with pytest.raises(DecodeError):
+            await decoder.decode(b"\xff")
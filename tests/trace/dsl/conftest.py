@@ -26,8 +26,10 @@ async def default_project(session: AsyncSession) -> None:
         insert(models.Span)
         .values(
             trace_rowid=trace_row_id,
+            project_rowid=project_row_id,
             span_id="2345",
             parent_id=None,
+            is_root=True,
             name="root span",
             span_kind="UNKNOWN",
             start_time=datetime.fromisoformat("2021-01-01T00:00:00.000+00:00"),
@@ -49,8 +51,10 @@ async def default_project(session: AsyncSession) -> None:
         insert(models.Span)
         .values(
             trace_rowid=trace_row_id,
+            project_rowid=project_row_id,
             span_id="4567",
             parent_id="2345",
+            is_root=False,
             name="retriever span",
             span_kind="RETRIEVER",
             start_time=datetime.fromisoformat("2021-01-01T00:00:05.000+00:00"),
@@ -97,8 +101,10 @@ async def abc_project(session: AsyncSession) -> None:
         insert(models.Span)
         .values(
             trace_rowid=trace_row_id,
+            project_rowid=project_row_id,
             span_id="234",
             parent_id="123",
+            is_root=True,
             name="root span",
             span_kind="UNKNOWN",
             start_time=datetime.fromisoformat("2021-01-01T00:00:00.000+00:00"),
@@ -120,8 +126,10 @@ async def abc_project(session: AsyncSession) -> None:
         insert(models.Span)
         .values(
             trace_rowid=trace_row_id,
+            project_rowid=project_row_id,
             span_id="345",
             parent_id="234",
+            is_root=False,
             name="embedding span",
             span_kind="EMBEDDING",
             start_time=datetime.fromisoformat("2021-01-01T00:00:00.000+00:00"),
@@ -156,8 +164,10 @@ async def abc_project(session: AsyncSession) -> None:
         insert(models.Span)
         .values(
             trace_rowid=trace_row_id,
+            project_rowid=project_row_id,
             span_id="456",
             parent_id="234",
+            is_root=False,
             name="retriever span",
             span_kind="RETRIEVER",
             start_time=datetime.fromisoformat("2021-01-01T00:00:05.000+00:00"),
@@ -188,8 +198,10 @@ async def abc_project(session: AsyncSession) -> None:
         insert(models.Span)
         .values(
             trace_rowid=trace_row_id,
+            project_rowid=project_row_id,
             span_id="567",
             parent_id="234",
+            is_root=False,
             name="llm span",
             span_kind="LLM",
             start_time=datetime.fromisoformat("2021-01-01T00:00:20.000+00:00"),
@@ -0,0 +1,80 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, ArrayValue, KeyValue, KeyValueList
+from phoenix.trace.attributes import load_json_strings, unflatten
+from phoenix.trace.otel import _decode_key_values
+from phoenix.trace.otlp_attributes import decode_otlp_attributes, get_path
+
+
+def _key_values(pairs: List[Tuple[str, Any]]) -> List[KeyValue]:
+    def encode(value: Any) -> AnyValue:
+        if isinstance(value, str):
+            return AnyValue(string_value=value)
+        if isinstance(value, bool):
+            return AnyValue(bool_value=value)
+        if isinstance(value, int):
+            return AnyValue(int_value=value)
+        if isinstance(value, float):
+            return AnyValue(double_value=value)
+        if isinstance(value, list):
+            return AnyValue(array_value=ArrayValue(values=[encode(v) for v in value]))
+        if isinstance(value, dict):
+            return AnyValue(
+                kvlist_value=KeyValueList(
+                    values=[KeyValue(key=k, value=encode(v)) for k, v in value.items()]
+                )
+            )
+        return AnyValue()
+
+    return [KeyValue(key=key, value=encode(value)) for key, value in pairs]
+
+
+@pytest.mark.parametrize(
+    "pairs",
+    [
+        pytest.param([], id="empty"),
+        pytest.param(
+            [
+                ("openinference.span.kind", "LLM"),
+                ("llm.token_count.prompt", 1),
+                ("llm.input_messages.1.message.content", "b"),
+                ("llm.input_messages.0.message.content", "a"),
+                ("llm.input_messages.0.message.tool_calls.0.tool_call.function.name", "f"),
+                ("llm.invocation_parameters", json.dumps({"temperature": 0})),
+                ("llm.prompt_template.variables", json.dumps({"x": 1})),
+                ("retrieval.documents.3.document.metadata", json.dumps({"page": 2})),
+                ("metadata", "{}"),
+                ("tag.tags", ["a", "b"]),
+                ("kvlist", {"a": 1}),
+                ("missing", None),
+            ],
+            id="llm",
+        ),
+        pytest.param([("metadata", "{not json")], id="invalid-json"),
+        pytest.param([("a", 1), ("a.b", 2)], id="value-and-prefix"),
+        pytest.param([("a.b", 2), ("a", 1)], id="prefix-and-value"),
+        pytest.param([("a", {"b": 1}), ("a.c", 2)], id="dict-value-and-prefix"),
+        pytest.param([("a.0.b", 1), ("a.c", 2)], id="index-and-key"),
+        pytest.param([("a.c", 2), ("a.0.b", 1)], id="key-and-index"),
+        pytest.param([("a.0", 1)], id="trailing-index"),
+        pytest.param([("0.a", 1)], id="leading-index"),
+        pytest.param([("a.0.1.b", 1)], id="nested-index"),
+        pytest.param([("a..b", 1), ("c.", 2)], id="empty-sub-key"),
+        pytest.param([("a", 1), ("a", 2)], id="duplicate"),
+    ],
+)
+def test_decode_otlp_attributes_matches_unflatten(pairs: List[Tuple[str, Any]]) -> None:
+    key_values = _key_values(pairs)
+    expected = unflatten(load_json_strings(_decode_key_values(key_values)))
+    assert decode_otlp_attributes(key_values) == expected
+
+
+def test_get_path() -> None:
+    attributes: Dict[str, Any] = {"llm": {"token_count": {"prompt": 1}}, "input": "x"}
+    assert get_path(attributes, "llm.token_count.prompt") == 1
+    assert get_path(attributes, "llm.token_count") == {"prompt": 1}
+    assert get_path(attributes, "llm.model_name") is None
+    assert get_path(attributes, "input.value") is None
+    assert get_path(attributes, "a.0.b") is None
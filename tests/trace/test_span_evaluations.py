@@ -7,11 +7,13 @@ import pandas as pd
 import pyarrow
 import pytest
 from pandas.testing import assert_frame_equal
-from phoenix.trace import DocumentEvaluations, Evaluations, SpanEvaluations
+from phoenix.session.evaluation import encode_evaluations
+from phoenix.trace import DocumentEvaluations, Evaluations, SpanEvaluations, TraceEvaluations
 from phoenix.trace.span_evaluations import (
     EVAL_NAME_COLUMN_PREFIX,
     InvalidParquetMetadataError,
     _parse_schema_metadata,
+    read_evaluation_columns,
 )
 from pyarrow import parquet
 
@@ -205,3 +207,69 @@ def test_parse_schema_metadata_raise_error_on_invalid_metadata():
     )
     with pytest.raises(InvalidParquetMetadataError):
         _parse_schema_metadata(schema)
+
+
+@pytest.mark.parametrize(
+    "evaluations",
+    [
+        pytest.param(
+            SpanEvaluations(
+                eval_name="my_eval",
+                dataframe=pd.DataFrame(
+                    {
+                        "span_id": ["a", "b", "c", "d"],
+                        "score": [1, float("nan"), float("nan"), 0.5],
+                        "label": ["x", "", None, None],
+                        "explanation": ["e", "f", None, None],
+                    }
+                ),
+            ),
+            id="span",
+        ),
+        pytest.param(
+            DocumentEvaluations(
+                eval_name="my_eval",
+                dataframe=pd.DataFrame(
+                    {
+                        "position": [1, 0, 2],
+                        "context.span_id": ["a", "a", "b"],
+                        "label": ["x", "y", ""],
+                    }
+                ),
+            ),
+            id="document",
+        ),
+        pytest.param(
+            TraceEvaluations(
+                eval_name="my_eval",
+                dataframe=pd.DataFrame({"trace_id": ["a"], "score": [True]}).set_index("trace_id"),
+            ),
+            id="trace",
+        ),
+    ],
+)
+def test_read_evaluation_columns_matches_encode_evaluations(evaluations: Evaluations) -> None:
+    table = evaluations.to_pyarrow_table()
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=2):
+            writer.write_batch(batch)
+    reader = pyarrow.ipc.open_stream(sink.getvalue())
+    all_columns = list(read_evaluation_columns(reader))
+    assert len(all_columns) == (len(evaluations) + 1) // 2
+    assert [
+        evaluation for columns in all_columns for evaluation in columns.to_evaluations()
+    ] == list(encode_evaluations(evaluations))
+
+
+def test_read_evaluation_columns_rejects_invalid_columns() -> None:
+    table = SpanEvaluations(
+        eval_name="my_eval",
+        dataframe=pd.DataFrame({"span_id": ["a"], "score": [1.0]}),
+    ).to_pyarrow_table()
+    table = table.set_column(0, "span_id", pyarrow.array([None], pyarrow.string()))
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    with pytest.raises(ValueError):
+        list(read_evaluation_columns(pyarrow.ipc.open_stream(sink.getvalue())))